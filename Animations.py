@@ -0,0 +1,142 @@
+'''Sprite sheet animations shared by all levels of process'''
+from math import ceil, sqrt
+
+import pygame
+
+from ImageCache import image_cache
+
+# Default time of one frame in ms
+FRAME_DURATION = 100
+
+
+class Animation:
+    '''Frames of one animation packed into one sprite sheet
+
+    Frame on screen depends only on given time, so every animated object
+    of one kind shares one Animation and needs no own timer.
+
+    Initilization arguments:
+        *images - Frames of animation: list
+        *frame_duration - Time of one frame in ms: int
+        *masks - Masks of frames, built from frames if not given: list
+        *sheet - Sheet with images drawn in order of get_layout, drawn
+                 from images if not given: pygame.Surface
+
+    Methods:
+        *load - Return animation of image files (static method)
+        *build - Build animation of decoded images one frame per step
+                 (static method, generator which returns animation)
+        *get_index - Return index of frame shown at given time
+        *get_frame - Return frame surface shown at given time
+        *get_mask - Return mask of frame shown at given time
+    '''
+    __slots__ = ['sheet', 'frames', 'masks', 'frame_duration', 'size']
+
+    def __init__(self, images: list, frame_duration: int,
+                 masks: list = None, sheet: pygame.Surface = None):
+        self.frame_duration: int = frame_duration
+        self.size, positions = get_layout(images)
+        self.sheet: pygame.Surface = self.get_sheet(images, positions) \
+            if sheet is None else sheet
+        self.frames: list = [self.sheet.subsurface(position, image.get_size())
+                             for image, position in zip(images, positions)]
+        self.masks: list = masks or [pygame.mask.from_surface(frame)
+                                     for frame in self.frames]
+
+    @staticmethod
+    def load(paths: list, frame_duration: int = FRAME_DURATION):
+        images = [image_cache.load_image(path) for path in paths]
+        # Frame has pixels of its image, so it has mask of the image
+        return Animation(images, frame_duration,
+                         [image_cache.load_mask(path, image)
+                          for path, image in zip(paths, images)])
+
+    @staticmethod
+    def build(paths: list, images: list,
+              frame_duration: int = FRAME_DURATION):
+        # Big sheet takes a few frames of budget, so caller resumes
+        # building between frames
+        size, positions = get_layout(images)
+        sheet = create_sheet(size, positions)
+        masks = []
+        for path, image, position in zip(paths, images, positions):
+            yield
+            draw_frame(sheet, image, position)
+            masks.append(image_cache.load_mask(path, image))
+        yield
+        return Animation(images, frame_duration, masks, convert_sheet(sheet))
+
+    def get_sheet(self, images: list, positions: list) -> pygame.Surface:
+        sheet = create_sheet(self.size, positions)
+        for image, position in zip(images, positions):
+            draw_frame(sheet, image, position)
+        return convert_sheet(sheet)
+
+    def get_index(self, time: int) -> int:
+        return time // self.frame_duration % len(self.frames)
+
+    def get_frame(self, time: int) -> pygame.Surface:
+        return self.frames[self.get_index(time)]
+
+    def get_mask(self, time: int) -> pygame.mask.Mask:
+        return self.masks[self.get_index(time)]
+
+
+class AnimationAtlas:
+    '''Process-wide cache of animations, every animation is decoded once
+
+    Methods:
+        *get - Return animation by name, load it on first request
+        *add - Store animation built elsewhere
+        *clear - Drop all loaded animations
+    '''
+    __slots__ = ['animations', 'loads']
+
+    def __init__(self):
+        self.animations: dict = {}
+        self.loads: int = 0
+
+    def get(self, name: str, paths: list,
+            frame_duration: int = FRAME_DURATION) -> Animation:
+        animation = self.animations.get(name)
+        if animation is None:
+            self.loads += 1
+            animation = Animation.load(paths, frame_duration)
+            self.add(name, animation)
+        return animation
+
+    def add(self, name: str, animation: Animation) -> None:
+        self.animations[name] = animation
+
+    def clear(self) -> None:
+        self.animations.clear()
+
+
+def get_layout(images: list) -> tuple:
+    '''Return size of frame and positions of images on sheet'''
+    size = (max(image.get_width() for image in images),
+            max(image.get_height() for image in images))
+    columns = ceil(sqrt(len(images)))
+    return size, [(index % columns * size[0], index // columns * size[1])
+                  for index in range(len(images))]
+
+
+def create_sheet(size: tuple, positions: list) -> pygame.Surface:
+    width = max(x for x, _ in positions) + size[0]
+    height = max(y for _, y in positions) + size[1]
+    return pygame.Surface([width, height], pygame.SRCALPHA)
+
+
+def draw_frame(sheet: pygame.Surface, image: pygame.Surface,
+               position: tuple) -> None:
+    # RGBA_MAX over transparent sheet copies pixels without blending
+    sheet.blit(image, position, special_flags=pygame.BLEND_RGBA_MAX)
+
+
+def convert_sheet(sheet: pygame.Surface) -> pygame.Surface:
+    if pygame.display.get_surface() is None:
+        return sheet
+    return sheet.convert_alpha()
+
+
+atlas = AnimationAtlas()
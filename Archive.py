@@ -0,0 +1,216 @@
+'''Packed archive of sprites: one memory-mapped file with an offset index
+
+Archive assets/sprites.pack is built by BuildArchive.py from every file of
+assets/sprites. It is opened once and mapped to memory, so images are read
+from it without open and stat of every file. Layout of archive:
+    header - MAGIC, VERSION, length of index (HEADER struct)
+    index - JSON: {"format": "png" | "pixels",
+                   "entries": {path in assets/sprites: [offset, size,
+                                                        format, width,
+                                                        height, file size,
+                                                        file mtime in ns],
+                               ...}}
+    data - entries one after another, offsets are counted from its start
+Entry format is "png" (file as it is, decoded on load) or "RGB"/"RGBA"
+(decoded pixels, read into Surface without decoding).
+
+Loose files are the development fallback: while there is no archive, it is
+older than any folder of assets/sprites (sprite was added, removed or
+saved by rename), or path isn't in it, image is read from its file.
+Sprite edited in place doesn't change its folder, so entries keep size and
+mtime of their files: with setting check_sprites = 1 they are checked once,
+when archive is mapped, and changed sprites are read from their files.
+That is a stat of every file, so it is meant only for editing of sprites.
+'''
+import json
+from io import BytesIO
+from mmap import ACCESS_READ, mmap
+from os import stat, walk
+from os.path import exists, getmtime, join, normpath
+from struct import Struct
+from threading import Lock
+
+import pygame
+
+MAGIC = b'CAPK'
+VERSION = 2
+HEADER = Struct('<4sHI')
+SPRITES_FOLDER = 'assets/sprites'
+ARCHIVE_EXTENSION = '.pack'
+
+
+class Archive:
+    '''One archive file mapped to memory
+
+    Initilization arguments:
+        *path - Path of archive file: str
+
+    Methods:
+        *read - Return data, format and size of entry by its name
+        *load - Return Surface of entry by its name
+        *names - Return names of all entries
+        *close - Unmap and close archive file
+    '''
+    __slots__ = ['path', 'file', 'data', 'start', 'format', 'entries',
+                 'stale']
+
+    def __init__(self, path: str):
+        self.path: str = path
+        self.file = open(path, 'rb')
+        self.data: mmap = mmap(self.file.fileno(), 0, access=ACCESS_READ)
+        magic, version, index_size = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'{path} is not archive of version {VERSION}')
+        self.start: int = HEADER.size + index_size
+        index = json.loads(self.data[HEADER.size:self.start])
+        self.format: str = index['format']
+        self.entries: dict = index['entries']
+        # Names of entries which files changed after build
+        self.stale: set = set()
+
+    def read(self, name: str) -> tuple:
+        offset, size, entry_format, width, height, *_ = self.entries[name]
+        offset += self.start
+        # Slice of mapping is one copy from page cache, no syscalls
+        return self.data[offset:offset + size], entry_format, (width, height)
+
+    def load(self, name: str) -> pygame.Surface:
+        return decode(*self.read(name), name)
+
+    def names(self) -> list:
+        return list(self.entries)
+
+    def close(self) -> None:
+        self.data.close()
+        self.file.close()
+
+
+class ArchiveLoader:
+    '''Process-wide loader of images from archives of sprite folders
+
+    Archive of sprites folder is looked for on the first image of the
+    folder, one archive is mapped for the whole process. Archive of older
+    version is not used. Entries are checked against their files only
+    while check_files is set (setting check_sprites). Loader is used from
+    preloader thread too.
+
+    Methods:
+        *read - Return data, format and size of image from archive or
+                from its file
+        *load_image - Return decoded image from archive or from its file
+        *get_archive - Return archive of sprites folder, None if it is not
+                       usable
+        *open - Map archive of sprites folder from given file, check its
+                entries against files of the folder if check_files is set
+        *clear - Close all archives, they are opened again on next load
+        *stats - Return counts of images read from archives and files
+    '''
+    __slots__ = ['archives', 'lock', 'enabled', 'check_files', 'packed',
+                 'loose']
+
+    def __init__(self):
+        # Sprites folder: its archive, None if images are read from files
+        self.archives: dict = {}
+        self.lock: Lock = Lock()
+        self.enabled: bool = True
+        self.check_files: bool = False
+        self.packed: int = 0
+        self.loose: int = 0
+
+    def read(self, path: str) -> tuple:
+        if self.enabled:
+            root, separator, name = normpath(path).replace('\\', '/') \
+                .rpartition(SPRITES_FOLDER + '/')
+            if separator and (not root or root.endswith('/')):
+                archive = self.get_archive(root + SPRITES_FOLDER)
+                if archive is not None and name in archive.entries and \
+                        name not in archive.stale:
+                    self.packed += 1
+                    return archive.read(name)
+        self.loose += 1
+        with open(path, 'rb') as file:
+            return file.read(), 'png', (0, 0)
+
+    def load_image(self, path: str) -> pygame.Surface:
+        return decode(*self.read(path), path)
+
+    def get_archive(self, folder: str) -> Archive:
+        archive = self.archives.get(folder, False)
+        if archive is not False:
+            return archive
+        with self.lock:
+            if folder not in self.archives:
+                path = folder + ARCHIVE_EXTENSION
+                self.archives[folder] = None
+                if is_archive_fresh(folder, path):
+                    try:
+                        self.open(path, folder)
+                    except ValueError:
+                        # Archive of older version, files are read
+                        pass
+        return self.archives[folder]
+
+    def open(self, path: str, folder: str = None) -> Archive:
+        archive = Archive(path)
+        if folder is not None:
+            if self.check_files:
+                archive.stale = get_stale_names(folder, archive.entries)
+            self.archives[folder] = archive
+        return archive
+
+    def clear(self) -> None:
+        with self.lock:
+            for archive in self.archives.values():
+                if archive is not None:
+                    archive.close()
+            self.archives.clear()
+
+    def stats(self) -> dict:
+        return {'packed': self.packed, 'loose': self.loose,
+                'archives': [archive.path for archive in
+                             self.archives.values() if archive is not None]}
+
+
+def decode(data: bytes, data_format: str, size: tuple,
+           name: str) -> pygame.Surface:
+    if data_format == 'png':
+        # Name is a hint of image type for decoder
+        return pygame.image.load(BytesIO(data), name)
+    return pygame.image.frombytes(data, size, data_format)
+
+
+def get_pixel_format(surface: pygame.Surface) -> str:
+    '''Return format of raw pixels which keep everything of image, None if
+    they can't (colorkey is not a part of pixels)'''
+    if surface.get_colorkey() is not None:
+        return None
+    return 'RGBA' if surface.get_flags() & pygame.SRCALPHA else 'RGB'
+
+
+def is_archive_fresh(folder: str, path: str) -> bool:
+    if not exists(path):
+        return False
+    # Folders are checked, not files: adding, removing or renaming of file
+    # changes its folder, and one stat per file is what archive avoids
+    archive_time = getmtime(path)
+    return all(getmtime(directory) <= archive_time
+               for directory, _, _ in walk(folder))
+
+
+def get_stale_names(folder: str, entries: dict) -> set:
+    '''Return names of entries which files were changed or removed after
+    archive was built'''
+    stale = set()
+    for name, entry in entries.items():
+        try:
+            file_stat = stat(join(folder, name))
+        except OSError:
+            stale.add(name)
+            continue
+        if [file_stat.st_size, file_stat.st_mtime_ns] != entry[5:]:
+            stale.add(name)
+    return stale
+
+
+archive_loader = ArchiveLoader()
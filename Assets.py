@@ -0,0 +1,151 @@
+'''Process-wide store of decoded images and their collision masks'''
+from collections import OrderedDict
+from os.path import normpath
+
+import pygame
+
+from ImageCache import image_cache
+
+
+class AssetStore:
+    '''Shared cache of images keyed by file path and variant
+
+    Every caller gets the same Surface or Mask object for the same key, so
+    returned assets must be treated as read-only (copy before drawing on it).
+
+    Initilization arguments:
+        *budget - Max size of cached assets in bytes, 0 - unlimited: int
+
+    Variants:
+        *raw - Surface exactly as it is decoded from file or archive
+        *converted - Surface converted to display pixel format
+        *alpha - Surface converted to display format with per-pixel alpha
+        *mask - pygame.mask.Mask built from the alpha variant
+    Converted variants requested before video mode is set are not stored,
+    their decoded image is stored as raw and converted on next request.
+
+    Methods:
+        *get - Return cached asset, decode it on miss
+        *image - Return alpha variant of image
+        *mask - Return mask of image
+        *add - Store variant of image decoded elsewhere
+        *keep - Store built variant, unconverted image only as raw
+        *is_cached - Check is variant of image in store
+        *set_budget - Change budget and evict assets above it
+        *clear - Drop all cached assets
+        *stats - Return dict with hit/miss/load/eviction counters
+    '''
+    __slots__ = ['budget', 'entries', 'size', 'hits', 'misses', 'loads',
+                 'evictions']
+
+    variants = ('raw', 'converted', 'alpha', 'mask')
+
+    def __init__(self, budget: int = 64 * 1024 * 1024):
+        self.budget: int = budget
+        self.entries: OrderedDict = OrderedDict()
+        self.size: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.loads: int = 0
+        self.evictions: int = 0
+
+    def get(self, path: str, variant: str = 'alpha'):
+        if variant not in self.variants:
+            raise ValueError(f'Unknown asset variant: {variant}')
+        key = (normpath(path), variant)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0]
+        self.misses += 1
+        asset = self.build(key[0], variant)
+        self.keep(key, asset)
+        return asset
+
+    def image(self, path: str) -> pygame.Surface:
+        return self.get(path, 'alpha')
+
+    def mask(self, path: str) -> pygame.mask.Mask:
+        return self.get(path, 'mask')
+
+    def build(self, path: str, variant: str):
+        if variant == 'mask':
+            return image_cache.load_mask(path, self.get(path, 'alpha'))
+        cached_raw = self.entries.get((path, 'raw'))
+        if cached_raw is not None:
+            surface = cached_raw[0]
+        else:
+            surface = self.load(path)
+        return self.convert(surface, variant)
+
+    def convert(self, surface: pygame.Surface,
+                variant: str) -> pygame.Surface:
+        if variant == 'raw' or pygame.display.get_surface() is None:
+            # Conversion needs a video mode, keep decoded image until then
+            return surface
+        if variant == 'converted':
+            return surface.convert()
+        return surface.convert_alpha()
+
+    def add(self, path: str, surface: pygame.Surface,
+            variant: str = 'alpha') -> None:
+        key = (normpath(path), variant)
+        if variant == 'mask' or key in self.entries:
+            return
+        self.keep(key, self.convert(surface, variant))
+
+    def keep(self, key: tuple, asset) -> None:
+        path, variant = key
+        if variant in ('converted', 'alpha') and \
+                pygame.display.get_surface() is None:
+            # Slow unconverted surface would stay for the whole session
+            key = (path, 'raw')
+            if key in self.entries:
+                return
+        self.put(key, asset)
+
+    def is_cached(self, path: str, variant: str = 'alpha') -> bool:
+        return (normpath(path), variant) in self.entries
+
+    def load(self, path: str) -> pygame.Surface:
+        self.loads += 1
+        return image_cache.load_image(path)
+
+    def put(self, key: tuple, asset) -> None:
+        asset_size = self.sizeof(asset)
+        self.entries[key] = (asset, asset_size)
+        self.size += asset_size
+        self.evict()
+
+    def evict(self) -> None:
+        if not self.budget:
+            return
+        # The newest entry is never evicted, even if it is above the budget
+        while self.size > self.budget and len(self.entries) > 1:
+            _, (_, asset_size) = self.entries.popitem(last=False)
+            self.size -= asset_size
+            self.evictions += 1
+
+    def set_budget(self, budget: int) -> None:
+        self.budget = budget
+        self.evict()
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.size = 0
+
+    def sizeof(self, asset) -> int:
+        if isinstance(asset, pygame.mask.Mask):
+            width, height = asset.get_size()
+            return (width * height + 7) // 8
+        return asset.get_pitch() * asset.get_height()
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses,
+                'loads': self.loads, 'evictions': self.evictions,
+                'entries': len(self.entries), 'bytes': self.size,
+                'budget': self.budget}
+
+
+asset_store = AssetStore()
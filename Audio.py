@@ -0,0 +1,102 @@
+'''Process-wide sound bank: lazily decoded effects and streamed music'''
+from os.path import getsize, normpath
+
+import pygame
+
+from Utils import DataBase
+
+# Files bigger than this (bytes) are long tracks, they are streamed by
+# pygame.mixer.music instead of being decoded into memory
+STREAM_SIZE = 64 * 1024
+# Volume of sounds which don't play at full volume
+VOLUMES = {'step': 0.5}
+
+
+class SoundBank:
+    '''Sounds of sounds database shared by all windows and sprites
+
+    Short effects are decoded on first play and kept decoded. Long tracks
+    are played through pygame.mixer.music, so only one of them plays at
+    once and starting a track stops previous one.
+
+    Methods:
+        *load - Read names and paths of sounds from database folder
+        *is_streamed - Check is sound played as music stream
+        *get_sound - Return decoded effect, decode it on first use
+        *play - Play sound by name a certain times
+        *stop - Stop playing selected sound
+        *stop_all - Stop ALL sound
+        *get_memory - Return bytes of decoded audio of every sound
+        *clear - Stop all sounds and drop decoded ones
+    '''
+    __slots__ = ['database_path', 'paths', 'streamed', 'sounds', 'track']
+
+    def __init__(self):
+        self.database_path: str = None
+        self.paths: dict = {}
+        self.streamed: set = set()
+        self.sounds: dict = {}
+        # Name of track loaded to music stream
+        self.track: str = None
+
+    def load(self, database_path: str) -> None:
+        database_path = normpath(database_path)
+        if database_path == self.database_path:
+            return
+        self.clear()
+        self.database_path = database_path
+        self.paths = dict(DataBase(database_path).get_sounds())
+        self.streamed = {name for name, path in self.paths.items()
+                         if getsize(path) > STREAM_SIZE}
+
+    def is_streamed(self, name: str) -> bool:
+        return name in self.streamed
+
+    def get_sound(self, name: str) -> pygame.mixer.Sound:
+        sound = self.sounds.get(name)
+        if sound is None:
+            sound = pygame.mixer.Sound(self.paths[name])
+            sound.set_volume(VOLUMES.get(name, 1.0))
+            self.sounds[name] = sound
+        return sound
+
+    def play(self, name, loops=0) -> None:
+        if not self.is_streamed(name):
+            self.stop(name)
+            self.get_sound(name).play(loops)
+            return
+        pygame.mixer.music.load(self.paths[name])
+        pygame.mixer.music.play(loops)
+        self.track = name
+
+    def stop(self, name) -> None:
+        if name == self.track:
+            pygame.mixer.music.stop()
+            self.track = None
+        elif name in self.sounds:
+            self.sounds[name].stop()
+
+    def stop_all(self) -> None:
+        for name in self.sounds:
+            self.sounds[name].stop()
+        if self.track is not None:
+            self.stop(self.track)
+
+    def get_memory(self) -> dict:
+        init = pygame.mixer.get_init()
+        if init is None:
+            # Without mixer (no audio device) nothing is decoded
+            return {name: 0 for name in self.paths}
+        # Decoded audio is frequency * channels * sample bytes per second
+        frequency, size, channels = init
+        second_size = frequency * channels * abs(size) // 8
+        return {name: int(self.sounds[name].get_length() * second_size)
+                if name in self.sounds else 0
+                for name in self.paths}
+
+    def clear(self) -> None:
+        self.stop_all()
+        self.sounds.clear()
+
+
+sound_bank = SoundBank()
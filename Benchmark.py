@@ -0,0 +1,473 @@
+'''Frame time benchmark of every level
+
+Every level is loaded with dummy video and audio drivers and played for
+given count of frames with scripted (or recorded) input, or until it is
+won or lost. Each frame is one tick and one render of level itself, its
+phases are read from marks of frame profiler. Results are written to JSON
+and compared with baseline, exit code is 1 if any phase got slower than
+threshold. Baseline is not committed, frame times depend on machine:
+record it with --save-baseline before changing code. Pixels pushed to
+display per frame by dirty rect renderer are compared with full redraw
+for levels and idle menus, and every level frame drawn by it must be
+equal to full redraw, also when bricks are built into static layer while
+level runs (exit code is 1 if it isn't).
+Build of level objects from level file is compared with build from its
+compiled cache. Transition to every next level is timed without and with
+preloading it while previous level runs, frames of previous level are
+paced to fps as game loop does (preloader works between them), their
+times show hitches of preloader.
+Decode of every sprite and its mask is timed from loose files, from
+archives of both formats (see BuildArchive.py) and from image cache, cold
+- page cache of files dropped (where OS allows it) and archive not mapped
+yet, warm - files cached.
+
+Usage:
+    python Benchmark.py [--frames 600] [--output bench.json]
+                        [--baseline benchmarks/baseline.json]
+                        [--save-baseline] [--threshold 0.2]
+                        [--replay FILE ...]
+'''
+import json
+import os
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from os import makedirs, walk
+from os.path import dirname, exists, getsize, join, normpath
+from tempfile import TemporaryDirectory
+from time import perf_counter_ns
+
+import pygame
+
+from Animations import atlas
+from Archive import SPRITES_FOLDER, archive_loader
+from Assets import asset_store
+from Audio import sound_bank
+from BuildArchive import FORMATS, pack
+from ImageCache import image_cache
+from Preload import preloader
+from Profiler import COLLISIONS, DRAW, EVENTS, FLIP, UI, UPDATE, profiler
+from Windows import (INPUT_JUMP, INPUT_LEFT, INPUT_RIGHT, INPUT_SIT,
+                     init_headless)
+
+PHASES = ('events', 'player_update', 'collisions', 'draw', 'ui', 'flip')
+# Phases of profiler marks which PHASES are read from
+PROFILER_PHASES = (EVENTS, UPDATE, COLLISIONS, DRAW, UI, FLIP)
+LEVELS = ('FirstLevel', 'SecondLevel', 'ThirdLevel', 'FourthLevel',
+          'FifthLevel')
+MENUS = ('MainWindow', 'LoseWindow', 'EndWindow', 'ShopWindow')
+# (input bitmask, ticks) pairs, repeated until the end of run
+SCRIPT = ((INPUT_RIGHT, 20), (INPUT_RIGHT | INPUT_JUMP, 1), (INPUT_RIGHT, 25),
+          (0, 5), (INPUT_LEFT | INPUT_JUMP, 1), (INPUT_LEFT, 30),
+          (INPUT_SIT, 5), (INPUT_JUMP, 1), (0, 10))
+SEED = 0
+HIT_POINTS = 1000
+# Phases faster than this (ms) are never reported as regressed, it is noise
+MIN_DELTA = 0.05
+LAYOUT_REPEATS = 20
+# Bricks built while dirty rect frames are checked: (tick, position)
+BRICKS = ((10, (300, 300)), (20, (400, 250)), (30, (500, 200)),
+          (40, (200, 350)))
+ASSET_REPEATS = 5
+
+
+def scripted_inputs(frames: int) -> list:
+    inputs = []
+    while len(inputs) < frames:
+        for bitmask, length in SCRIPT:
+            inputs += [bitmask] * length
+    return inputs[:frames]
+
+
+def percentile(values: list, part: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(part * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summary(durations: list) -> dict:
+    milliseconds = [duration / 1e6 for duration in durations]
+    return {'p50': percentile(milliseconds, 0.5),
+            'p95': percentile(milliseconds, 0.95),
+            'p99': percentile(milliseconds, 0.99)}
+
+
+def load_level(level_name: str, settings: dict, recording=None):
+    import Levels
+
+    level_class = getattr(Levels, level_name)
+    if recording is None:
+        return level_class(settings, HIT_POINTS, seed=SEED)
+    level = level_class(recording.get_settings(settings),
+                        recording.hit_points, seed=recording.seed,
+                        skin=recording.skin)
+    level.playback = recording.iter_ticks()
+    return level
+
+
+def run_frames(level, inputs: list, durations: dict = None,
+               pixels: list = None) -> bool:
+    '''Play frames the way game loop does, phases are timed by marks of
+    profiler, return False if level stopped'''
+    time_delta = 1 / level.settings['tick_rate']
+    phase_times = profiler.current
+    for bitmask in inputs:
+        profiler.begin_frame()
+        level.process_events(pygame.event.get())
+        profiler.mark(EVENTS)
+        if level.playback is None:
+            level.set_inputs(bitmask)
+        running = level.tick()
+        if running:
+            level.render(1.0, time_delta)
+        if durations is not None:
+            for phase, profiler_phase in zip(PHASES, PROFILER_PHASES):
+                durations[phase].append(
+                    int(phase_times[profiler_phase] * 1e9))
+        profiler.end_frame()
+        if not running:
+            return False
+        if pixels is not None:
+            pixels.append(level.renderer.pixels)
+    return True
+
+
+def benchmark_level(level_name: str, settings: dict, frames: int,
+                    recording=None) -> dict:
+    inputs = scripted_inputs(frames if recording is None
+                             else min(frames, recording.ticks))
+    start = perf_counter_ns()
+    level = load_level(level_name, settings, recording)
+    load_time = (perf_counter_ns() - start) / 1e6
+    durations = {phase: [] for phase in PHASES}
+    run_frames(level, inputs, durations)
+    # Second run with tracemalloc, it slows frames down too much to time them
+    tracemalloc.start()
+    level = load_level(level_name, settings, recording)
+    run_frames(level, inputs)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    pixels = []
+    level = load_level(level_name, dict(settings, dirty_rects=1), recording)
+    run_frames(level, inputs, pixels=pixels)
+    return {'load_ms': load_time,
+            'layout': benchmark_layout(level),
+            'dirty_mismatches': check_dirty_frames(level_name, settings,
+                                                   inputs),
+            'frames': len(durations['events']),
+            'peak_memory_kib': peak_memory // 1024,
+            'phases': {phase: summary(durations[phase])
+                       for phase in PHASES if durations[phase]},
+            'pixels': pixels_summary(pixels, settings['window_size'])}
+
+
+def check_dirty_frames(level_name: str, settings: dict,
+                       inputs: list) -> int:
+    '''Count frames which dirty rect renderer draws different from full
+    redraw of the same blits'''
+    level = load_level(level_name, dict(settings, dirty_rects=1))
+    renderer = level.renderer
+    reference = pygame.Surface(renderer.target.get_size())
+    bricks = dict(BRICKS) if hasattr(level, 'place_brick') else {}
+    time_delta = 1 / level.settings['tick_rate']
+    mismatches = 0
+    for tick, bitmask in enumerate(inputs):
+        if tick in bricks:
+            # Brick is drawn into static layer, layer surface is the same
+            level.place_brick(bricks[tick])
+        level.set_inputs(bitmask)
+        if not level.tick():
+            break
+        level.draw_frame()
+        level.draw_ui(time_delta)
+        for source, rect, area, special_flags in renderer.canvas.items:
+            reference.blit(source, rect, area, special_flags)
+        level.flip()
+        if pygame.image.tobytes(reference, 'RGB') != \
+                pygame.image.tobytes(renderer.target, 'RGB'):
+            mismatches += 1
+    return mismatches
+
+
+def benchmark_layout(level) -> dict:
+    '''Time level objects build from level file and from compiled cache,
+    cold - first load in process, with no decoded images'''
+    timings = {}
+    for cold in (True, False):
+        for use_cache in (False, True):
+            durations = []
+            for _ in range(LAYOUT_REPEATS):
+                level.create_sprite_groups()
+                if cold:
+                    asset_store.clear()
+                    atlas.clear()
+                start = perf_counter_ns()
+                level.load_layout(level.layout_name, use_cache)
+                level.get_static_layer()
+                durations.append(perf_counter_ns() - start)
+            mode = f'{"cold" if cold else "warm"}_' \
+                f'{"cached" if use_cache else "parse"}_ms'
+            timings[mode] = percentile(durations, 0.5) / 1e6
+    return timings
+
+
+def drop_page_cache(paths: list) -> bool:
+    if not hasattr(os, 'posix_fadvise'):
+        return False
+    for path in paths:
+        with open(path, 'rb') as file:
+            os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+    return True
+
+
+def benchmark_assets(root_path: str) -> dict:
+    '''Time decode of every sprite and its mask from loose files, from
+    archives and from image cache of loose files'''
+    folder = normpath(f'{root_path}/{SPRITES_FOLDER}').replace('\\', '/')
+    paths = sorted(join(directory, file_name)
+                   for directory, _, files in walk(folder)
+                   for file_name in files)
+    results = {'files': len(paths)}
+    with TemporaryDirectory() as directory:
+        sources = {'loose': None}
+        for archive_format in FORMATS:
+            sources[archive_format] = pack(
+                folder, archive_format, f'{directory}/sprites.pack.'
+                                        f'{archive_format}')
+        sources['cache'] = None
+        cache_folder = image_cache.folder
+        image_cache.folder = f'{directory}/images'
+        for source, archive_path in sources.items():
+            archive_loader.enabled = archive_path is not None
+            image_cache.enabled = source == 'cache'
+            if image_cache.enabled:
+                load_sprites(paths)
+                files = paths + [join(image_cache.folder, file_name) for
+                                 _, _, cache_files in walk(image_cache.folder)
+                                 for file_name in cache_files]
+            else:
+                files = paths if archive_path is None else [archive_path]
+            timings = {'bytes': sum(map(getsize, files))}
+            for cold in (True, False):
+                durations = []
+                for _ in range(ASSET_REPEATS):
+                    if cold:
+                        archive_loader.clear()
+                        image_cache.keys.clear()
+                        timings['page_cache_dropped'] = drop_page_cache(files)
+                    start = perf_counter_ns()
+                    # Mapping of archive is a part of cold load
+                    if archive_path is not None and \
+                            folder not in archive_loader.archives:
+                        archive_loader.open(archive_path, folder)
+                    load_sprites(paths)
+                    durations.append(perf_counter_ns() - start)
+                timings[f'{"cold" if cold else "warm"}_ms'] = \
+                    percentile(durations, 0.5) / 1e6
+            results[source] = timings
+            archive_loader.clear()
+        image_cache.folder = cache_folder
+    archive_loader.enabled = True
+    image_cache.enabled = True
+    return results
+
+
+def load_sprites(paths: list) -> None:
+    for path in paths:
+        image_cache.load_mask(path, image_cache.load_image(path))
+
+
+def benchmark_transition(level_name: str, next_name: str, settings: dict,
+                         frames: int) -> dict:
+    import Levels
+
+    next_class = getattr(Levels, next_name)
+    inputs = scripted_inputs(frames)
+    results = {}
+    for mode in ('cold', 'preloaded'):
+        asset_store.clear()
+        atlas.clear()
+        sound_bank.clear()
+        level = load_level(level_name, settings)
+        if mode == 'preloaded':
+            next_class.preload(settings)
+        durations = []
+        clock = pygame.time.Clock()
+        for bitmask in inputs:
+            start = perf_counter_ns()
+            running = run_frames(level, [bitmask])
+            if mode == 'preloaded':
+                preloader.poll()
+            durations.append(perf_counter_ns() - start)
+            if not running:
+                break
+            # Low priority worker runs in time left by frames, as in game
+            clock.tick(settings['fps'])
+        start = perf_counter_ns()
+        wait_time = preloader.wait()
+        next_class(settings, HIT_POINTS, seed=SEED)
+        results[mode] = {
+            'transition_ms': (perf_counter_ns() - start) / 1e6,
+            'wait_ms': wait_time,
+            'frame_p99_ms': percentile(durations, 0.99) / 1e6,
+            'frame_max_ms': max(durations) / 1e6}
+    return results
+
+
+def pixels_summary(pixels: list, window_size: list) -> dict:
+    return {'full_redraw': window_size[0] * window_size[1],
+            'dirty_mean': sum(pixels) / len(pixels),
+            'dirty_p95': percentile(pixels, 0.95)}
+
+
+def benchmark_menu(menu_name: str, settings_manager, frames: int) -> dict:
+    '''Count pixels pushed by idle menu with dirty rect renderer'''
+    import Windows
+
+    settings = dict(settings_manager.settings, dirty_rects=1)
+    if menu_name == 'ShopWindow':
+        # Shop window works with Settings object itself
+        settings_manager.settings = settings
+        window = Windows.ShopWindow(settings_manager)
+    else:
+        window = getattr(Windows, menu_name)(settings)
+    pixels = []
+    for _ in range(frames):
+        window.process_events(pygame.event.get())
+        window.tick()
+        window.render(1.0, 1 / settings['tick_rate'])
+        pixels.append(window.renderer.pixels)
+    window.sounds.stop_all()
+    return pixels_summary(pixels, settings['window_size'])
+
+
+def print_pixels(name: str, pixels: dict) -> None:
+    part = pixels['dirty_mean'] / pixels['full_redraw'] * 100
+    print(f'{name}: pixels per frame - full redraw '
+          f'{pixels["full_redraw"]}, dirty rects mean '
+          f'{pixels["dirty_mean"]:.0f} ({part:.1f}%), '
+          f'p95 {pixels["dirty_p95"]}')
+
+
+def compare(results: dict, baseline: dict, threshold: float,
+            metric: str) -> list:
+    regressions = []
+    for level_name, level_result in results['levels'].items():
+        base_level = baseline.get('levels', {}).get(level_name)
+        if base_level is None:
+            continue
+        checks = [('load', level_result['load_ms'], base_level['load_ms'])]
+        for phase, values in level_result['phases'].items():
+            if phase in base_level['phases']:
+                checks.append((phase, values[metric],
+                               base_level['phases'][phase][metric]))
+        for phase, value, base_value in checks:
+            if value - base_value > max(base_value * threshold, MIN_DELTA):
+                regressions.append(
+                    f'{level_name} {phase}: {base_value:.3f} ms -> '
+                    f'{value:.3f} ms')
+    return regressions
+
+
+def main() -> int:
+    parser = ArgumentParser(description='Benchmark frame time of levels')
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--levels', nargs='*', default=list(LEVELS))
+    parser.add_argument('--replay', nargs='*', default=[],
+                        help='Replay files used instead of script for '
+                             'their levels')
+    parser.add_argument('--output', default='bench_output.json')
+    parser.add_argument('--baseline', default='benchmarks/baseline.json')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Write results to baseline file')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed slowdown, 0.2 - 20 percent')
+    parser.add_argument('--metric', default='p95',
+                        choices=['p50', 'p95', 'p99'])
+    arguments = parser.parse_args()
+
+    init_headless()
+    from Replay import Recording
+    from Utils import Settings
+
+    settings_manager = Settings('settings.ini')
+    settings = settings_manager.settings
+    settings['record_replays'] = 0
+    settings['dirty_rects'] = 0
+    recordings = {}
+    for path in arguments.replay:
+        recording = Recording.load(path)
+        recordings[recording.level_name] = recording
+    results = {'frames': arguments.frames, 'levels': {}, 'menus': {},
+               'transitions': {}}
+    results['assets'] = benchmark_assets(settings['path'])
+    assets = results['assets']
+    print(f'Sprites with masks ({assets["files"]} files): ' + ', '.join(
+        f'{source} {assets[source]["bytes"] // 1024} KiB - cold '
+        f'{assets[source]["cold_ms"]:.1f} ms, warm '
+        f'{assets[source]["warm_ms"]:.1f} ms'
+        for source in ('loose', *FORMATS, 'cache')) +
+        ('' if assets['loose']['page_cache_dropped']
+         else ' (page cache can\'t be dropped here, cold is warm)'))
+    mismatches = []
+    for level_name in arguments.levels:
+        result = benchmark_level(level_name, settings, arguments.frames,
+                                 recordings.get(level_name))
+        results['levels'][level_name] = result
+        phases = ', '.join(f'{phase} {values["p95"]:.3f}'
+                           for phase, values in result['phases'].items())
+        print(f'{level_name}: load {result["load_ms"]:.1f} ms, '
+              f'peak {result["peak_memory_kib"]} KiB, p95 ms: {phases}')
+        print_pixels(level_name, result['pixels'])
+        if result['dirty_mismatches']:
+            mismatches.append(f'{level_name}: {result["dirty_mismatches"]} '
+                              f'dirty rect frames differ from full redraw')
+        layout = result['layout']
+        print(f'{level_name}: level build - cold {layout["cold_parse_ms"]:.2f}'
+              f' ms, cold cached {layout["cold_cached_ms"]:.2f} ms, warm '
+              f'{layout["warm_parse_ms"]:.2f} ms, warm cached '
+              f'{layout["warm_cached_ms"]:.2f} ms')
+    for level_name, next_name in zip(arguments.levels,
+                                     arguments.levels[1:]):
+        result = benchmark_transition(level_name, next_name, settings,
+                                      arguments.frames)
+        results['transitions'][next_name] = result
+        cold, preloaded = result['cold'], result['preloaded']
+        print(f'{level_name} -> {next_name}: transition cold '
+              f'{cold["transition_ms"]:.1f} ms, preloaded '
+              f'{preloaded["transition_ms"]:.1f} ms (waited '
+              f'{preloaded["wait_ms"]:.1f} ms), frame max '
+              f'{cold["frame_max_ms"]:.2f} ms -> '
+              f'{preloaded["frame_max_ms"]:.2f} ms while preloading')
+    for menu_name in MENUS:
+        result = benchmark_menu(menu_name, settings_manager, arguments.frames)
+        results['menus'][menu_name] = result
+        print_pixels(menu_name, result)
+    results['sounds'] = sound_bank.get_memory()
+    print('Decoded sounds: ' + ', '.join(
+        f'{name} {size // 1024} KiB' for name, size in
+        results['sounds'].items()))
+    with open(arguments.output, 'w', encoding='utf-8') as output_file:
+        json.dump(results, output_file, indent=4)
+    for mismatch in mismatches:
+        print(f'MISMATCH {mismatch}')
+    if arguments.save_baseline:
+        if dirname(arguments.baseline):
+            makedirs(dirname(arguments.baseline), exist_ok=True)
+        with open(arguments.baseline, 'w', encoding='utf-8') as baseline_file:
+            json.dump(results, baseline_file, indent=4)
+        return 1 if mismatches else 0
+    if not exists(arguments.baseline):
+        print(f'No baseline in {arguments.baseline}, nothing to compare')
+        return 1 if mismatches else 0
+    with open(arguments.baseline, encoding='utf-8') as baseline_file:
+        baseline = json.load(baseline_file)
+    regressions = compare(results, baseline, arguments.threshold,
+                          arguments.metric)
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    return 1 if regressions or mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+'''Pack every file of assets/sprites into one archive with offset index
+
+Archive stores PNG files as they are (--format png, smaller) or decoded
+pixels (--format pixels, bigger, but loaded without PNG decoding). Images
+with colorkey are kept as PNG in both formats, pixels don't have colorkey.
+Archive is optional: without it game reads loose files. Rebuild it after
+sprites were changed; size and mtime of every file are stored with its
+entry, so with setting check_sprites = 1 sprites edited after build are
+read from their files.
+
+Usage:
+    python BuildArchive.py [--folder assets/sprites] [--format png]
+                           [--output assets/sprites.pack]
+'''
+import json
+import sys
+from argparse import ArgumentParser
+from os import remove, replace, stat, walk
+from os.path import abspath, dirname, exists, join, relpath
+
+import pygame
+
+from Archive import (ARCHIVE_EXTENSION, HEADER, MAGIC, VERSION,
+                     get_pixel_format)
+
+FORMATS = ('png', 'pixels')
+
+
+def get_entry(path: str, archive_format: str) -> tuple:
+    with open(path, 'rb') as file:
+        data = file.read()
+    if archive_format == 'png' or not path.endswith('.png'):
+        return data, 'png', 0, 0
+    surface = pygame.image.load(path)
+    pixel_format = get_pixel_format(surface)
+    if pixel_format is None:
+        return data, 'png', 0, 0
+    return (pygame.image.tobytes(surface, pixel_format), pixel_format,
+            *surface.get_size())
+
+
+def pack(folder_path: str, archive_format: str = 'png',
+         output_path: str = None) -> str:
+    if archive_format not in FORMATS:
+        raise ValueError(f'Unknown archive format: {archive_format}')
+    output_path = output_path or \
+        folder_path.rstrip('/\\') + ARCHIVE_EXTENSION
+    entries = {}
+    blobs = []
+    offset = 0
+    for directory, directories, files in walk(folder_path):
+        # Same order on every build, so equal sprites give equal archive
+        directories.sort()
+        for file_name in sorted(files):
+            path = join(directory, file_name)
+            name = relpath(path, folder_path).replace('\\', '/')
+            data, entry_format, width, height = get_entry(path,
+                                                          archive_format)
+            file_stat = stat(path)
+            entries[name] = [offset, len(data), entry_format, width, height,
+                             file_stat.st_size, file_stat.st_mtime_ns]
+            blobs.append(data)
+            offset += len(data)
+    index = json.dumps({'format': archive_format,
+                        'entries': entries}).encode()
+    # Built aside and moved, so game never maps half-written archive
+    temporary_path = f'{output_path}.tmp'
+    if exists(temporary_path):
+        remove(temporary_path)
+    with open(temporary_path, 'wb') as archive_file:
+        archive_file.write(HEADER.pack(MAGIC, VERSION, len(index)))
+        archive_file.write(index)
+        archive_file.writelines(blobs)
+    replace(temporary_path, output_path)
+    return output_path
+
+
+def main() -> int:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--folder', default=f'{dirname(abspath(__file__))}'
+                                            '/assets/sprites')
+    parser.add_argument('--format', default='png', choices=FORMATS)
+    parser.add_argument('--output',
+                        help='Archive path, folder path with .pack if unset')
+    arguments = parser.parse_args()
+    output_path = pack(arguments.folder, arguments.format, arguments.output)
+    print(f'Written {output_path}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+'''Merge text, skins, sounds and fonts databases into one database
+
+Consolidated database has all tables of source databases, so DataBase
+reads the whole snapshot through one connection. It is optional: while
+it is older than any source database, sources are read instead.
+
+Usage:
+    python BuildDatabase.py [--folder assets/database]
+'''
+import sys
+from argparse import ArgumentParser
+from contextlib import closing
+from os import remove, replace
+from os.path import abspath, dirname, exists
+from sqlite3 import connect
+
+from Utils import CONSOLIDATED_DB, DATABASES
+
+
+def consolidate(folder_path: str) -> str:
+    consolidated_path = f'{folder_path}/{CONSOLIDATED_DB}'
+    # Built aside and moved, so game never reads half-written database
+    temporary_path = f'{consolidated_path}.tmp'
+    if exists(temporary_path):
+        remove(temporary_path)
+    with closing(connect(temporary_path, isolation_level=None)) as database:
+        for name in DATABASES:
+            database.execute('ATTACH DATABASE ? AS source',
+                             (f'{folder_path}/{name}.db',))
+            tables = database.execute(
+                'SELECT name, sql FROM source.sqlite_master WHERE type = ?',
+                ('table',)).fetchall()
+            database.execute('BEGIN')
+            for table, schema in tables:
+                if database.execute(
+                        'SELECT 1 FROM main.sqlite_master WHERE name = ?',
+                        (table,)).fetchone():
+                    raise ValueError(f'Table {table} of {name}.db is '
+                                     'already in consolidated database')
+                database.execute(schema)
+                database.execute(f'INSERT INTO main."{table}" '
+                                 f'SELECT * FROM source."{table}"')
+            database.execute('COMMIT')
+            database.execute('DETACH DATABASE source')
+    replace(temporary_path, consolidated_path)
+    return consolidated_path
+
+
+def main() -> int:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--folder', default=f'{dirname(abspath(__file__))}'
+                                            '/assets/database')
+    arguments = parser.parse_args()
+    print(f'Written {consolidate(arguments.folder)}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
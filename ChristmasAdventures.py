@@ -1,106 +1,193 @@
-''' Main game file, manage windows and catch errors '''
-import logging
-
-import pygame
-
-from Levels import FifthLevel, FirstLevel, FourthLevel, SecondLevel, ThirdLevel
-from Utils import Settings
-from Windows import EndWindow, LoseWindow, MainWindow, ShopWindow
-
-SETTINGS_FILE = 'settings.ini'
-
-# pygame initilization
-pygame.mixer.pre_init(44100, -8, 2, 512)
-pygame.init()
-pygame.mixer.init()
-pygame.mixer.music.set_volume(10)
-
-# logging initilization
-logging.basicConfig(
-    filename='./error_log.txt', filemode='a',
-    format='%(asctime)s,%(msecs)d %(name)s %(levelname)s %(message)s',
-    datefmt='%H:%M:%S', level=logging.DEBUG)
-
-
-class GameManager:
-    '''Main game class which launch game and control levels and windows
-
-    Initilization arguments:
-        *settings - Dict with settings from class Settings: dict
-
-    Methods:
-        *start - Start game manager and get game class -> None
-        *run_game - Launch game -> None
-        *next_level - Launch next level
-    '''
-    __slots__ = ['settings', 'level_number', 'hit_points', 'game', 'levels',
-                 'windows']
-
-    def __init__(self, settings: dict):
-        self.settings: dict = settings
-        self.level_number: int = 1
-        self.hit_points: int = 10
-        self.levels: list = [None, FirstLevel, SecondLevel, ThirdLevel,
-                             FourthLevel, FifthLevel]
-        self.windows: dict = {
-            'main_window': [MainWindow, self.settings],
-            'level': [self.levels[1], self.settings, 10],
-            'lose': [LoseWindow, self.settings],
-            'end': [EndWindow, self.settings],
-            'shop_window': [ShopWindow, Settings(SETTINGS_FILE)]}
-
-    def start(self, mode: str = '') -> None:
-        '''
-        Arguments:
-            mode - type of window: str
-        '''
-        if mode in ['lose', 'level']:
-            self.level_number = 1
-        if mode == 'win':
-            self.game = self.next_level()
-        else:
-            self.game = self.windows[mode][0](*self.windows[mode][1:])
-        self.run_game()
-
-    def next_level(self):
-        if self.level_number in range(1, len(self.levels) - 1):
-            self.level_number += 1
-            return self.levels[self.level_number](
-                self.settings, self.game.santa.hit_points)
-        self.level_number = 1
-        return self.windows['end'][0](*self.windows['end'][1:])
-
-    def run_game(self) -> None:
-        start_mode: str = self.game.mode
-        self.game.game_cycle()
-        if self.game.mode != start_mode:
-            if self.game.mode == 'replay':
-                new_mode = 'level'
-            else:
-                new_mode = self.game.mode
-            if new_mode in ['win', 'level']:
-                try:
-                    self.hit_points: int = self.game.santa.hit_points
-                except AttributeError:
-                    self.hit_points = 10
-            self.start(new_mode)
-
-
-def count_launch():
-    updated_number_of_games = str(
-        settings_manager.settings['number_of_games'] + 1)
-    settings_manager.save({'number_of_games': updated_number_of_games})
-
-
-settings_manager = Settings(SETTINGS_FILE)
-count_launch()
-
-if __name__ == "__main__":
-    game_manager = GameManager(settings_manager.settings)
-    try:
-        game_manager.start('main_window')
-    except Exception as error:
-        # writing error info in ./error_log.txt
-        logging.exception(error, exc_info=True)
-
-pygame.quit()
+''' Main game file, manage windows and catch errors '''
+# Startup clock starts on import, so it goes before everything else
+from Startup import startup  # isort: skip
+import logging
+import sys
+from argparse import ArgumentParser
+from time import perf_counter
+
+import pygame
+
+from Archive import archive_loader
+from Preload import preloader
+from Runtime import Runtime, runtime
+from Windows import EndWindow, Level, LoseWindow, MainWindow, ShopWindow
+
+SETTINGS_FILE = 'settings.ini'
+# Classes of Levels module in game order, module is imported with the
+# first level, so main menu is shown without it
+LEVELS = ('FirstLevel', 'SecondLevel', 'ThirdLevel', 'FourthLevel',
+          'FifthLevel')
+# Mode which scene was closed with: scene started next ('win' - next level
+# or end window after the last one)
+TRANSITIONS = {'main_window': 'main_window', 'shop_window': 'shop_window',
+               'level': 'level', 'replay': 'level', 'win': 'win',
+               'lose': 'lose'}
+startup.mark('imports')
+
+
+def init() -> None:
+    # pygame initilization, only modules which game uses
+    pygame.mixer.pre_init(44100, -8, 2, 512)
+    pygame.display.init()
+    pygame.font.init()
+    pygame.mixer.init()
+    pygame.mixer.music.set_volume(10)
+    startup.mark('pygame_init')
+    # logging initilization
+    logging.basicConfig(
+        filename='./error_log.txt', filemode='a',
+        format='%(asctime)s,%(msecs)d %(name)s %(levelname)s %(message)s',
+        datefmt='%H:%M:%S', level=logging.DEBUG)
+    startup.mark('logging')
+
+
+class GameManager:
+    '''Main game class which launch game and control levels and windows
+
+    Initilization arguments:
+        *settings - Dict with settings from class Settings: dict
+
+    Game manager owns runtime context (display, UI manager, sounds,
+    databases and settings), every window borrows it instead of
+    initilizing engine.
+
+    Methods:
+        *start - Run scenes one after another until game closes -> None
+        *get_scene - Build scene by its name in transitions table
+        *run_game - Run current scene, return name of the next one -> str
+        *play_scene - Play current scene until it closes
+        *next_level - Launch next level
+        *get_level - Return level class by its number, import levels
+                     on first call
+        *preload_next - Start preloading of level which can follow current
+                        window
+    '''
+    __slots__ = ['settings', 'level_number', 'hit_points', 'game', 'levels',
+                 'windows', 'runtime']
+
+    def __init__(self, settings: dict):
+        self.settings: dict = settings
+        self.runtime: Runtime = runtime
+        self.level_number: int = 1
+        self.hit_points: int = 10
+        self.game = None
+        self.levels: list = [None, *LEVELS]
+        self.windows: dict = {
+            'main_window': [MainWindow, self.settings],
+            'lose': [LoseWindow, self.settings],
+            'end': [EndWindow, self.settings],
+            'shop_window': [ShopWindow, settings_manager]}
+
+    def start(self, mode: str = 'main_window') -> None:
+        '''
+        Arguments:
+            mode - type of first window: str
+        '''
+        scene = mode
+        while scene is not None:
+            self.game = self.get_scene(scene)
+            if startup.finished:
+                self.preload_next()
+            else:
+                startup.mark('window')
+                # First window is shown before the next level is loaded
+                startup.defer(self.preload_next)
+            scene = self.run_game()
+
+    def get_scene(self, scene: str):
+        if scene in ['lose', 'level']:
+            self.level_number = 1
+        if scene == 'win':
+            return self.next_level()
+        if scene == 'level':
+            return self.get_level(1)(self.settings, 10)
+        return self.windows[scene][0](*self.windows[scene][1:])
+
+    def next_level(self):
+        if self.level_number in range(1, len(self.levels) - 1):
+            self.level_number += 1
+            start = perf_counter()
+            # Usually everything is decoded while previous level was played
+            waited = preloader.wait()
+            level = self.get_level(self.level_number)(
+                self.settings, self.hit_points)
+            logging.info(
+                f'Level {self.level_number} transition: '
+                f'{(perf_counter() - start) * 1000:.1f} ms, '
+                f'{waited:.1f} ms of them waiting for preloader')
+            return level
+        self.level_number = 1
+        return self.windows['end'][0](*self.windows['end'][1:])
+
+    def preload_next(self) -> None:
+        # Menus and lose window lead to the first level
+        number = self.level_number + 1 if isinstance(self.game, Level) else 1
+        if number < len(self.levels):
+            self.get_level(number).preload(self.settings)
+
+    def get_level(self, number: int) -> type:
+        import Levels
+
+        return getattr(Levels, self.levels[number])
+
+    def run_game(self) -> str:
+        start_mode: str = self.game.mode
+        self.play_scene()
+        mode: str = self.game.mode
+        if mode in ['win', 'level', 'replay']:
+            try:
+                self.hit_points: int = self.game.santa.hit_points
+            except AttributeError:
+                self.hit_points = 10
+        # Finished scene is released before the next one is built, so only
+        # one scene with its sprites and surfaces is alive at once
+        self.game.release()
+        self.game = None
+        if mode == start_mode:
+            return None
+        return TRANSITIONS[mode]
+
+    def play_scene(self) -> None:
+        self.game.game_cycle()
+
+
+def count_launch():
+    # Written by settings thread, launch doesn't wait for disk
+    settings_manager.save(
+        {'number_of_games': settings_manager.get('number_of_games') + 1})
+
+
+settings_manager = runtime.get_settings(SETTINGS_FILE)
+startup.mark('settings')
+
+
+def main() -> int:
+    parser = ArgumentParser(description='Christmas Adventures')
+    parser.add_argument('--startup-profile', action='store_true',
+                        help='Show main menu, print time to its first frame '
+                             'by phases and quit')
+    parser.add_argument('--startup-budget', type=float,
+                        help='Exit code is 1 if first frame took longer, ms')
+    arguments = parser.parse_args()
+    startup.profiling = arguments.startup_profile
+    init()
+    # Edited sprites are read from their files instead of stale archive
+    archive_loader.check_files = bool(settings_manager.get('check_sprites'))
+    if not startup.profiling:
+        startup.defer(count_launch)
+    game_manager = GameManager(settings_manager.settings)
+    try:
+        game_manager.start('main_window')
+    except Exception as error:
+        # writing error info in ./error_log.txt
+        logging.exception(error, exc_info=True)
+    game_manager.runtime.close()
+    pygame.quit()
+    if startup.profiling:
+        return 0 if startup.print_report(arguments.startup_budget) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+'''Broadphase structures for player collision checks'''
+import pygame
+
+
+class SpatialHash:
+    '''Uniform grid which maps cells to sprites whose rects touch them
+
+    Initilization arguments:
+        *cell_size - Width and height of one grid cell in pixels: int
+
+    Methods:
+        *insert - Add sprite to every cell under its rect
+        *remove - Remove sprite from grid
+        *query - Return sprites from cells under rect in insertion order
+    '''
+    __slots__ = ['cell_size', 'cells', 'sprite_cells', 'order', 'counter']
+
+    def __init__(self, cell_size: int = 64):
+        self.cell_size: int = cell_size
+        self.cells: dict = {}
+        self.sprite_cells: dict = {}
+        self.order: dict = {}
+        self.counter: int = 0
+
+    def get_cells(self, rect: pygame.Rect) -> list:
+        size = self.cell_size
+        columns = range(rect.left // size, (rect.right - 1) // size + 1)
+        rows = range(rect.top // size, (rect.bottom - 1) // size + 1)
+        return [(x, y) for x in columns for y in rows]
+
+    def insert(self, sprite: pygame.sprite.Sprite) -> None:
+        if sprite in self.sprite_cells:
+            self.remove(sprite)
+        cells = self.get_cells(sprite.rect)
+        for cell in cells:
+            self.cells.setdefault(cell, []).append(sprite)
+        self.sprite_cells[sprite] = cells
+        self.order[sprite] = self.counter
+        self.counter += 1
+
+    def remove(self, sprite: pygame.sprite.Sprite) -> None:
+        for cell in self.sprite_cells.pop(sprite, []):
+            cell_sprites = self.cells[cell]
+            cell_sprites.remove(sprite)
+            if not cell_sprites:
+                del self.cells[cell]
+        self.order.pop(sprite, None)
+
+    def query(self, rect: pygame.Rect) -> list:
+        cells = self.cells
+        candidates = {}
+        for cell in self.get_cells(rect):
+            for sprite in cells.get(cell, ()):
+                candidates[sprite] = True
+        if len(candidates) < 2:
+            return list(candidates)
+        return sorted(candidates, key=self.order.__getitem__)
+
+
+class CollisionGroup(pygame.sprite.Group):
+    '''Sprite group which finds mask collisions through spatial hash
+
+    Sprites are expected to stay in place after they are added. If bounds
+    are given, masks of static sprites are also baked into one mask, so
+    "is there a hit" costs one Mask.overlap. Baked mask starts with given
+    bounds and grows to union of them and rects of static sprites, so
+    sprites which reach out of level (borders) are baked whole. Sprites
+    with "dynamic" attribute set to True (balls and other moving traps)
+    are kept apart and are checked one by one.
+
+    Initilization arguments:
+        *sprites - Sprites to add: pygame.sprite.Sprite
+        *bounds - Starting rect of baked mask in level coordinates,
+                  None - don't bake: pygame.Rect
+        *cell_size - Size of spatial hash cell in pixels: int
+
+    Methods:
+        *is_collide - Check is sprite mask overlaps with any group sprite
+        *collide - Return first sprite which mask overlaps with given
+                   sprite or None
+    '''
+
+    def __init__(self, *sprites, bounds: pygame.Rect = None,
+                 cell_size: int = 64):
+        self.index: SpatialHash = SpatialHash(cell_size)
+        self.dynamic_sprites: list = []
+        self.mask: pygame.mask.Mask = None
+        # Rect of baked mask in level coordinates
+        self.bounds: pygame.Rect = None
+        if bounds is not None:
+            self.bounds = pygame.Rect(bounds)
+            self.mask = pygame.mask.Mask(self.bounds.size)
+        super().__init__(*sprites)
+
+    def get_offset(self, sprite: pygame.sprite.Sprite) -> tuple:
+        return (sprite.rect.x - self.bounds.x, sprite.rect.y - self.bounds.y)
+
+    def fit(self, sprite: pygame.sprite.Sprite) -> None:
+        rect = pygame.Rect(sprite.rect.topleft, sprite.mask.get_size())
+        if self.bounds.contains(rect):
+            return
+        bounds = self.bounds.union(rect)
+        mask = pygame.mask.Mask(bounds.size)
+        mask.draw(self.mask, (self.bounds.x - bounds.x,
+                              self.bounds.y - bounds.y))
+        self.bounds = bounds
+        self.mask = mask
+
+    def add_internal(self, sprite, layer=None) -> None:
+        super().add_internal(sprite, layer)
+        if getattr(sprite, 'dynamic', False):
+            self.dynamic_sprites.append(sprite)
+            return
+        self.index.insert(sprite)
+        if self.mask is not None:
+            self.fit(sprite)
+            self.mask.draw(sprite.mask, self.get_offset(sprite))
+
+    def remove_internal(self, sprite) -> None:
+        super().remove_internal(sprite)
+        if sprite in self.dynamic_sprites:
+            self.dynamic_sprites.remove(sprite)
+            return
+        self.index.remove(sprite)
+        if self.mask is not None:
+            # Erased bits may be shared with neighbours, so draw them back
+            self.mask.erase(sprite.mask, self.get_offset(sprite))
+            for other in self.index.query(sprite.rect):
+                self.mask.draw(other.mask, self.get_offset(other))
+
+    def is_static_collide(self, sprite: pygame.sprite.Sprite) -> bool:
+        if self.mask is None:
+            return self.collide_static(sprite) is not None
+        return self.mask.overlap(sprite.mask,
+                                 self.get_offset(sprite)) is not None
+
+    def is_collide(self, sprite: pygame.sprite.Sprite) -> bool:
+        if self.is_static_collide(sprite):
+            return True
+        return self.collide_dynamic(sprite) is not None
+
+    def collide(self, sprite: pygame.sprite.Sprite):
+        if self.mask is None or self.is_static_collide(sprite):
+            other = self.collide_static(sprite)
+            if other is not None:
+                return other
+        return self.collide_dynamic(sprite)
+
+    def collide_static(self, sprite: pygame.sprite.Sprite):
+        rect = sprite.rect
+        collide_mask = pygame.sprite.collide_mask
+        for other in self.index.query(rect):
+            if rect.colliderect(other.rect) and collide_mask(sprite, other):
+                return other
+        return None
+
+    def collide_dynamic(self, sprite: pygame.sprite.Sprite):
+        rect = sprite.rect
+        collide_mask = pygame.sprite.collide_mask
+        for other in self.dynamic_sprites:
+            if rect.colliderect(other.rect) and collide_mask(sprite, other):
+                return other
+        return None
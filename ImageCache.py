@@ -0,0 +1,157 @@
+'''Pre-decoded images and collision masks cached on disk between launches
+
+Image file (or its archive entry) is hashed and its decoded pixels are
+saved to cache/images/<hash>.pixels, bits of its collision mask to
+cache/images/<hash>.mask. Next launch reads them instead of decoding PNG
+and building mask from Surface. Changed image has another hash, so its old
+cache files are just not used any more.
+
+Not cached:
+    pixels of big images which PNG is much smaller than pixels (flat
+    backgrounds and walls), reading them would cost slow disk more than
+    decoding, small image costs one read anyway;
+    pixels of images with colorkey, raw pixels don't keep it;
+    pixels of archive entries which are decoded pixels already.
+'''
+from hashlib import sha1
+from os import fstat, makedirs, replace
+from os.path import abspath, dirname, normpath
+from struct import Struct
+from threading import get_ident
+
+import pygame
+
+from Archive import archive_loader, decode, get_pixel_format
+
+CACHE_VERSION = 1
+# version, width, height, pixel format ('RGB ' or 'RGBA')
+HEADER = Struct('<HII4s')
+# Pixels bigger than this times their PNG and than SMALL_SIZE bytes are
+# decoded every time
+MAX_EXPANSION = 16
+SMALL_SIZE = 64 * 1024
+
+
+class ImageCache:
+    '''Process-wide disk cache of decoded images and masks
+
+    Used from preloader thread too, files are written aside and moved, so
+    half-written file is never read.
+
+    Initilization arguments:
+        *folder - Folder of cache files: str
+
+    Methods:
+        *load_image - Return decoded image, from cache if it is there
+        *load_mask - Return mask of image, from cache if it is there
+        *get_key - Return hash of image file
+        *read - Return cache file with valid version, None if there is no
+                such file or it can't be read
+        *stats - Return hit/miss counters
+    '''
+    __slots__ = ['folder', 'enabled', 'keys', 'hits', 'misses']
+
+    def __init__(self, folder: str):
+        self.folder: str = folder
+        self.enabled: bool = True
+        # Path: hash of its data, mask is usually loaded after image
+        self.keys: dict = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def load_image(self, path: str) -> pygame.Surface:
+        if not self.enabled:
+            return archive_loader.load_image(path)
+        data, data_format, size = archive_loader.read(path)
+        if data_format != 'png':
+            return decode(data, data_format, size, path)
+        cache_path = f'{self.folder}/{self.get_key(path, data)}.pixels'
+        cache = self.read(cache_path)
+        if cache is not None:
+            _, width, height, pixel_format = HEADER.unpack_from(cache)
+            pixel_format = pixel_format.decode().strip()
+            # Truncated file is a miss, it is written again below
+            if pixel_format in ('RGB', 'RGBA') and len(cache) - HEADER.size \
+                    == width * height * len(pixel_format):
+                self.hits += 1
+                # Surface uses read buffer as its pixels, without copy
+                return pygame.image.frombuffer(
+                    memoryview(cache)[HEADER.size:], (width, height),
+                    pixel_format)
+        self.misses += 1
+        surface = decode(data, data_format, size, path)
+        pixel_format = get_pixel_format(surface)
+        width, height = surface.get_size()
+        pixels_size = width * height * len(pixel_format or '')
+        if pixel_format is not None and (pixels_size <= SMALL_SIZE or
+                                         pixels_size <= len(data) *
+                                         MAX_EXPANSION):
+            self.write(cache_path, HEADER.pack(
+                CACHE_VERSION, width, height,
+                pixel_format.ljust(4).encode()),
+                pygame.image.tobytes(surface, pixel_format))
+        return surface
+
+    def load_mask(self, path: str,
+                  surface: pygame.Surface) -> pygame.mask.Mask:
+        if not self.enabled:
+            return pygame.mask.from_surface(surface)
+        cache_path = f'{self.folder}/{self.get_key(path)}.mask'
+        cache = self.read(cache_path)
+        if cache is not None and \
+                HEADER.unpack_from(cache)[1:3] == surface.get_size():
+            mask = pygame.mask.Mask(surface.get_size())
+            bits = memoryview(mask).cast('B')
+            # Mask buffer is its bit words, size of word depends on platform
+            if len(cache) - HEADER.size == bits.nbytes:
+                self.hits += 1
+                bits[:] = memoryview(cache)[HEADER.size:]
+                return mask
+        self.misses += 1
+        mask = pygame.mask.from_surface(surface)
+        self.write(cache_path, HEADER.pack(CACHE_VERSION, *mask.get_size(),
+                                           b'MASK'), memoryview(mask))
+        return mask
+
+    def get_key(self, path: str, data: bytes = None) -> str:
+        path = normpath(path)
+        if data is None:
+            key = self.keys.get(path)
+            if key is not None:
+                return key
+            data = archive_loader.read(path)[0]
+        key = self.keys[path] = sha1(data).hexdigest()
+        return key
+
+    def read(self, cache_path: str) -> bytearray:
+        try:
+            with open(cache_path, 'rb') as cache_file:
+                # Writable buffer, Surface can draw on pixels it wraps
+                cache = bytearray(fstat(cache_file.fileno()).st_size)
+                cache_file.readinto(cache)
+        except OSError:
+            # Missing or unreadable file is a miss, cache is only a speedup
+            return None
+        if len(cache) < HEADER.size or \
+                HEADER.unpack_from(cache)[0] != CACHE_VERSION:
+            return None
+        return cache
+
+    def write(self, cache_path: str, header: bytes, data) -> None:
+        # Preloader thread can write the same file as main thread
+        temporary_path = f'{cache_path}.{get_ident()}.tmp'
+        try:
+            makedirs(self.folder, exist_ok=True)
+            with open(temporary_path, 'wb') as cache_file:
+                cache_file.write(header)
+                cache_file.write(data)
+            replace(temporary_path, cache_path)
+        except OSError:
+            # Cache is only a speedup, game works from read-only folder
+            pass
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+image_cache = ImageCache(f'{dirname(abspath(__file__))}/cache/images')
@@ -0,0 +1,163 @@
+'''Level files (assets/levels/*.json) and their compiled cache
+
+Level file describes objects of level, every object kind is listed once
+with all its positions:
+    {"name": "FirstLevel", "difficulty": "easy", "borders": true,
+     "objects": [{"type": "brick", "positions": [[200, 400], ...]},
+                 {"type": "ball", "x": [61, 189], "random_y": [-100, -30]},
+                 ...],
+     "rules": {"blindness": {"period": 200, "duration": 50}}}
+
+After the first build level saves compiled cache to
+cache/levels/<name>-<hash>.cache: object runs and rendered static layer,
+so cached load skips parsing and decoding of level background. Cache is
+keyed by hash of level file and is checked against size and mtime of
+every image it was rendered from. Collision masks are not cached, sprite
+masks are needed by narrowphase anyway and drawing them into group mask
+is faster than decoding stored level-sized masks.
+'''
+import json
+import pickle
+from hashlib import sha1
+from os import listdir, makedirs, remove, replace, stat
+from os.path import exists, join
+
+import pygame
+
+CACHE_VERSION = 1
+# Errors of unpickling truncated or corrupt cache, or cache of renamed
+# class, such cache is ignored and level file is parsed
+CACHE_ERRORS = (OSError, EOFError, pickle.UnpicklingError, AttributeError,
+                ImportError, IndexError, KeyError, TypeError, ValueError)
+# Kind of static object: (image path in assets/sprites, sprite groups)
+STATIC_OBJECTS = {
+    'floor': ('wall/wall_800x60.png', ('wall',)),
+    'wall': ('wall/wall_60x595.png', ('wall',)),
+    'brick': ('brick/brick.png', ('wall', 'brick')),
+    'exit': ('icons/reward/trophey.png', ('exit',)),
+    'thorn': ('traps/thorns/thorn.png', ('trap',)),
+    'thorn_left': ('traps/thorns/thorn_left.png', ('trap',)),
+    'thorn_right': ('traps/thorns/thorn_right.png', ('trap',)),
+    'thorn_down': ('traps/thorns/thorn_down.png', ('trap',)),
+    'thorns5x': ('traps/thorns/thorns_x5.png', ('trap',))}
+# Static objects of "borders": true
+BORDERS = [('floor', [[0, 0], [0, 470]]), ('wall', [[0, 0], [750, 0]])]
+# Kind of animated trap: count of frames
+ANIMATED_TRAPS = {'vulkan': 26, 'chainsaw': 6, 'box_glover': 36}
+
+
+class LevelLayout:
+    '''Objects and rules of one level file
+
+    Initilization arguments:
+        *name - Level file name without extension: str
+        *data - Parsed level file: dict
+        *source_hash - Hash of level file: str
+
+    Methods:
+        *load - Return layout of level file, compiled one if cache is valid
+                (static method)
+        *is_compiled - Check is static layer loaded from cache
+        *get_layer - Return static layer from cache
+        *compile - Save rendered static layer to cache
+    '''
+    __slots__ = ['name', 'level_name', 'difficulty', 'static', 'animated',
+                 'balls', 'rules', 'source_hash', 'layer', 'size']
+
+    def __init__(self, name: str, data: dict, source_hash: str):
+        self.name: str = name
+        self.level_name: str = data['name']
+        self.difficulty: str = data.get('difficulty', '')
+        self.rules: dict = data.get('rules', {})
+        self.source_hash: str = source_hash
+        # (kind, positions) runs of static sprites in drawing order
+        self.static: list = []
+        self.animated: list = []
+        self.balls: list = []
+        if data.get('borders'):
+            self.static += BORDERS
+        for level_object in data['objects']:
+            kind = level_object['type']
+            if kind == 'ball':
+                self.balls += [(x, (*level_object['random_y'],))
+                               for x in level_object['x']]
+            elif kind in ANIMATED_TRAPS:
+                self.animated += [(kind, position)
+                                  for position in level_object['positions']]
+            elif kind in STATIC_OBJECTS:
+                self.static.append((kind, level_object['positions']))
+            else:
+                raise ValueError(f'Unknown level object: {kind}')
+        self.layer: bytes = None
+        self.size: tuple = None
+
+    @staticmethod
+    def load(root_path: str, name: str, use_cache: bool = True):
+        with open(f'{root_path}/assets/levels/{name}.json', 'rb') as file:
+            source = file.read()
+        source_hash = sha1(source).hexdigest()[:16]
+        cache_path = get_cache_path(root_path, name, source_hash)
+        if use_cache and exists(cache_path):
+            try:
+                with open(cache_path, 'rb') as cache_file:
+                    cache = pickle.load(cache_file)
+                if is_cache_valid(root_path, cache):
+                    return cache['layout']
+            except CACHE_ERRORS:
+                pass
+        return LevelLayout(name, json.loads(source), source_hash)
+
+    def is_compiled(self) -> bool:
+        return self.layer is not None
+
+    def get_layer(self) -> pygame.Surface:
+        layer = pygame.image.frombytes(self.layer, self.size, 'RGB')
+        if pygame.display.get_surface() is None:
+            return layer
+        return layer.convert()
+
+    def compile(self, root_path: str, layer: pygame.Surface,
+                dependencies: list) -> None:
+        self.size = layer.get_size()
+        self.layer = pygame.image.tobytes(layer, 'RGB')
+        cache = {'version': CACHE_VERSION, 'layout': self,
+                 'dependencies': [
+                     (path, *get_file_stamp(root_path + path))
+                     for path in dependencies]}
+        directory = f'{root_path}/cache/levels'
+        makedirs(directory, exist_ok=True)
+        # Caches of older versions of level file are useless now
+        for file_name in listdir(directory):
+            if file_name.startswith(f'{self.name}-'):
+                remove(join(directory, file_name))
+        cache_path = get_cache_path(root_path, self.name, self.source_hash)
+        # Written aside and moved, killed game never leaves half a cache
+        temporary_path = f'{cache_path}.tmp'
+        with open(temporary_path, 'wb') as cache_file:
+            pickle.dump(cache, cache_file, pickle.HIGHEST_PROTOCOL)
+        replace(temporary_path, cache_path)
+
+
+def get_animation_paths(root_path: str, kind: str) -> list:
+    folder = f'{root_path}/assets/sprites/traps/{kind}/'
+    return [f'{folder}{kind}_{index}.png'
+            for index in range(ANIMATED_TRAPS[kind])]
+
+
+def get_cache_path(root_path: str, name: str, source_hash: str) -> str:
+    return f'{root_path}/cache/levels/{name}-{source_hash}.cache'
+
+
+def get_file_stamp(path: str) -> tuple:
+    file_stat = stat(path)
+    return file_stat.st_size, file_stat.st_mtime_ns
+
+
+def is_cache_valid(root_path: str, cache: dict) -> bool:
+    if cache.get('version') != CACHE_VERSION:
+        return False
+    for path, size, mtime in cache['dependencies']:
+        if not exists(root_path + path) or \
+                get_file_stamp(root_path + path) != (size, mtime):
+            return False
+    return True
@@ -0,0 +1,78 @@
+'''Game loop with fixed simulation step and independent rendering'''
+from time import perf_counter
+
+import pygame
+
+from Preload import preloader
+from Profiler import EVENTS, PRELOAD, UPDATE, profiler
+from Startup import startup
+
+
+class GameLoop:
+    '''Drives scene: simulation runs with fixed step, rendering runs as fast
+    as fps limit allows, so game speed doesn't depend on frame rate
+
+    Initilization arguments:
+        *clock - Clock which limits frame rate: pygame.time.Clock
+        *tick_rate - Simulation steps per second: int
+        *fps - Max rendered frames per second, 0 - unlimited: int
+        *max_catch_up - Max game time in seconds simulated after one slow
+                        frame, rest of it is dropped: float
+
+    Scene methods used by loop:
+        *process_events(events) - Handle events, return False to stop
+        *tick() - Advance simulation by one tick, return False to stop
+        *render(alpha, time_delta) - Draw frame, alpha is part of tick
+                                     passed since last step (0 - 1)
+
+    Methods:
+        *run - Run scene until it stops
+
+    Every frame is timed by Profiler.profiler, render phases are marked
+    by scene itself. After render finished jobs of Preload.preloader are
+    handled within its time budget. The first frame of process ends
+    Startup.startup profile and runs work deferred until it.
+    '''
+    __slots__ = ['clock', 'tick_rate', 'fps', 'max_catch_up', 'step_time',
+                 'ticks', 'frames']
+
+    def __init__(self, clock: pygame.time.Clock, tick_rate: int, fps: int,
+                 max_catch_up: float = 0.25):
+        self.clock: pygame.time.Clock = clock
+        self.tick_rate: int = tick_rate
+        self.fps: int = fps
+        self.max_catch_up: float = max_catch_up
+        self.step_time: float = 1 / tick_rate
+        self.ticks: int = 0
+        self.frames: int = 0
+
+    def run(self, scene) -> None:
+        step_time = self.step_time
+        accumulator = 0.0
+        previous_time = perf_counter()
+        running = True
+        profiler.begin_frame()
+        while running:
+            current_time = perf_counter()
+            frame_time = current_time - previous_time
+            previous_time = current_time
+            accumulator += min(frame_time, self.max_catch_up)
+            events = pygame.event.get()
+            profiler.process_events(events)
+            running = scene.process_events(events)
+            profiler.mark(EVENTS)
+            while running and accumulator >= step_time:
+                running = scene.tick()
+                accumulator -= step_time
+                self.ticks += 1
+            profiler.mark(UPDATE)
+            if running:
+                scene.render(accumulator / step_time, frame_time)
+                self.frames += 1
+                if not startup.finished:
+                    running = startup.first_frame()
+            preloader.poll()
+            profiler.mark(PRELOAD)
+            profiler.end_frame()
+            self.clock.tick(self.fps)
+            profiler.begin_frame()
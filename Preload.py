@@ -0,0 +1,174 @@
+'''Background preloading of assets of the next scene while current one runs
+
+Worker thread only reads and decodes images (or reads them and their masks
+from image cache): pygame.image.load releases GIL while decoding, so
+running scene keeps its frame rate. Decoded images
+are converted to display format and put to asset store on main thread by
+poll, which is called once per frame and stops after given time budget.
+Only frames of animations are decoded on worker: conversion and masks
+hold GIL, so their sheet is drawn, converted and masked on main thread,
+one frame per step of poll. On Linux worker runs with the lowest priority,
+so on a single core it decodes in time which frames of running scene
+leave free.
+Sounds are not decoded here: SDL_mixer holds audio lock while decoding,
+so every Sound.play of running scene would wait for it (Audio.sound_bank
+decodes only short effects, on first use).
+'''
+import os
+import sys
+from collections import deque
+from functools import partial
+from os.path import normpath
+from queue import Empty, SimpleQueue
+from threading import Thread, get_native_id
+from time import perf_counter
+
+import pygame
+
+from Assets import asset_store
+from ImageCache import image_cache
+
+
+class Preloader:
+    '''Queue of decode jobs done by one worker thread
+
+    Job is a function called on worker thread and a callback called with
+    its result on main thread. Callback can return generator, then job is
+    finished by poll step by step, one step is resumed while budget lasts.
+    Assets which are already loaded or queued are skipped. Failed jobs are
+    dropped, scene loads such assets itself.
+
+    Initilization arguments:
+        *budget - Max time of main thread callbacks per poll in ms: float
+
+    Methods:
+        *submit - Add job to worker queue
+        *load_images - Decode images and store given variants of them
+        *load_animation - Decode frames of animation, build it and add it
+                          to atlas on main thread
+        *build_animation - Build animation of decoded frames and add it to
+                           atlas (generator)
+        *step - Resume next step of job callback
+        *poll - Run callbacks of finished jobs within time budget
+        *wait - Finish all jobs, return waited time in ms, stop if worker
+                died
+        *is_ready - Check are all jobs finished
+    '''
+    __slots__ = ['budget', 'jobs', 'results', 'queued', 'steps', 'thread']
+
+    def __init__(self, budget: float = 2.0):
+        self.budget: float = budget
+        self.jobs: SimpleQueue = SimpleQueue()
+        self.results: SimpleQueue = SimpleQueue()
+        # Keys of jobs which callbacks didn't run yet
+        self.queued: set = set()
+        # (job key, generator) of callbacks which are not finished yet
+        self.steps: deque = deque()
+        self.thread: Thread = None
+
+    def submit(self, key: tuple, function, argument, callback) -> None:
+        if key in self.queued:
+            return
+        self.queued.add(key)
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = Thread(target=self.work, name='preloader',
+                                 daemon=True)
+            self.thread.start()
+        self.jobs.put((key, function, argument, callback))
+
+    def work(self) -> None:
+        # Priority of one thread is set by its id only on Linux, elsewhere
+        # the id would be taken for a process
+        if sys.platform == 'linux':
+            os.setpriority(os.PRIO_PROCESS, get_native_id(), 19)
+        while True:
+            key, function, argument, callback = self.jobs.get()
+            try:
+                result = function(argument)
+            except Exception:
+                # Any failure only drops its job, worker keeps running, or
+                # wait would block on result which never comes
+                result = None
+            self.results.put((key, callback, result))
+
+    def load_images(self, paths: list, variants: tuple = ('alpha',)) -> None:
+        for path in map(normpath, paths):
+            if all(asset_store.is_cached(path, variant)
+                   for variant in variants):
+                continue
+            self.submit(('image', path), image_cache.load_image, path,
+                        partial(self.store_image, path, variants))
+
+    def store_image(self, path: str, variants: tuple,
+                    surface: pygame.Surface) -> None:
+        for variant in variants:
+            if variant == 'mask':
+                asset_store.mask(path)
+            else:
+                asset_store.add(path, surface, variant)
+
+    def load_animation(self, name: str, paths: list) -> None:
+        # Animations are imported with the first level, not with main menu
+        from Animations import atlas
+
+        if name in atlas.animations:
+            return
+        self.submit(('animation', name), load_frames, paths,
+                    partial(self.build_animation, name, paths))
+
+    def build_animation(self, name: str, paths: list, images: list):
+        from Animations import Animation, atlas
+
+        atlas.add(name, (yield from Animation.build(paths, images)))
+
+    def finish(self, key: tuple, callback, result) -> None:
+        steps = None if result is None else callback(result)
+        if steps is None:
+            self.queued.discard(key)
+        else:
+            self.steps.append((key, steps))
+
+    def step(self) -> None:
+        key, steps = self.steps[0]
+        try:
+            next(steps)
+        except StopIteration:
+            self.steps.popleft()
+            self.queued.discard(key)
+
+    def poll(self, budget: float = None) -> None:
+        budget = self.budget if budget is None else budget
+        end = perf_counter() + budget / 1000
+        while self.queued and perf_counter() < end:
+            if self.steps:
+                self.step()
+                continue
+            try:
+                self.finish(*self.results.get_nowait())
+            except Empty:
+                return
+
+    def wait(self) -> float:
+        start = perf_counter()
+        while self.queued:
+            if self.steps:
+                self.step()
+                continue
+            try:
+                self.finish(*self.results.get(timeout=0.1))
+            except Empty:
+                if not self.thread.is_alive():
+                    # Jobs of dead worker never finish, scene loads them
+                    self.queued.clear()
+                    break
+        return (perf_counter() - start) * 1000
+
+    def is_ready(self) -> bool:
+        return not self.queued
+
+
+def load_frames(paths: list) -> list:
+    return [image_cache.load_image(path) for path in paths]
+
+
+preloader = Preloader()
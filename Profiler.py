@@ -0,0 +1,180 @@
+'''Always-on frame profiler with on-screen overlay and CSV/JSON dumps
+
+Game loop and windows call profiler.mark(phase) after every hot phase of
+a frame, mark only reads monotonic clock and adds to one float, so it is
+cheap enough to stay in release builds. Finished frames are kept in
+fixed-size ring buffers.
+
+Keys (while any window is open):
+    F3 - Show or hide overlay with frame time graph and phase averages
+    F4 - Write buffers to profiles/profile-<time>.csv and .json
+'''
+import json
+from array import array
+from os import makedirs
+from time import perf_counter, strftime
+
+import pygame
+
+PHASES = ('events', 'update', 'collisions', 'draw', 'ui', 'flip', 'preload')
+EVENTS, UPDATE, COLLISIONS, DRAW, UI, FLIP, PRELOAD = range(len(PHASES))
+PHASE_COLORS = ((120, 200, 255), (120, 255, 120), (255, 220, 90),
+                (255, 140, 60), (200, 120, 255), (255, 90, 90),
+                (160, 160, 160))
+# Keys are checked on KEYUP, because key repeat floods KEYDOWN events
+TOGGLE_KEY = pygame.K_F3
+DUMP_KEY = pygame.K_F4
+
+
+class FrameProfiler:
+    '''Per-phase frame timer with ring buffers of last frames
+
+    Initilization arguments:
+        *capacity - Count of last frames kept in buffers: int
+        *graph_size - Size of overlay graph (w, h) in pixels: tuple
+        *graph_scale - Frame time (ms) at the top of graph: float
+
+    Methods:
+        *begin_frame - Start timing of new frame
+        *mark - Add time passed since previous mark to phase
+        *end_frame - Store timings of current frame to buffers
+        *process_events - Toggle overlay or dump buffers by hotkeys
+        *toggle - Show or hide overlay
+        *get_frames - Return stored frames from oldest to newest
+        *get_averages - Return average ms of frame and every phase
+        *draw - Draw overlay on screen (if it is visible)
+        *dump - Write buffers to .csv or .json file
+        *dump_all - Write buffers to timestamped .csv and .json files
+        *clear - Drop stored frames
+    '''
+    __slots__ = ['capacity', 'frame_times', 'phase_times', 'current',
+                 'frame_start', 'last_mark', 'index', 'count', 'visible',
+                 'graph_size', 'graph_scale', 'font']
+
+    def __init__(self, capacity: int = 600, graph_size: tuple = (240, 80),
+                 graph_scale: float = 50.0):
+        self.capacity: int = capacity
+        self.frame_times: array = array('d', bytes(8 * capacity))
+        self.phase_times: list = [array('d', bytes(8 * capacity))
+                                  for _ in PHASES]
+        self.current: list = [0.0] * len(PHASES)
+        self.frame_start: float = perf_counter()
+        self.last_mark: float = self.frame_start
+        self.index: int = 0
+        self.count: int = 0
+        self.visible: bool = False
+        self.graph_size: tuple = graph_size
+        self.graph_scale: float = graph_scale
+        self.font: pygame.font.Font = None
+
+    def begin_frame(self) -> None:
+        self.frame_start = self.last_mark = perf_counter()
+
+    def mark(self, phase: int) -> None:
+        now = perf_counter()
+        self.current[phase] += now - self.last_mark
+        self.last_mark = now
+
+    def end_frame(self) -> None:
+        now = perf_counter()
+        index = self.index
+        self.frame_times[index] = (now - self.frame_start) * 1000
+        current = self.current
+        for phase, phase_times in enumerate(self.phase_times):
+            phase_times[index] = current[phase] * 1000
+            current[phase] = 0.0
+        self.index = (index + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+        self.frame_start = self.last_mark = now
+
+    def process_events(self, events: list) -> None:
+        for event in events:
+            if event.type != pygame.KEYUP:
+                continue
+            if event.key == TOGGLE_KEY:
+                self.toggle()
+            elif event.key == DUMP_KEY:
+                self.dump_all()
+
+    def toggle(self) -> None:
+        self.visible = not self.visible
+
+    def get_order(self) -> list:
+        start = (self.index - self.count) % self.capacity
+        return [(start + offset) % self.capacity
+                for offset in range(self.count)]
+
+    def get_frames(self) -> list:
+        phase_times = self.phase_times
+        return [[self.frame_times[index]] +
+                [times[index] for times in phase_times]
+                for index in self.get_order()]
+
+    def get_averages(self) -> dict:
+        count = self.count or 1
+        averages = {'frame': sum(self.frame_times) / count}
+        for phase, times in zip(PHASES, self.phase_times):
+            averages[phase] = sum(times) / count
+        return averages
+
+    def draw(self, screen: pygame.Surface) -> None:
+        if not self.visible:
+            return
+        if self.font is None:
+            self.font = pygame.font.Font(None, 18)
+        width, height = self.graph_size
+        line_height = self.font.get_linesize()
+        overlay = pygame.Surface(
+            [width, height + line_height * (len(PHASES) + 1)])
+        overlay.set_alpha(200)
+        scale = height / self.graph_scale
+        order = self.get_order()[-width:]
+        x = width - len(order)
+        for index in order:
+            frame_height = min(int(self.frame_times[index] * scale), height)
+            pygame.draw.line(overlay, (200, 200, 200),
+                             (x, height - 1), (x, height - frame_height))
+            x += 1
+        # Line of 60 fps budget
+        budget_y = height - int(1000 / 60 * scale)
+        pygame.draw.line(overlay, (255, 60, 60), (0, budget_y),
+                         (width, budget_y))
+        averages = self.get_averages()
+        lines = [(f'frame {averages["frame"]:.2f} ms', (255, 255, 255))]
+        lines += [(f'{phase} {averages[phase]:.2f} ms', color)
+                  for phase, color in zip(PHASES, PHASE_COLORS)]
+        overlay.blits([(self.font.render(text, True, color),
+                        (4, height + number * line_height))
+                       for number, (text, color) in enumerate(lines)], False)
+        screen.blit(overlay, (screen.get_width() - width - 10, 10))
+
+    def dump(self, path: str) -> None:
+        frames = self.get_frames()
+        if path.endswith('.json'):
+            with open(path, 'w', encoding='utf-8') as dump_file:
+                json.dump({'columns': ['frame', *PHASES],
+                           'unit': 'ms', 'averages': self.get_averages(),
+                           'frames': frames}, dump_file)
+            return
+        with open(path, 'w', encoding='utf-8') as dump_file:
+            dump_file.write(','.join(['frame', *PHASES]) + '\n')
+            for frame in frames:
+                dump_file.write(','.join(f'{value:.4f}' for value in frame)
+                                + '\n')
+
+    def dump_all(self, directory: str = 'profiles') -> str:
+        makedirs(directory, exist_ok=True)
+        path = f'{directory}/profile-{strftime("%Y%m%d-%H%M%S")}'
+        self.dump(path + '.csv')
+        self.dump(path + '.json')
+        return path
+
+    def clear(self) -> None:
+        self.index = 0
+        self.count = 0
+        for times in (self.frame_times, *self.phase_times):
+            times[:] = array('d', bytes(8 * self.capacity))
+
+
+profiler = FrameProfiler()
@@ -0,0 +1,153 @@
+'''Dirty rectangle rendering: only changed parts of frame are redrawn and
+pushed to display'''
+import pygame
+
+# More dirty rects than this are merged into one bounding rect, it is
+# cheaper than merging and redrawing many small ones (particles)
+MAX_DIRTY_RECTS = 64
+# Part of screen area above which the whole screen is redrawn
+FULL_REDRAW_PART = 0.5
+
+
+class DrawList:
+    '''Surface stand-in which records blits of frame instead of drawing them
+
+    Initilization arguments:
+        *size - Size of target screen [w, h]: list
+
+    Methods:
+        *blit - Record one blit, return its rect
+        *blits - Record sequence of blits
+        *get_size, get_width, get_height, get_rect - Same as of screen
+        *clear - Drop recorded blits
+    '''
+    __slots__ = ['size', 'items']
+
+    def __init__(self, size: list):
+        self.size: tuple = (*size,)
+        self.items: list = []
+
+    def blit(self, source: pygame.Surface, dest, area=None,
+             special_flags: int = 0) -> pygame.Rect:
+        if area is None:
+            width, height = source.get_size()
+        else:
+            area = (*pygame.Rect(area),)
+            width, height = area[2], area[3]
+        rect = pygame.Rect(dest[0], dest[1], width, height)
+        self.items.append((source, rect, area, special_flags))
+        return rect
+
+    def blits(self, blit_sequence, doreturn: bool = True):
+        blit = self.blit
+        rects = [blit(*blit_args) for blit_args in blit_sequence
+                 if blit_args[0] is not None]
+        return rects if doreturn else None
+
+    def get_size(self) -> tuple:
+        return self.size
+
+    def get_width(self) -> int:
+        return self.size[0]
+
+    def get_height(self) -> int:
+        return self.size[1]
+
+    def get_rect(self) -> pygame.Rect:
+        return pygame.Rect((0, 0), self.size)
+
+    def clear(self) -> None:
+        self.items = []
+
+
+class DirtyRenderer:
+    '''Draws recorded frame on screen, redrawing only areas where blits
+    differ from previous frame
+
+    Blit is the same if it has the same source surface object, rect, area
+    and flags. Everything under dirty area is drawn again in recorded
+    order (clipped to it), so the first full-screen blit of background
+    works as its restore. Surfaces changed in place are not detected,
+    drawing code must blit new surface objects when image changes or
+    invalidate changed area.
+
+    Initilization arguments:
+        *target - Display surface: pygame.Surface
+
+    Methods:
+        *present - Draw recorded frame on target, return dirty rects
+        *get_dirty_rects - Return merged rects changed since last frame
+        *invalidate - Redraw given rect (the whole screen if it isn't
+                      given) on next frame
+    '''
+    __slots__ = ['target', 'canvas', 'previous', 'pixels', 'screen_rect',
+                 'damaged']
+
+    def __init__(self, target: pygame.Surface):
+        self.target: pygame.Surface = target
+        self.canvas: DrawList = DrawList(target.get_size())
+        self.screen_rect: pygame.Rect = target.get_rect()
+        # Blits of previous frame, they also keep its surfaces alive, so
+        # surface ids can't be reused by new surfaces
+        self.previous: dict = {}
+        # Rects of surfaces which were changed in place
+        self.damaged: list = []
+        self.pixels: int = 0
+
+    def present(self) -> list:
+        items = self.canvas.items
+        dirty_rects = self.get_dirty_rects(items)
+        target = self.target
+        item_rects = [item[1] for item in items]
+        for dirty_rect in dirty_rects:
+            target.set_clip(dirty_rect)
+            for index in dirty_rect.collidelistall(item_rects):
+                source, rect, area, special_flags = items[index]
+                target.blit(source, rect, area, special_flags)
+        target.set_clip(None)
+        self.pixels = sum(rect.w * rect.h for rect in dirty_rects)
+        self.canvas.clear()
+        return dirty_rects
+
+    def get_dirty_rects(self, items: list) -> list:
+        current = {(source, (*rect,), area, special_flags): rect
+                   for source, rect, area, special_flags in items}
+        previous = self.previous
+        self.previous = current
+        screen_rect = self.screen_rect
+        rects = [rect.clip(screen_rect) for key, rect in current.items()
+                 if key not in previous]
+        rects += [rect.clip(screen_rect) for key, rect in previous.items()
+                  if key not in current]
+        rects += [rect.clip(screen_rect) for rect in self.damaged]
+        self.damaged = []
+        rects = [rect for rect in rects if rect.w and rect.h]
+        if len(rects) > MAX_DIRTY_RECTS:
+            rects = [rects[0].unionall(rects)]
+        rects = self.merge(rects)
+        area = sum(rect.w * rect.h for rect in rects)
+        if area > screen_rect.w * screen_rect.h * FULL_REDRAW_PART:
+            return [screen_rect.copy()]
+        return rects
+
+    def merge(self, rects: list) -> list:
+        # Overlapping rects are joined, so no pixel is drawn twice
+        merged = []
+        while rects:
+            rect = rects.pop()
+            index = rect.collidelist(rects)
+            while index != -1:
+                rect.union_ip(rects.pop(index))
+                index = rect.collidelist(rects)
+            overlap = rect.collidelist(merged)
+            if overlap != -1:
+                rects.append(rect.union(merged.pop(overlap)))
+                continue
+            merged.append(rect)
+        return merged
+
+    def invalidate(self, rect: pygame.Rect = None) -> None:
+        if rect is None:
+            self.previous = {}
+        else:
+            self.damaged.append(pygame.Rect(rect))
@@ -0,0 +1,196 @@
+'''Recording of level runs and their playback
+
+Replay file layout (little endian):
+    header - magic b'CARP', format version: u8
+    level class name and skin name - u8 length + utf-8 bytes each
+    seed: u64, hit points: i16, gravity: f64, step, jump power,
+    tick rate, window width and height: u16 each
+    inputs - varint runs count, then runs of (input bitmask: u8,
+             varint ticks count)
+    bricks - varint count, then (varint tick, varint x, varint y)
+
+Usage:
+    python Replay.py replays/FirstLevel.replay [--realtime]
+'''
+from argparse import ArgumentParser
+from struct import Struct
+
+MAGIC = b'CARP'
+VERSION = 1
+HEADER = Struct('<QhdHHHHH')
+
+
+def write_varint(buffer: bytearray, number: int) -> None:
+    while number > 0x7F:
+        buffer.append(number & 0x7F | 0x80)
+        number >>= 7
+    buffer.append(number)
+
+
+def read_varint(data: bytes, offset: int) -> (int, int):
+    number, shift = 0, 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        number |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return number, offset
+        shift += 7
+
+
+def write_string(buffer: bytearray, text: str) -> None:
+    encoded = text.encode('utf-8')
+    buffer.append(len(encoded))
+    buffer += encoded
+
+
+def read_string(data: bytes, offset: int) -> (str, int):
+    length = data[offset]
+    offset += 1
+    return data[offset:offset + length].decode('utf-8'), offset + length
+
+
+class Recording:
+    '''Player input of one level run, enough to repeat it exactly
+
+    Inputs are kept run-length encoded already in memory, so recording
+    a tick is one comparison and, at most, one list append.
+
+    Initilization arguments:
+        *level_name - Name of level class: str
+        *seed - Seed of level random generator: int
+        *hit_points - Player lifes at level start: int
+        *skin - Player skin name: str
+        *settings - Settings with physics values: dict
+
+    Methods:
+        *record - Add input bitmask of one tick
+        *record_brick - Add brick placed by player on tick
+        *iter_ticks - Yield (input bitmask, brick positions) of every tick
+        *get_settings - Return settings copy with recorded physics values
+        *save - Write recording to binary file
+        *load - Read recording from binary file (static method)
+    '''
+    __slots__ = ['level_name', 'seed', 'hit_points', 'skin', 'physics',
+                 'runs', 'bricks', 'ticks']
+
+    physics_keys = ('gravity', 'step', 'jump_power', 'tick_rate',
+                    'window_size')
+
+    def __init__(self, level_name: str, seed: int, hit_points: int,
+                 skin: str, settings: dict):
+        self.level_name: str = level_name
+        self.seed: int = seed
+        self.hit_points: int = hit_points
+        self.skin: str = skin
+        self.physics: dict = {key: settings[key] for key in self.physics_keys}
+        self.runs: list = []
+        self.bricks: list = []
+        self.ticks: int = 0
+
+    def record(self, inputs: int) -> None:
+        if self.runs and self.runs[-1][0] == inputs:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([inputs, 1])
+        self.ticks += 1
+
+    def record_brick(self, tick: int, position: list) -> None:
+        self.bricks.append((tick, *position))
+
+    def iter_ticks(self):
+        bricks = {}
+        for tick, x, y in self.bricks:
+            bricks.setdefault(tick, []).append([x, y])
+        tick = 0
+        for inputs, length in self.runs:
+            for _ in range(length):
+                yield inputs, bricks.get(tick, ())
+                tick += 1
+
+    def get_settings(self, settings: dict) -> dict:
+        settings = dict(settings)
+        settings.update(self.physics)
+        return settings
+
+    def save(self, path: str) -> None:
+        buffer = bytearray(MAGIC)
+        buffer.append(VERSION)
+        write_string(buffer, self.level_name)
+        write_string(buffer, self.skin)
+        physics = self.physics
+        buffer += HEADER.pack(
+            self.seed, self.hit_points, physics['gravity'], physics['step'],
+            physics['jump_power'], physics['tick_rate'],
+            *physics['window_size'])
+        write_varint(buffer, len(self.runs))
+        for inputs, length in self.runs:
+            buffer.append(inputs)
+            write_varint(buffer, length)
+        write_varint(buffer, len(self.bricks))
+        for brick in self.bricks:
+            for number in brick:
+                write_varint(buffer, number)
+        with open(path, 'wb') as replay_file:
+            replay_file.write(buffer)
+
+    @staticmethod
+    def load(path: str):
+        with open(path, 'rb') as replay_file:
+            data = replay_file.read()
+        if data[:4] != MAGIC or data[4] != VERSION:
+            raise ValueError(f'{path} is not a replay file')
+        level_name, offset = read_string(data, 5)
+        skin, offset = read_string(data, offset)
+        (seed, hit_points, gravity, step, jump_power, tick_rate,
+         width, height) = HEADER.unpack_from(data, offset)
+        offset += HEADER.size
+        settings = {'gravity': gravity, 'step': step,
+                    'jump_power': jump_power, 'tick_rate': tick_rate,
+                    'window_size': [width, height]}
+        recording = Recording(level_name, seed, hit_points, skin, settings)
+        runs_count, offset = read_varint(data, offset)
+        for _ in range(runs_count):
+            inputs = data[offset]
+            length, offset = read_varint(data, offset + 1)
+            recording.runs.append([inputs, length])
+            recording.ticks += length
+        bricks_count, offset = read_varint(data, offset)
+        for _ in range(bricks_count):
+            tick, offset = read_varint(data, offset)
+            x, offset = read_varint(data, offset)
+            y, offset = read_varint(data, offset)
+            recording.bricks.append((tick, x, y))
+        return recording
+
+
+def play(path: str, settings: dict, realtime: bool = False) -> dict:
+    '''Play replay file, return level state after the last tick'''
+    import Levels
+
+    recording = Recording.load(path)
+    level_class = getattr(Levels, recording.level_name)
+    level = level_class(recording.get_settings(settings),
+                        recording.hit_points, headless=not realtime,
+                        seed=recording.seed, skin=recording.skin)
+    level.playback = recording.iter_ticks()
+    if realtime:
+        level.game_cycle()
+        return level.get_state()
+    state = level.get_state()
+    while state['running']:
+        state = level.step()
+    return state
+
+
+if __name__ == '__main__':
+    from Utils import Settings
+
+    parser = ArgumentParser(description='Play recorded level run')
+    parser.add_argument('replay', help='Path to .replay file')
+    parser.add_argument('--realtime', action='store_true',
+                        help='Show replay in window with normal speed')
+    arguments = parser.parse_args()
+    final_state = play(arguments.replay, Settings('settings.ini').settings,
+                       arguments.realtime)
+    print(final_state)
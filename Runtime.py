@@ -0,0 +1,97 @@
+'''Engine objects shared by every window and level of game process'''
+from os.path import normpath
+
+import pygame
+import pygame_gui
+
+from Assets import AssetStore, asset_store
+from Audio import SoundBank, sound_bank
+from Startup import startup
+from Utils import DataBase, Settings
+
+
+class Runtime:
+    '''Long-lived game context: display, UI manager with parsed theme,
+    sound bank, databases, settings stores and asset store
+
+    Windows borrow objects from it, so switch of windows costs only build
+    of new scene, not initilization of engine. Every object is created on
+    first request. Borrowed objects must not be closed by windows.
+
+    Methods:
+        *get_screen - Return display surface, set video mode if needed
+        *get_manager - Return UI manager cleared of previous window elements
+        *get_sounds - Return sound bank with sounds of database folder
+        *get_database - Return databases of folder
+        *get_settings - Return settings store of settings file
+        *close - Stop all sounds, write settings and drop borrowed objects
+    '''
+    __slots__ = ['screen', 'manager', 'sounds', 'databases', 'settings',
+                 'assets']
+
+    def __init__(self):
+        self.screen: pygame.Surface = None
+        self.manager: pygame_gui.UIManager = None
+        self.sounds: SoundBank = sound_bank
+        self.databases: dict = {}
+        self.settings: dict = {}
+        self.assets: AssetStore = asset_store
+
+    def get_screen(self, title: str, window_size: list,
+                   icon_path: str) -> pygame.Surface:
+        size = (*window_size,)
+        # Mode is set again only if size changed or someone else set it
+        if self.screen is None or self.screen.get_size() != size or \
+                pygame.display.get_surface() is not self.screen:
+            pygame.display.set_icon(self.assets.get(icon_path, 'raw'))
+            self.screen = pygame.display.set_mode(size, pygame.DOUBLEBUF)
+            self.screen.set_alpha(None)
+        pygame.display.set_caption(title)
+        startup.mark('display')
+        return self.screen
+
+    def get_manager(self, window_size: list) -> pygame_gui.UIManager:
+        size = (*window_size,)
+        if self.manager is None or self.manager.window_resolution != size:
+            self.manager = pygame_gui.UIManager(size)
+        else:
+            self.manager.clear_and_reset()
+            # GUI group never draws dirty rects, so rects of removed
+            # elements would pile up in it for the whole session
+            self.manager.get_sprite_group().lostsprites.clear()
+        startup.mark('ui_manager')
+        return self.manager
+
+    def get_sounds(self, database_path: str) -> SoundBank:
+        self.sounds.load(database_path)
+        startup.mark('sound_bank')
+        return self.sounds
+
+    def get_database(self, database_path: str) -> DataBase:
+        database_path = normpath(database_path)
+        database = self.databases.get(database_path)
+        if database is None:
+            database = DataBase(database_path)
+            self.databases[database_path] = database
+        startup.mark('database')
+        return database
+
+    def get_settings(self, settings_file_name: str) -> Settings:
+        settings_file_name = normpath(settings_file_name)
+        settings = self.settings.get(settings_file_name)
+        if settings is None:
+            settings = Settings(settings_file_name)
+            self.settings[settings_file_name] = settings
+        return settings
+
+    def close(self) -> None:
+        self.sounds.clear()
+        self.databases.clear()
+        for settings in self.settings.values():
+            settings.flush()
+        self.settings.clear()
+        self.manager = None
+        self.screen = None
+
+
+runtime = Runtime()
@@ -0,0 +1,302 @@
+'''Leak soak of scene transitions
+
+Game manager is driven headless through the whole game again and again:
+menu, every level, end window, lose window, replay of level and shop.
+Every scene plays a few frames and then is closed with mode from ROUTE, so
+scenes change through real transitions table of GameManager. After every
+transition retained memory is measured: cyclic garbage is collected,
+traced memory is read, live Surfaces, Sprites, UI managers and windows are
+counted. Surfaces are not tracked by gc, so they are found through
+objects which refer to them, their memory is split by origin.
+
+Growth of every transition type is memory which scene left behind when it
+was released. First cycle fills caches, so it is not counted, and memory
+after it is compared with memory after the last cycle: exit code is 1 if
+traced memory grew past threshold or any kind of live objects grew.
+
+Usage:
+    python Soak.py [--cycles 200] [--frames 3] [--threshold 256]
+                   [--output soak_output.json]
+'''
+import gc
+import json
+import logging
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from collections import Counter
+from os.path import normpath
+
+import pygame
+import pygame_gui
+
+from Animations import atlas
+from Assets import asset_store
+from Benchmark import scripted_inputs
+from ChristmasAdventures import GameManager, settings_manager
+from Preload import preloader
+from Sprites import ParticleSystem, Player
+from Startup import startup
+from Windows import Level, Window, init_headless
+
+# Modes which scenes of one cycle are closed with, cycle starts and ends
+# in main window
+ROUTE = ('level', 'win', 'win', 'win', 'win', 'win', 'main_window',
+         'level', 'lose', 'level', 'replay', 'main_window', 'shop_window',
+         'main_window')
+# Folder of assets/sprites: origin of its images
+ORIGINS = {'santa': 'skins', 'icons': 'ui_icons',
+           'background': 'backgrounds', 'particles': 'particles'}
+# Live objects counted after every transition
+COUNTED = {'surfaces': pygame.Surface, 'sprites': pygame.sprite.Sprite,
+           'managers': pygame_gui.UIManager, 'windows': Window}
+TOP_LINES = 10
+
+
+def get_origin(path: str) -> str:
+    parts = normpath(path).replace('\\', '/').split('/')
+    if 'sprites' not in parts[:-1]:
+        return 'other_assets'
+    folder = parts[parts.index('sprites') + 1]
+    # Walls, bricks, thorns and balls are drawn into level static layer
+    return ORIGINS.get(folder, 'level_tiles')
+
+
+def add_surfaces(origins: dict, value, origin: str) -> None:
+    if isinstance(value, pygame.Surface):
+        origins.setdefault(id(value), (value, origin))
+    elif isinstance(value, dict):
+        for item in value.values():
+            add_surfaces(origins, item, origin)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            add_surfaces(origins, item, origin)
+
+
+def get_surface_origins() -> dict:
+    origins = {}
+    display = pygame.display.get_surface()
+    if display is not None:
+        origins[id(display)] = (display, 'display')
+    for animation in atlas.animations.values():
+        add_surfaces(origins, [animation.sheet, animation.frames],
+                     'animations')
+    add_surfaces(origins, Player.poses_cache, 'skins')
+    add_surfaces(origins, ParticleSystem.textures_cache, 'particles')
+    for (path, variant), (asset, _) in asset_store.entries.items():
+        if variant != 'mask':
+            add_surfaces(origins, asset, get_origin(path))
+    return origins
+
+
+def get_surface_size(surface: pygame.Surface) -> int:
+    # Subsurface shares pixels of its parent
+    if surface.get_parent() is not None:
+        return 0
+    return surface.get_pitch() * surface.get_height()
+
+
+def measure() -> dict:
+    garbage = gc.collect()
+    live_objects = gc.get_objects()
+    counts = dict.fromkeys(COUNTED, 0)
+    for live_type, count in Counter(map(type, live_objects)).items():
+        for name, kind in COUNTED.items():
+            if issubclass(live_type, kind):
+                counts[name] += count
+    # Surfaces kept only in tuples of untracked objects (like entries of
+    # asset store) are not referents of tracked objects, stores are walked
+    origins = get_surface_origins()
+    surfaces = {surface_id: surface
+                for surface_id, (surface, _) in origins.items()}
+    surfaces.update((id(referent), referent) for referent in
+                    gc.get_referents(*live_objects)
+                    if isinstance(referent, pygame.Surface))
+    counts['surfaces'] = len(surfaces)
+    surface_memory = {}
+    for surface_id, surface in surfaces.items():
+        origin = origins.get(surface_id, (None, 'scenes'))[1]
+        surface_memory[origin] = surface_memory.get(origin, 0) + \
+            get_surface_size(surface)
+    return {'traced': tracemalloc.get_traced_memory()[0], 'garbage': garbage,
+            'counts': counts, 'surface_memory': surface_memory}
+
+
+def get_growth(before: dict, after: dict) -> dict:
+    origins = set(before['surface_memory']) | set(after['surface_memory'])
+    return {'traced': after['traced'] - before['traced'],
+            'garbage': after['garbage'],
+            'counts': {name: after['counts'][name] - before['counts'][name]
+                       for name in COUNTED},
+            'surface_memory': {
+                origin: after['surface_memory'].get(origin, 0) -
+                before['surface_memory'].get(origin, 0)
+                for origin in sorted(origins)}}
+
+
+class SoakManager(GameManager):
+    '''Game manager which plays every scene a few frames and closes it with
+    next mode of ROUTE, memory is measured after every transition
+
+    Initilization arguments:
+        *settings - Dict with settings from class Settings: dict
+        *cycles - Count of passes through ROUTE: int
+        *frames - Frames played by every scene: int
+
+    Methods:
+        *play_scene - Play scene frames and close it with mode of route
+        *run_game - Run scene and measure memory it left behind
+        *add_growth - Add growth of one transition to its type totals
+        *get_report - Return growth of every transition type and of whole
+                      soak after first cycle
+    '''
+    __slots__ = ['transitions', 'limit', 'inputs', 'previous', 'baseline',
+                 'last', 'snapshot', 'growths']
+
+    def __init__(self, settings: dict, cycles: int, frames: int):
+        super().__init__(settings)
+        self.transitions: int = 0
+        self.limit: int = cycles * len(ROUTE)
+        self.inputs: list = scripted_inputs(frames)
+        self.previous: dict = None
+        self.baseline: dict = None
+        self.last: dict = None
+        self.snapshot: tracemalloc.Snapshot = None
+        # Transition type: totals of its growths after first cycle
+        self.growths: dict = {}
+
+    def play_scene(self) -> None:
+        scene = self.game
+        time_delta = 1 / self.settings['tick_rate']
+        for bitmask in self.inputs:
+            if isinstance(scene, Level):
+                scene.set_inputs(bitmask)
+            scene.process_events([])
+            scene.tick()
+            scene.render(1.0, time_delta)
+            # Soak doesn't run GameLoop, which ends startup on first frame
+            if not startup.finished:
+                startup.finish()
+            preloader.poll()
+        # Scene which keeps its mode closes the game
+        if self.transitions < self.limit:
+            scene.mode = ROUTE[self.transitions % len(ROUTE)]
+
+    def run_game(self) -> str:
+        name = type(self.game).__name__
+        scene = super().run_game()
+        measurement = measure()
+        if self.transitions >= len(ROUTE):
+            self.add_growth(f'{name} -> {scene}',
+                            get_growth(self.previous, measurement))
+        self.transitions += 1
+        # Soak is compared at the same point of route, end of cycle
+        if self.transitions % len(ROUTE) == 0:
+            if self.baseline is None:
+                self.baseline = measurement
+                self.snapshot = tracemalloc.take_snapshot()
+            self.last = measurement
+        self.previous = measurement
+        return scene
+
+    def add_growth(self, name: str, growth: dict) -> None:
+        # Growths are summed in place, so soak doesn't grow itself
+        total = self.growths.setdefault(
+            name, {'count': 0, 'traced': 0, 'garbage': 0,
+                   'counts': dict.fromkeys(COUNTED, 0),
+                   'surface_memory': {}})
+        total['count'] += 1
+        total['traced'] += growth['traced']
+        total['garbage'] += growth['garbage']
+        for kind, count in growth['counts'].items():
+            total['counts'][kind] += count
+        for origin, size in growth['surface_memory'].items():
+            total['surface_memory'][origin] = \
+                total['surface_memory'].get(origin, 0) + size
+
+    def get_report(self) -> dict:
+        transitions = {
+            name: {'count': total['count'],
+                   'traced_mean': total['traced'] / total['count'],
+                   'garbage_mean': total['garbage'] / total['count'],
+                   'counts_total': total['counts'],
+                   'surface_memory_total': total['surface_memory']}
+            for name, total in self.growths.items()}
+        return {'transitions': transitions,
+                'baseline': self.baseline, 'end': self.last,
+                'growth': get_growth(self.baseline, self.last)}
+
+
+def get_failures(growth: dict, threshold: int) -> list:
+    failures = []
+    if growth['traced'] > threshold * 1024:
+        failures.append(f'traced memory grew by {growth["traced"] // 1024} '
+                        f'KiB, threshold {threshold} KiB')
+    for kind, count in growth['counts'].items():
+        if count > 0:
+            failures.append(f'{count} more live {kind}')
+    return failures
+
+
+def main() -> int:
+    parser = ArgumentParser(description='Soak scene transitions for leaks')
+    parser.add_argument('--cycles', type=int, default=200,
+                        help=f'Passes through route of {len(ROUTE)} scenes')
+    parser.add_argument('--frames', type=int, default=3)
+    parser.add_argument('--threshold', type=int, default=256,
+                        help='Allowed growth of traced memory in KiB')
+    parser.add_argument('--output', default='soak_output.json')
+    arguments = parser.parse_args()
+    if arguments.cycles < 2:
+        parser.error('first cycle only fills caches, soak needs 2 cycles')
+
+    init_headless()
+    # Every level transition is logged, thousands of them are noise
+    logging.disable(logging.INFO)
+    settings = dict(settings_manager.settings, record_replays=0,
+                    dirty_rects=0)
+    game_manager = SoakManager(settings, arguments.cycles, arguments.frames)
+    tracemalloc.start()
+    game_manager.start('main_window')
+    snapshot = tracemalloc.take_snapshot()
+    report = game_manager.get_report()
+    tracemalloc.stop()
+    game_manager.runtime.close()
+
+    print(f'{game_manager.transitions} transitions, growth per transition '
+          f'after first cycle:')
+    for name, result in sorted(report['transitions'].items()):
+        counts = ', '.join(f'{kind} {count:+d}' for kind, count in
+                           result['counts_total'].items())
+        print(f'{name}: {result["count"]}x, traced '
+              f'{result["traced_mean"] / 1024:+.2f} KiB, cyclic garbage '
+              f'{result["garbage_mean"]:.0f}, objects in total: {counts}')
+    growth = report['growth']
+    print(f'Soak growth: traced {growth["traced"] / 1024:+.1f} KiB, ' +
+          ', '.join(f'{kind} {count:+d}'
+                    for kind, count in growth['counts'].items()))
+    surface_growth = growth['surface_memory']
+    print('Surface memory after soak: ' + ', '.join(
+        f'{origin} {size // 1024} KiB '
+        f'({surface_growth[origin] // 1024:+d} KiB)'
+        for origin, size in sorted(report['end']['surface_memory'].items())))
+    # Measurements of soak itself are not growth of game
+    own_traces = [tracemalloc.Filter(False, __file__),
+                  tracemalloc.Filter(False, tracemalloc.__file__)]
+    report['top_lines'] = [
+        str(line) for line in snapshot.filter_traces(own_traces).compare_to(
+            game_manager.snapshot.filter_traces(own_traces),
+            'lineno')[:TOP_LINES]]
+    for line in report['top_lines']:
+        print(line)
+    failures = get_failures(growth, arguments.threshold)
+    report['failures'] = failures
+    with open(arguments.output, 'w', encoding='utf-8') as output_file:
+        json.dump(report, output_file, indent=4)
+    for failure in failures:
+        print(f'LEAK {failure}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,314 +1,467 @@
-from os import listdir
-from os.path import exists
-from random import choice, randrange
-
-import pygame
-
-from Errors import SpriteError
-from Utils import Sounds
-
-
-class Sprite(pygame.sprite.Sprite):
-    '''Base sprite class
-
-    Initilization arguments:
-        *position - Start position of sprite : list
-        *hit_points - Count of sprite lifes : int
-        *skin_name - Opted skin : str
-        *folder_path - Sprite folder path regarding game path: str
-
-    Methods:
-        *setup - Declaration of variables lika skin, height, width
-        *set_group - Add skin to group
-        *to_spawn - Move sprite to start position
-        *teleport - Teleport sprite to selected position
-        *full_file_path - Full sprite path
-        *set_skin - Set sprite image
-        *change_skin - Update sprite image
-        *is_in_window - Check position in window or not
-    '''
-    __slots__ = ['start_position', 'hit_points', 'settings',
-                 'skin_group', 'width', 'height', 'folder_path', 'skin_name']
-
-    def __init__(self, position: list, hit_points: int, skin_name: str,
-                 folder_path: str, all_sprites, settings):
-        super().__init__(all_sprites)
-        self.start_position: list = position
-        self.hit_points: int = hit_points
-        self.skin_name: str = skin_name
-        self.folder_path: str = folder_path
-        self.settings: dict = settings
-        self.gravity = self.settings['gravity']
-
-    def setup(self, full_file_path: str) -> None:
-        self.set_skin(full_file_path)
-        self.width: int = self.image.get_width()
-        self.height: int = self.image.get_height()
-
-    def set_group(self) -> None:
-        self.skin_group = pygame.sprite.Group()
-        self.skin_group.add(self)
-
-    def to_spawn(self) -> None:
-        self.teleport(self.start_position)
-
-    def teleport(self, position: list) -> None:
-        self.rect.x, self.rect.y = position
-
-    def full_file_path(self, skin_path: str) -> str:
-        game_path: str = self.settings['path']
-        sprite_folder = f'{game_path}/{self.folder_path}'
-        full_skin_path = f'{sprite_folder}/{self.skin_name}/{skin_path}'
-        return full_skin_path
-
-    def set_skin(self, skin_path: str) -> None:
-        full_skin_path = self.full_file_path(skin_path)
-        if not exists(full_skin_path):
-            raise SpriteError
-        self.image = pygame.image.load(full_skin_path).convert_alpha()
-        self.rect = self.image.get_rect()
-        self.rect.x, self.rect.y = self.start_position
-        self.mask = pygame.mask.from_surface(self.image)
-
-    def change_skin(self, skin_path: str) -> pygame.sprite.Sprite:
-        full_skin_path = self.full_file_path(skin_path)
-        if not exists(full_skin_path):
-            raise SpriteError
-        current_position = (self.rect.x, self.rect.y)
-        self.image = pygame.image.load(full_skin_path)
-        self.rect = self.image.get_rect()
-        self.rect.x, self.rect.y = current_position
-
-    def is_in_window(self, position: list) -> bool:
-        x: int = position[0]
-        y: int = position[1]
-        if x not in range(self.settings['window_size'][0] + self.width):
-            return False
-        if y not in range(self.settings['window_size'][1] + self.height):
-            return False
-        return True
-
-
-class Player(Sprite):
-    '''Player sprite class
-
-    Initilization arguments:
-        *all_sprites - Group with all sprites :pygame.sprite.Group
-        *position - Start position of sprite : list
-        *hit_points - Count of sprite lifes : int
-        *skin_name - Opted skin : str
-
-    Methods:
-        *change_player_skin - Change player skin with selected
-        *die - Teleport to spawn, decrease hp
-        *get_collide_object- Return collided object
-        *get_skins - Return dict with skins
-        *is_collide - Check is player collided
-        *move - Move player
-        *update - Update player info
-    '''
-
-    __slots__ = ['skins', 'sounds', 'state', 'move_speed', 'particles',
-                 'jump_speed', 'flip_direction']
-
-    def __init__(self, position: list, hit_points: int, skin_name: str,
-                 all_sprites: pygame.sprite.Group, settings: dict):
-        super().__init__(position, hit_points, skin_name,
-                         'assets/sprites/santa', all_sprites, settings)
-        self.setup(self.get_skins()['stand'])
-        self.skins: dict = self.get_skins()
-        self.state: dict = {'flip': False, 'stand': False, 'sit': False}
-        db_path: str = self.settings['path'] + '/assets/database/'
-        self.sounds = Sounds(db_path)
-        self.move_speed, self.jump_speed = 0, 0
-        self.to_spawn()
-        self.particles = []
-        self.set_group()
-        self.flip_direction = 'right'
-
-    def stand(self):
-        self.state['sit'] = False
-        self.change_player_skin('stand')
-        old_flip_dir = self.flip_direction
-        self.flip_direction = 'right'
-        self.flip(old_flip_dir)
-
-    def sit(self):
-        self.state['sit'] = True
-        self.change_player_skin('sit')
-        old_flip_dir = self.flip_direction
-        self.flip_direction = 'right'
-        self.flip(old_flip_dir)
-
-    def change_player_skin(self, skin_type: str = '') -> None:
-        return self.change_skin(self.get_skins()[skin_type])
-
-    def flip(self, direction):
-        if self.flip_direction != direction:
-            self.flip_direction = direction
-            self.image = pygame.transform.flip(self.image, True, False)
-
-    def get_skins(self) -> dict:
-        skin_file_name_stand = f'santa_{self.skin_name}_skin.png'
-        skin_file_name_sit = f'santa_{self.skin_name}_sit_skin.png'
-        skin_file_name_jump = f'santa_{self.skin_name}_jump_skin.png'
-        skins = {'stand': skin_file_name_stand,
-                 'sit': skin_file_name_sit,
-                 'jump': skin_file_name_jump}
-        return skins
-
-    def die(self) -> None:
-        self.to_spawn()
-        self.sounds.stop('step')
-        self.sounds.play('die')
-        self.hit_points -= 1
-        self.state['stand'] = False
-
-    def update(self, sprite_group, all_sprites,
-               move_direction=False,
-               is_jumping=False, is_sitting=False) -> None:
-        for particle in self.particles:
-            particle.update()
-        if len(self.particles) >= 30:
-            self.particles = self.particles[8:]
-        if is_sitting:
-            self.sit()
-        if is_jumping and self.state['stand']:
-            if not self.state['sit']:
-                self.jump_speed = -self.settings['jump_power']
-            else:
-                self.stand()
-        if move_direction == 'left':
-            self.move_speed = -self.settings['step']
-        elif move_direction == 'rigth':
-            self.move_speed = self.settings['step']
-        else:
-            self.move_speed = 0
-        if not self.state['stand']:
-            self.jump_speed += self.gravity
-        if self.jump_speed != 0 and self.state['stand']:
-            self.sounds.play('jump')
-            self.jump_skin()
-        if self.move_speed != 0 and self.state['stand']:
-            self.sounds.play('step')
-        if self.move_speed < 0:
-            self.flip('left')
-        if self.move_speed > 0:
-            self.flip('right')
-        if self.jump_speed == 0:
-            self.stand()
-        self.state['stand'] = False
-        self.move(sprite_group, all_sprites)
-
-    def jump_skin(self):
-        self.change_player_skin('jump')
-        old_flip_dir = self.flip_direction
-        self.flip_direction = 'right'
-        self.flip(old_flip_dir)
-
-    def move(self, sprite_group, all_sprites) -> None:
-        self.rect.y += self.jump_speed
-        if self.is_collide(sprite_group):
-            wall = self.get_collide_object(sprite_group)
-            if self.jump_speed > 0:
-                if self.jump_speed != 1:
-                    self.particles.append(Particles([self.rect.x, self.rect.y],
-                                                    self.settings, all_sprites))
-                self.rect.bottom = wall.rect.top
-                self.jump_speed = 0
-                self.state['stand'] = True
-            if self.jump_speed < 0:
-                self.rect.top = wall.rect.bottom
-                self.jump_speed = 0
-                self.state['stand'] = False
-        else:
-            if self.jump_speed > 0:
-                self.state['stand'] = False
-        self.rect.x += self.move_speed
-        if self.is_collide(sprite_group):
-            wall = self.get_collide_object(sprite_group)
-            if self.move_speed > 0:
-                self.rect.right = wall.rect.left
-                self.move_speed = 0
-            if self.move_speed < 0:
-                self.rect.left = wall.rect.right
-                self.move_speed = 0
-
-    def is_collide(self, sprite_group) -> bool:
-        for sprite in sprite_group:
-            if pygame.sprite.collide_mask(self, sprite):
-                return True
-        return False
-
-    def get_collide_object(self, sprite_group) -> pygame.sprite.Sprite or bool:
-        for sprite in sprite_group:
-            if pygame.sprite.collide_mask(self, sprite):
-                return sprite
-        return False
-
-
-class Particles(pygame.sprite.Sprite):
-    '''Player sprite class
-
-    Initilization arguments:
-        *position - Start position of sprite : list
-        *settings - Settings from 'Settings.setting' class: dict
-        *all_sprites - Group with all sprites :pygame.sprite.Group
-
-    Methods:
-        *get_particles - Return particles list
-        *update - Update particle position
-    '''
-    __slots__ = ['settings', 'velocity']
-
-    def __init__(self, position: list, settings: dict,
-                 all_sprites: pygame.sprite.Group):
-        super().__init__(all_sprites)
-        self.settings: dict = settings
-        self.image: pygame.sprite.Sprite = choice(self.get_particles())
-        self.rect: pygame.Rect = self.image.get_rect()
-        numbers = range(-5, 6)
-        self.velocity = [choice(numbers), choice(numbers)]
-        self.rect.x, self.rect.y = position
-
-    def get_particles(self) -> list:
-        load_image = pygame.image.load
-        particles_rel_path = '/assets/sprites/particles/'
-        particles_path: str = self.settings['path'] + particles_rel_path
-        particles = [load_image(particles_path + file)
-                     for file in listdir(particles_path)]
-        for scale in (2, 4, 5, 7):
-            particles.append(
-                pygame.transform.scale(choice(particles), (scale, scale)))
-        return particles
-
-    def update(self) -> None:
-        self.velocity[1] += 1
-        window_size = self.settings['window_size']
-        self.rect.x += self.velocity[0]
-        self.rect.y += self.velocity[1]
-        if not self.rect.colliderect((
-                0, 0, window_size[0], window_size[1])):
-            self.kill()
-
-
-class Ball(pygame.sprite.Sprite):
-    def __init__(self, position: list, settings: dict):
-        super().__init__()
-        self.settings: dict = settings
-        self.image: pygame.sprite.Sprite = self.get_image()
-        self.rect: pygame.Rect = self.image.get_rect()
-        self.rect.x, self.rect.y = position
-
-    def get_image(self) -> list:
-        load_image = pygame.image.load
-        image_rel_path = '/assets/sprites/traps/ball/ball_0.png'
-        image_path: str = self.settings['path'] + image_rel_path
-        return load_image(image_path)
-
-    def update(self) -> None:
-        window_size = self.settings['window_size']
-        self.rect.y += 15
-        if not self.rect.colliderect((
-                0, 0, window_size[0], window_size[1] + 400)):
-            self.rect.y = randrange(-400, -30)
+from array import array
+from os import listdir
+from os.path import exists
+from random import Random, choice, randrange
+
+import pygame
+
+from Animations import Animation
+from Assets import asset_store
+from Audio import SoundBank
+from Collisions import CollisionGroup
+from Errors import SpriteError
+from Runtime import runtime
+
+
+def interpolate_position(previous_position: tuple, position: tuple,
+                         alpha: float) -> tuple:
+    '''Return position between previous and current simulation tick'''
+    if alpha >= 1:
+        return position
+    previous_x, previous_y = previous_position
+    x, y = position
+    return (round(previous_x + (x - previous_x) * alpha),
+            round(previous_y + (y - previous_y) * alpha))
+
+
+class Sprite(pygame.sprite.Sprite):
+    '''Base sprite class
+
+    Initilization arguments:
+        *position - Start position of sprite : list
+        *hit_points - Count of sprite lifes : int
+        *skin_name - Opted skin : str
+        *folder_path - Sprite folder path regarding game path: str
+
+    Methods:
+        *setup - Declaration of variables lika skin, height, width
+        *set_group - Add skin to group
+        *to_spawn - Move sprite to start position
+        *teleport - Teleport sprite to selected position
+        *draw - Draw sprite between previous and current tick position
+        *full_file_path - Full sprite path
+        *set_skin - Set sprite image
+        *change_skin - Update sprite image
+        *is_in_window - Check position in window or not
+    '''
+    __slots__ = ['start_position', 'hit_points', 'settings',
+                 'skin_group', 'width', 'height', 'folder_path', 'skin_name',
+                 'previous_position']
+
+    def __init__(self, position: list, hit_points: int, skin_name: str,
+                 folder_path: str, all_sprites, settings):
+        super().__init__(all_sprites)
+        self.start_position: list = position
+        self.hit_points: int = hit_points
+        self.skin_name: str = skin_name
+        self.folder_path: str = folder_path
+        self.settings: dict = settings
+        self.gravity = self.settings['gravity']
+
+    def setup(self, full_file_path: str) -> None:
+        self.set_skin(full_file_path)
+        self.width: int = self.image.get_width()
+        self.height: int = self.image.get_height()
+
+    def set_group(self) -> None:
+        self.skin_group = pygame.sprite.Group()
+        self.skin_group.add(self)
+
+    def to_spawn(self) -> None:
+        self.teleport(self.start_position)
+
+    def teleport(self, position: list) -> None:
+        self.rect.x, self.rect.y = position
+        # Teleport is not a movement, so it is never interpolated
+        self.previous_position = self.rect.topleft
+
+    def draw(self, screen: pygame.Surface, alpha: float = 1.0) -> None:
+        screen.blit(self.image, interpolate_position(
+            self.previous_position, self.rect.topleft, alpha))
+
+    def full_file_path(self, skin_path: str) -> str:
+        game_path: str = self.settings['path']
+        sprite_folder = f'{game_path}/{self.folder_path}'
+        full_skin_path = f'{sprite_folder}/{self.skin_name}/{skin_path}'
+        return full_skin_path
+
+    def set_skin(self, skin_path: str) -> None:
+        full_skin_path = self.full_file_path(skin_path)
+        if not exists(full_skin_path):
+            raise SpriteError
+        self.image = asset_store.image(full_skin_path)
+        self.rect = self.image.get_rect()
+        self.rect.x, self.rect.y = self.start_position
+        self.mask = asset_store.mask(full_skin_path)
+
+    def change_skin(self, skin_path: str) -> pygame.sprite.Sprite:
+        full_skin_path = self.full_file_path(skin_path)
+        if not exists(full_skin_path):
+            raise SpriteError
+        current_position = (self.rect.x, self.rect.y)
+        self.image = asset_store.image(full_skin_path)
+        self.rect = self.image.get_rect()
+        self.rect.x, self.rect.y = current_position
+
+    def is_in_window(self, position: list) -> bool:
+        x: int = position[0]
+        y: int = position[1]
+        if x not in range(self.settings['window_size'][0] + self.width):
+            return False
+        if y not in range(self.settings['window_size'][1] + self.height):
+            return False
+        return True
+
+
+class Player(Sprite):
+    '''Player sprite class
+
+    Initilization arguments:
+        *all_sprites - Group with all sprites :pygame.sprite.Group
+        *position - Start position of sprite : list
+        *hit_points - Count of sprite lifes : int
+        *skin_name - Opted skin : str
+
+    Methods:
+        *change_player_skin - Change player skin with selected
+        *die - Teleport to spawn, decrease hp
+        *get_collide_object- Return collided object
+        *get_skins - Return dict with skins
+        *get_poses - Return prepared image and mask for every pose
+        *set_pose - Swap image and mask to selected pose and direction
+        *is_collide - Check is player collided
+        *collide - Return collided object or None
+        *move - Move player
+        *update - Update player info
+    '''
+
+    __slots__ = ['skins', 'sounds', 'state', 'move_speed', 'particles',
+                 'jump_speed', 'flip_direction', 'poses', 'pose']
+
+    # Prepared poses of every loaded skin, shared by all players
+    poses_cache: dict = {}
+    # Number of skin images loaded by players, stays the same while playing
+    skin_loads: int = 0
+
+    def __init__(self, position: list, hit_points: int, skin_name: str,
+                 all_sprites: pygame.sprite.Group, settings: dict):
+        super().__init__(position, hit_points, skin_name,
+                         'assets/sprites/santa', all_sprites, settings)
+        self.setup(self.get_skins()['stand'])
+        self.skins: dict = self.get_skins()
+        self.poses: dict = self.get_poses()
+        self.pose: str = 'stand'
+        self.state: dict = {'flip': False, 'stand': False, 'sit': False}
+        db_path: str = self.settings['path'] + '/assets/database/'
+        self.sounds: SoundBank = runtime.get_sounds(db_path)
+        self.move_speed, self.jump_speed = 0, 0
+        self.to_spawn()
+        self.particles = ParticleSystem(self.settings)
+        self.set_group()
+        self.flip_direction = 'right'
+
+    def stand(self):
+        self.state['sit'] = False
+        self.change_player_skin('stand')
+
+    def sit(self):
+        self.state['sit'] = True
+        self.change_player_skin('sit')
+
+    def change_player_skin(self, skin_type: str = '') -> None:
+        self.set_pose(skin_type, self.flip_direction)
+
+    def flip(self, direction):
+        if self.flip_direction != direction:
+            self.set_pose(self.pose, direction)
+
+    def set_pose(self, pose: str, direction: str) -> None:
+        self.pose = pose
+        self.flip_direction = direction
+        image, mask = self.poses[pose][direction]
+        if image is not self.image:
+            # Rect keeps its top left corner, like change_skin did
+            self.image = image
+            self.mask = mask
+            self.rect.size = image.get_size()
+
+    def get_poses(self) -> dict:
+        cache_key = (self.settings['path'], self.skin_name)
+        if cache_key in Player.poses_cache:
+            return Player.poses_cache[cache_key]
+        poses = {}
+        for pose, skin_path in self.skins.items():
+            full_skin_path = self.full_file_path(skin_path)
+            if not exists(full_skin_path):
+                raise SpriteError
+            image = asset_store.image(full_skin_path)
+            flipped_image = pygame.transform.flip(image, True, False)
+            poses[pose] = {
+                'right': (image, asset_store.mask(full_skin_path)),
+                'left': (flipped_image,
+                         pygame.mask.from_surface(flipped_image))}
+            Player.skin_loads += 1
+        Player.poses_cache[cache_key] = poses
+        return poses
+
+    def get_skins(self) -> dict:
+        skin_file_name_stand = f'santa_{self.skin_name}_skin.png'
+        skin_file_name_sit = f'santa_{self.skin_name}_sit_skin.png'
+        skin_file_name_jump = f'santa_{self.skin_name}_jump_skin.png'
+        skins = {'stand': skin_file_name_stand,
+                 'sit': skin_file_name_sit,
+                 'jump': skin_file_name_jump}
+        return skins
+
+    def die(self) -> None:
+        self.to_spawn()
+        self.sounds.stop('step')
+        self.sounds.play('die')
+        self.hit_points -= 1
+        self.state['stand'] = False
+
+    def update(self, sprite_group, all_sprites,
+               move_direction=False,
+               is_jumping=False, is_sitting=False) -> None:
+        self.previous_position = self.rect.topleft
+        self.particles.update()
+        if is_sitting:
+            self.sit()
+        if is_jumping and self.state['stand']:
+            if not self.state['sit']:
+                self.jump_speed = -self.settings['jump_power']
+            else:
+                self.stand()
+        if move_direction == 'left':
+            self.move_speed = -self.settings['step']
+        elif move_direction == 'rigth':
+            self.move_speed = self.settings['step']
+        else:
+            self.move_speed = 0
+        if not self.state['stand']:
+            self.jump_speed += self.gravity
+        if self.jump_speed != 0 and self.state['stand']:
+            self.sounds.play('jump')
+            self.jump_skin()
+        if self.move_speed != 0 and self.state['stand']:
+            self.sounds.play('step')
+        if self.move_speed < 0:
+            self.flip('left')
+        if self.move_speed > 0:
+            self.flip('right')
+        if self.jump_speed == 0:
+            self.stand()
+        self.state['stand'] = False
+        self.move(sprite_group, all_sprites)
+
+    def jump_skin(self):
+        self.change_player_skin('jump')
+
+    def move(self, sprite_group, all_sprites) -> None:
+        self.rect.y += self.jump_speed
+        wall = self.collide(sprite_group)
+        if wall is not None:
+            if self.jump_speed > 0:
+                if self.jump_speed != 1:
+                    self.particles.emit([self.rect.x, self.rect.y])
+                self.rect.bottom = wall.rect.top
+                self.jump_speed = 0
+                self.state['stand'] = True
+            if self.jump_speed < 0:
+                self.rect.top = wall.rect.bottom
+                self.jump_speed = 0
+                self.state['stand'] = False
+        else:
+            if self.jump_speed > 0:
+                self.state['stand'] = False
+        self.rect.x += self.move_speed
+        wall = self.collide(sprite_group)
+        if wall is not None:
+            if self.move_speed > 0:
+                self.rect.right = wall.rect.left
+                self.move_speed = 0
+            if self.move_speed < 0:
+                self.rect.left = wall.rect.right
+                self.move_speed = 0
+
+    def collide(self, sprite_group) -> pygame.sprite.Sprite or None:
+        if isinstance(sprite_group, CollisionGroup):
+            return sprite_group.collide(self)
+        for sprite in sprite_group:
+            if pygame.sprite.collide_mask(self, sprite):
+                return sprite
+        return None
+
+    def is_collide(self, sprite_group) -> bool:
+        if isinstance(sprite_group, CollisionGroup):
+            return sprite_group.is_collide(self)
+        return self.collide(sprite_group) is not None
+
+    def get_collide_object(self, sprite_group) -> pygame.sprite.Sprite or bool:
+        sprite = self.collide(sprite_group)
+        if sprite is None:
+            return False
+        return sprite
+
+
+class ParticleSystem:
+    '''Fixed size pool of particles stored in preallocated arrays
+
+    Live particles always take first "count" slots of arrays, dead particle
+    slot is filled with the last live one, so nothing is allocated after
+    initilization. Update is not vectorized and is not a batch step:
+    particles are stepped one by one in a Python loop (about 2 ms for 4000
+    particles). NumPy is not a dependency of game, and whole-slice steps of
+    plain arrays (map over operator functions, then compress of dead ones)
+    are slower than this loop and allocate on every step.
+
+    Initilization arguments:
+        *settings - Settings from 'Settings.setting' class: dict
+        *capacity - Max count of live particles: int
+
+    Methods:
+        *get_textures - Return particle textures, loaded once per process
+        *emit - Spawn particles at selected position
+        *update - Move all live particles and free ones out of window
+        *draw - Draw all live particles with one blits call
+        *clear - Free all particles
+    '''
+    __slots__ = ['settings', 'capacity', 'count', 'x', 'y', 'x_velocity',
+                 'y_velocity', 'texture', 'textures']
+
+    # Particle textures of every game path, shared by all systems
+    textures_cache: dict = {}
+    velocities = range(-5, 6)
+
+    def __init__(self, settings: dict, capacity: int = 4096):
+        self.settings: dict = settings
+        self.capacity: int = capacity
+        self.count: int = 0
+        self.x = array('i', bytes(4 * capacity))
+        self.y = array('i', bytes(4 * capacity))
+        self.x_velocity = array('i', bytes(4 * capacity))
+        self.y_velocity = array('i', bytes(4 * capacity))
+        self.texture = array('H', bytes(2 * capacity))
+        self.textures: list = self.get_textures()
+
+    def get_textures(self) -> list:
+        game_path: str = self.settings['path']
+        if game_path in ParticleSystem.textures_cache:
+            return ParticleSystem.textures_cache[game_path]
+        particles_path = game_path + '/assets/sprites/particles/'
+        textures = [asset_store.image(particles_path + file)
+                    for file in sorted(listdir(particles_path))]
+        for scale in (2, 4, 5, 7):
+            textures.append(
+                pygame.transform.scale(choice(textures), (scale, scale)))
+        ParticleSystem.textures_cache[game_path] = textures
+        return textures
+
+    def emit(self, position: list, amount: int = 1) -> None:
+        for _ in range(min(amount, self.capacity - self.count)):
+            index = self.count
+            self.x[index], self.y[index] = position
+            self.x_velocity[index] = choice(self.velocities)
+            self.y_velocity[index] = choice(self.velocities)
+            self.texture[index] = randrange(len(self.textures))
+            self.count += 1
+
+    def update(self) -> None:
+        x, y = self.x, self.y
+        x_velocity, y_velocity = self.x_velocity, self.y_velocity
+        texture = self.texture
+        # Biggest texture is 7px, particle is alive while it touches window
+        left, top = -8, -8
+        right, bottom = self.settings['window_size']
+        index = 0
+        while index < self.count:
+            y_velocity[index] += 1
+            x[index] += x_velocity[index]
+            y[index] += y_velocity[index]
+            if left < x[index] < right and top < y[index] < bottom:
+                index += 1
+                continue
+            # Move last live particle to free slot, it is not updated yet
+            self.count -= 1
+            last = self.count
+            x[index], y[index] = x[last], y[last]
+            x_velocity[index] = x_velocity[last]
+            y_velocity[index] = y_velocity[last]
+            texture[index] = texture[last]
+
+    def draw(self, screen: pygame.Surface) -> None:
+        x, y, texture, textures = self.x, self.y, self.texture, self.textures
+        screen.blits([(textures[texture[index]], (x[index], y[index]))
+                      for index in range(self.count)], False)
+
+    def clear(self) -> None:
+        self.count = 0
+
+
+class Ball(pygame.sprite.Sprite):
+    '''Falling ball trap, returns to random height above window
+
+    Initilization arguments:
+        *position - Start position of ball: list
+        *settings - Settings from 'Settings.setting' class: dict
+        *random - Random generator of level: random.Random
+    '''
+    # Ball moves, so collision groups check it apart from static sprites
+    dynamic = True
+
+    def __init__(self, position: list, settings: dict, random: Random):
+        super().__init__()
+        self.settings: dict = settings
+        self.random: Random = random
+        self.image: pygame.sprite.Sprite = self.get_image()
+        self.rect: pygame.Rect = self.image.get_rect()
+        self.rect.x, self.rect.y = position
+        self.previous_position: tuple = self.rect.topleft
+
+    def get_image(self) -> list:
+        load_image = asset_store.image
+        image_rel_path = '/assets/sprites/traps/ball/ball_0.png'
+        image_path: str = self.settings['path'] + image_rel_path
+        return load_image(image_path)
+
+    def update(self) -> None:
+        window_size = self.settings['window_size']
+        self.previous_position = self.rect.topleft
+        self.rect.y += 15
+        if not self.rect.colliderect((
+                0, 0, window_size[0], window_size[1] + 400)):
+            self.rect.y = self.random.randrange(-400, -30)
+            self.previous_position = self.rect.topleft
+
+    def draw(self, screen: pygame.Surface, alpha: float = 1.0) -> None:
+        screen.blit(self.image, interpolate_position(
+            self.previous_position, self.rect.topleft, alpha))
+
+
+class AnimatedTrap(pygame.sprite.Sprite):
+    '''Trap which image and mask are the current frame of shared animation
+
+    Initilization arguments:
+        *animation - Animation of trap: Animations.Animation
+        *position - Position of trap: list
+        *get_time - Function which returns level time in ms: function
+    '''
+    # Mask changes every frame, so it is never baked into collision mask
+    dynamic = True
+
+    def __init__(self, animation: Animation, position: list, get_time):
+        super().__init__()
+        self.animation: Animation = animation
+        self.get_time = get_time
+        self.rect: pygame.Rect = pygame.Rect((*position,), animation.size)
+
+    @property
+    def image(self) -> pygame.Surface:
+        return self.animation.get_frame(self.get_time())
+
+    @property
+    def mask(self) -> pygame.mask.Mask:
+        return self.animation.get_mask(self.get_time())
+
+    def draw(self, screen: pygame.Surface) -> None:
+        screen.blit(self.image, self.rect)
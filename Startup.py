@@ -0,0 +1,91 @@
+'''Time to first frame of game process, broken down by startup phases
+
+Clock starts when this module is imported, so it is imported by game
+module before anything else (interpreter startup itself is not counted).
+Code on startup path marks end of its phase, marks after first frame are
+ignored. Work which main menu doesn't need is deferred until first frame
+is shown.
+
+Usage:
+    python ChristmasAdventures.py --startup-profile [--startup-budget MS]
+'''
+from time import perf_counter
+
+START = perf_counter()
+
+
+class StartupProfile:
+    '''Phases of startup until first frame and functions deferred after it
+
+    Methods:
+        *mark - End current phase with selected name
+        *defer - Call function after first frame, now if it was shown
+        *first_frame - Mark first frame and run deferred functions, return
+                       False if game must close (profile run)
+        *finish - End startup and run deferred functions, used by scripts
+                  which show frames without GameLoop
+        *get_report - Return phases and total time in ms
+        *print_report - Print phases, return False if total is over budget
+    '''
+    __slots__ = ['start', 'last', 'phases', 'deferred', 'finished',
+                 'profiling']
+
+    def __init__(self, start: float = START):
+        self.start: float = start
+        self.last: float = start
+        # (phase name, ms) in order of marks, one phase can repeat
+        self.phases: list = []
+        self.deferred: list = []
+        self.finished: bool = False
+        self.profiling: bool = False
+
+    def mark(self, name: str) -> None:
+        if self.finished:
+            return
+        now = perf_counter()
+        self.phases.append((name, (now - self.last) * 1000))
+        self.last = now
+
+    def defer(self, function) -> None:
+        if self.finished:
+            function()
+        else:
+            self.deferred.append(function)
+
+    def first_frame(self) -> bool:
+        self.mark('first_frame')
+        deferred_start = perf_counter()
+        self.finish()
+        self.phases.append(
+            ('deferred', (perf_counter() - deferred_start) * 1000))
+        return not self.profiling
+
+    def finish(self) -> None:
+        self.finished = True
+        for function in self.deferred:
+            function()
+        self.deferred.clear()
+
+    def get_report(self) -> dict:
+        phases = {}
+        for name, duration in self.phases:
+            phases[name] = phases.get(name, 0.0) + duration
+        # Deferred work runs after first frame, it is not part of total
+        total = sum(duration for name, duration in phases.items()
+                    if name != 'deferred')
+        return {'phases': phases, 'first_frame_ms': total}
+
+    def print_report(self, budget: float = None) -> bool:
+        report = self.get_report()
+        for name, duration in report['phases'].items():
+            print(f'{name:>14}: {duration:8.1f} ms')
+        total = report['first_frame_ms']
+        print(f'{"first frame":>14}: {total:8.1f} ms' +
+              (f' (budget {budget:.0f} ms)' if budget is not None else ''))
+        if budget is not None and total > budget:
+            print(f'OVER BUDGET by {total - budget:.1f} ms')
+            return False
+        return True
+
+
+startup = StartupProfile()
@@ -1,184 +1,315 @@
-import pygame
-import pygame_gui
-
-from Utils import DataBase
-
-
-class Text(pygame.font.Font):
-    '''Class for showing text on screen
-
-    Initilization arguments:
-        *text - Text which you wanna display: str
-        *code_name - Special name for Text object for identefication: str
-        *settings - Dict with settings from class Settings: dict
-        *position - Text position on screen [x, y]: list
-        *font_size - Size of font: int
-        *font_path - Path to font file: str
-        *font_name - Font name in database (if have'nt path): str
-
-    Methods:
-        *draw - Draw itself on screen
-        *get_font - Load font from database
-        *get_text - Load rendered text
-    '''
-    __slots__ = ['settings', 'rendered_text', 'code_name']
-
-    def __init__(self, text: str, code_name: str, settings: dict, position=None,
-                 font_size=50, font_path=None, font_name=None):
-        self.settings = settings
-        self.code_name = code_name
-        if font_path is None:
-            if font_name is None:
-                font_name = 'christmas'
-            font_path = self.get_font(font_name)
-        super().__init__(font_path, font_size)
-        self.rendered_text = self.get_text(text, position)
-
-    def get_font(self, font_name: str) -> str:
-        db_path = f'{self.settings["path"]}/assets/database/'
-        database = DataBase(db_path)
-        database.get_skins()
-        font_path = f"{self.settings['path']}/{database.get_font(font_name)}"
-        return font_path
-
-    def get_text(
-            self, text: str,
-            position: list = None) -> (pygame.font.Font.render, (int, int)):
-        rendered_text = self.render(text, True, (255, 255, 255))
-        if position == None:
-            text_x = self.settings['window_size'][0] // 2 -\
-                rendered_text.get_width() // 2
-            text_y = 20
-        else:
-            text_x, text_y = position[0], position[1]
-        return rendered_text, (text_x, text_y)
-
-    def draw(self, screen) -> None:
-        screen.blit(*self.rendered_text)
-
-
-class Message(pygame_gui.windows.UIMessageWindow):
-    '''Base Message (Message box) class
-
-    Initilization arguments:
-        *text - Message text: str
-        *code_name - Special name for Message box for identefication: str
-        *manager - pygame_gui manager: pygame_gui.UIManager
-        *position - Message box window position on screen [x, y]: list
-        *size - Message box window size [w, h]: list
-        *title - Message box window title: str
-
-    Methods:
-        *is_alive - Check is window alive
-    '''
-    __slots__ = ['code_name']
-
-    def __init__(self, text: str, code_name: str, manager: pygame_gui.UIManager,
-                 position: list, size: list, title: str):
-        rect = pygame.Rect((*position,), (*size,))
-        super().__init__(rect=rect, window_title=title, html_message=text,
-                         manager=manager)
-        self.dismiss_button.text = 'Ok'
-        self.dismiss_button.rebuild()
-        self.code_name = code_name
-
-    def is_alive(self) -> bool:
-        if self.dismiss_button.pressed or self.close_window_button.pressed:
-            return False
-        return True
-
-
-class Label(pygame_gui.elements.UIButton):
-    '''Base label class
-
-    Initilization arguments:
-        *text - Label text: str
-        *code_name - Special name for label for identefication: str
-        *manager - pygame_gui manager: pygame_gui.UIManager
-        *position - Label position on screen [x, y]: list
-        *size - Label size [w, h]: list
-
-    Methods:
-        *connect_to_button - Connects label to button
-        *move - Just label button to selected position: None
-    '''
-    __slots__ = ['code_name']
-
-    def __init__(self, text: str, code_name: str, manager: pygame_gui.UIManager,
-                 position: list, size: list):
-        label_rect = pygame.Rect((*position,), (*size,))
-        super().__init__(label_rect, text, manager)
-        self.code_name = code_name
-
-    def move(self, position: list) -> None:
-        self.rect.x = position[0]
-        self.rect.y = position[1]
-
-    def connect_to_button(self, button: pygame_gui.elements.UIButton,
-                          window_size: list, label_w: int) -> None:
-        label_x = button.rect.x + 46
-        label_y = window_size[1] - 55
-        label_w = label_w - button.rect.w - 5
-        label_h = button.rect.h
-        label_rect = pygame.Rect((label_x, label_y), (label_w, label_h))
-        self.rect = label_rect
-        main_color = self.colours['normal_bg']
-        for theme in self.colours:
-            if 'text' not in theme:
-                self.colours[theme] = main_color
-        self.rebuild()
-
-
-class Button(pygame_gui.elements.UIButton):
-    '''Base button class
-
-    Initilization arguments:
-        *text - Button text: str
-        *code_name - Special name for button for identefication: str
-        *manager - pygame_gui manager: pygame_gui.UIManager
-        *position - Button position on screen [x, y]: list
-        *size - Button size [w, h]: list
-
-    Methods:
-        *load_icon - Load image and crop it to standart sizes: pygame.Surface
-        *set_icon - Set icon for button: None
-        *get_rect - Get button rect wich have x, y, w and h: pygame.Rect
-        *move - Just move button to selected position: None
-        *is_pressed - Check is button pressed or not: bool
-    '''
-    __slots__ = ['code_name']
-
-    def __init__(self, text: str, code_name: str, manager: pygame_gui.UIManager,
-                 position: list, size: list = [50, 50]):
-        relative_rect = self.get_rect((*position,), (*size,))
-        super().__init__(relative_rect=relative_rect, text=text,
-                         manager=manager)
-        self.code_name = code_name
-
-    def load_icon(self, icon_path) -> pygame.Surface:
-        return pygame.transform.scale(pygame.image.load(icon_path), [50, 50])
-
-    def set_icon(self, icon_path, is_pressed_version=True) -> None:
-        icon_extension = '.' + icon_path.split('.')[-1]
-        icon = self.load_icon(icon_path)
-        if is_pressed_version:
-            hovered_icon_path = '.'.join(icon_path.split(icon_extension)[:-1]) +\
-                '_pressed' + icon_extension
-            hovered_icon = self.load_icon(hovered_icon_path)
-            self.hovered_image = hovered_icon
-        self.normal_image = self.selected_image = icon
-        self.rebuild()
-
-    def get_rect(self, position: list, size: list) -> pygame.Rect:
-        label_rect = pygame.Rect((*position,), (*size,))
-        return label_rect
-
-    def move(self, position: list) -> None:
-        self.rect.x = position[0]
-        self.rect.y = position[1]
-
-    def is_pressed(self, event: pygame.event) -> bool:
-        if event.user_type == pygame_gui.UI_BUTTON_PRESSED:
-            if event.ui_element == self:
-                return True
-        return False
+from abc import ABC, abstractmethod
+
+import pygame
+import pygame_gui
+
+from Assets import asset_store
+from Utils import DataBase
+
+
+class Text(pygame.font.Font):
+    '''Class for showing text on screen
+
+    Initilization arguments:
+        *text - Text which you wanna display: str
+        *code_name - Special name for Text object for identefication: str
+        *settings - Dict with settings from class Settings: dict
+        *position - Text position on screen [x, y]: list
+        *font_size - Size of font: int
+        *font_path - Path to font file: str
+        *font_name - Font name in database (if have'nt path): str
+
+    Methods:
+        *draw - Draw itself on screen
+        *get_font - Load font from database
+        *get_text - Load rendered text
+    '''
+    __slots__ = ['settings', 'rendered_text', 'code_name']
+
+    def __init__(self, text: str, code_name: str, settings: dict, position=None,
+                 font_size=50, font_path=None, font_name=None):
+        self.settings = settings
+        self.code_name = code_name
+        if font_path is None:
+            if font_name is None:
+                font_name = 'christmas'
+            font_path = self.get_font(font_name)
+        super().__init__(font_path, font_size)
+        self.rendered_text = self.get_text(text, position)
+
+    def get_font(self, font_name: str) -> str:
+        db_path = f'{self.settings["path"]}/assets/database/'
+        database = DataBase(db_path)
+        font_path = f"{self.settings['path']}/{database.get_font(font_name)}"
+        return font_path
+
+    def get_text(
+            self, text: str,
+            position: list = None) -> (pygame.font.Font.render, (int, int)):
+        rendered_text = self.render(text, True, (255, 255, 255))
+        if position == None:
+            text_x = self.settings['window_size'][0] // 2 -\
+                rendered_text.get_width() // 2
+            text_y = 20
+        else:
+            text_x, text_y = position[0], position[1]
+        return rendered_text, (text_x, text_y)
+
+    def draw(self, screen) -> None:
+        screen.blit(*self.rendered_text)
+
+
+class Message(pygame_gui.windows.UIMessageWindow):
+    '''Base Message (Message box) class
+
+    Initilization arguments:
+        *text - Message text: str
+        *code_name - Special name for Message box for identefication: str
+        *manager - pygame_gui manager: pygame_gui.UIManager
+        *position - Message box window position on screen [x, y]: list
+        *size - Message box window size [w, h]: list
+        *title - Message box window title: str
+
+    Methods:
+        *is_alive - Check is window alive
+    '''
+    __slots__ = ['code_name']
+
+    def __init__(self, text: str, code_name: str, manager: pygame_gui.UIManager,
+                 position: list, size: list, title: str):
+        rect = pygame.Rect((*position,), (*size,))
+        super().__init__(rect=rect, window_title=title, html_message=text,
+                         manager=manager)
+        self.dismiss_button.text = 'Ok'
+        self.dismiss_button.rebuild()
+        self.code_name = code_name
+
+    def is_alive(self) -> bool:
+        if self.dismiss_button.pressed or self.close_window_button.pressed:
+            return False
+        return True
+
+
+class Label(pygame_gui.elements.UIButton):
+    '''Base label class
+
+    Initilization arguments:
+        *text - Label text: str
+        *code_name - Special name for label for identefication: str
+        *manager - pygame_gui manager: pygame_gui.UIManager
+        *position - Label position on screen [x, y]: list
+        *size - Label size [w, h]: list
+
+    Methods:
+        *connect_to_button - Connects label to button
+        *move - Just label button to selected position: None
+    '''
+    __slots__ = ['code_name']
+
+    def __init__(self, text: str, code_name: str, manager: pygame_gui.UIManager,
+                 position: list, size: list):
+        label_rect = pygame.Rect((*position,), (*size,))
+        super().__init__(label_rect, text, manager)
+        self.code_name = code_name
+
+    def move(self, position: list) -> None:
+        self.rect.x = position[0]
+        self.rect.y = position[1]
+
+    def connect_to_button(self, button: pygame_gui.elements.UIButton,
+                          window_size: list, label_w: int) -> None:
+        label_x = button.rect.x + 46
+        label_y = window_size[1] - 55
+        label_w = label_w - button.rect.w - 5
+        label_h = button.rect.h
+        label_rect = pygame.Rect((label_x, label_y), (label_w, label_h))
+        self.rect = label_rect
+        main_color = self.colours['normal_bg']
+        for theme in self.colours:
+            if 'text' not in theme:
+                self.colours[theme] = main_color
+        self.rebuild()
+
+
+class Button(pygame_gui.elements.UIButton):
+    '''Base button class
+
+    Initilization arguments:
+        *text - Button text: str
+        *code_name - Special name for button for identefication: str
+        *manager - pygame_gui manager: pygame_gui.UIManager
+        *position - Button position on screen [x, y]: list
+        *size - Button size [w, h]: list
+
+    Methods:
+        *load_icon - Load image and crop it to standart sizes: pygame.Surface
+        *set_icon - Set icon for button: None
+        *get_rect - Get button rect wich have x, y, w and h: pygame.Rect
+        *move - Just move button to selected position: None
+        *is_pressed - Check is button pressed or not: bool
+    '''
+    __slots__ = ['code_name']
+
+    def __init__(self, text: str, code_name: str, manager: pygame_gui.UIManager,
+                 position: list, size: list = [50, 50]):
+        relative_rect = self.get_rect((*position,), (*size,))
+        super().__init__(relative_rect=relative_rect, text=text,
+                         manager=manager)
+        self.code_name = code_name
+
+    def load_icon(self, icon_path) -> pygame.Surface:
+        return pygame.transform.scale(asset_store.get(icon_path, 'raw'),
+                                      [50, 50])
+
+    def set_icon(self, icon_path, is_pressed_version=True) -> None:
+        icon_extension = '.' + icon_path.split('.')[-1]
+        icon = self.load_icon(icon_path)
+        if is_pressed_version:
+            hovered_icon_path = '.'.join(icon_path.split(icon_extension)[:-1]) +\
+                '_pressed' + icon_extension
+            hovered_icon = self.load_icon(hovered_icon_path)
+            self.hovered_image = hovered_icon
+        self.normal_image = self.selected_image = icon
+        self.rebuild()
+
+    def get_rect(self, position: list, size: list) -> pygame.Rect:
+        label_rect = pygame.Rect((*position,), (*size,))
+        return label_rect
+
+    def move(self, position: list) -> None:
+        self.rect.x = position[0]
+        self.rect.y = position[1]
+
+    def is_pressed(self, event: pygame.event) -> bool:
+        if event.user_type == pygame_gui.UI_BUTTON_PRESSED:
+            if event.ui_element == self:
+                return True
+        return False
+
+
+class HUDElement(ABC):
+    '''Base class of HUD element rendered to cached surface
+
+    Initilization arguments:
+        *code_name - Special name for element for identefication: str
+        *position - Element position on screen [x, y]: list
+        *visible - Draw element or not: bool
+
+    Methods:
+        *get_state - Return values which element surface depends on
+        *render - Render element surface for given state (abstract)
+        *get_surface - Return cached surface, re-render it if state changed
+    '''
+    __slots__ = ['code_name', 'position', 'visible', 'state', 'surface']
+
+    def __init__(self, code_name: str, position: list, visible: bool = True):
+        self.code_name: str = code_name
+        self.position: list = position
+        self.visible: bool = visible
+        self.state = None
+        self.surface: pygame.Surface = None
+
+    def get_state(self):
+        return None
+
+    @abstractmethod
+    def render(self, state) -> pygame.Surface:
+        pass
+
+    def get_surface(self) -> pygame.Surface:
+        state = self.get_state()
+        if self.surface is None or state != self.state:
+            self.state = state
+            self.surface = self.render(state)
+        return self.surface
+
+
+class Hearts(HUDElement):
+    '''Strip with lost and left player lifes
+
+    Initilization arguments:
+        *code_name - Special name for element for identefication: str
+        *heart_image - Image of one heart: pygame.Surface
+        *get_hit_points - Function which returns (start hit points,
+                          current hit points): function
+        *position - Strip position on screen (x, y): tuple
+    '''
+    __slots__ = ['heart_image', 'get_hit_points']
+
+    def __init__(self, code_name: str, heart_image: pygame.Surface,
+                 get_hit_points, position: tuple = (20, 20)):
+        super().__init__(code_name, position)
+        self.heart_image: pygame.Surface = heart_image
+        self.get_hit_points = get_hit_points
+
+    def get_state(self) -> tuple:
+        return self.get_hit_points()
+
+    def render(self, state: tuple) -> pygame.Surface:
+        start_hit_points, hit_points = state
+        lost_hit_points = max(start_hit_points - hit_points, 0)
+        hit_points = max(hit_points, 0)
+        heart_width, heart_height = self.heart_image.get_size()
+        width = max((lost_hit_points - 1) * 13, (hit_points - 1) * 15, 0) +\
+            heart_width
+        surface = pygame.Surface([width, heart_height], pygame.SRCALPHA)
+        surface.blits([(self.heart_image, (i * 13, 0))
+                       for i in range(lost_hit_points)], False)
+        surface.blits([(self.heart_image, (i * 15, 0))
+                       for i in range(hit_points)], False)
+        return surface
+
+
+class HUDText(HUDElement):
+    '''HUD element with one line of text
+
+    Initilization arguments:
+        *code_name - Special name for element for identefication: str
+        *font - Font of text: pygame.font.Font
+        *get_text - Function which returns text to show: function
+        *position - Text position on screen [x, y]: list
+        *visible - Draw element or not: bool
+    '''
+    __slots__ = ['font', 'get_text']
+
+    def __init__(self, code_name: str, font: pygame.font.Font, get_text,
+                 position: list, visible: bool = True):
+        super().__init__(code_name, position, visible)
+        self.font: pygame.font.Font = font
+        self.get_text = get_text
+
+    def get_state(self) -> str:
+        return self.get_text()
+
+    def render(self, state: str) -> pygame.Surface:
+        return self.font.render(state, True, (255, 255, 255))
+
+
+class HUD:
+    '''Overlay layer of level (hearts, timer, fps and etc)
+
+    Every element keeps rendered surface and re-renders it only when its
+    state changes, so drawing HUD costs one blit per visible element.
+
+    Methods:
+        *add - Add element to HUD
+        *toggle - Show or hide element by code name
+        *draw - Draw all visible elements on screen
+    '''
+    __slots__ = ['elements']
+
+    def __init__(self):
+        self.elements: dict = {}
+
+    def add(self, element: HUDElement) -> HUDElement:
+        self.elements[element.code_name] = element
+        return element
+
+    def toggle(self, code_name: str) -> None:
+        element = self.elements[code_name]
+        element.visible = not element.visible
+
+    def draw(self, screen: pygame.Surface) -> None:
+        screen.blits([(element.get_surface(), element.position)
+                      for element in self.elements.values()
+                      if element.visible], False)
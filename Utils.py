@@ -1,151 +1,239 @@
-from configparser import ConfigParser, SectionProxy
-from locale import getdefaultlocale
-from os.path import abspath, dirname
-from sqlite3 import connect
-
-import pygame
-
-
-class DataBase:
-    '''Class for working with sqlite3 databases
-
-    Initilization arguments:
-        *db_folder_path - Path to folder with databases regarding C://: str
-
-    Methods:
-        *execute - Execute sqlite3 query
-        *get_text - Get dict with text on selected language (if it supported)
-        *get_sounds - Get sounds list with tuples (path and pygame sound itself)
-        *get_font - Return font with selected name
-        *get_skins - Return dict with all skins and they variations
-    '''
-    __slots__ = ['sound_db_path', 'selected_db_path', 'font_db_path',
-                 'text_db_path', 'skins_db_path']
-
-    def __init__(self, db_folder_path: str):
-        self.sound_db_path: str = f'{db_folder_path}/sounds.db'
-        self.font_db_path: str = f'{db_folder_path}/fonts.db'
-        self.text_db_path: str = f'{db_folder_path}/text.db'
-        self.skins_db_path: str = f'{db_folder_path}/skins.db'
-        self.selected_db_path = self.sound_db_path
-
-    def execute(self, command: str) -> str:
-        with connect(self.selected_db_path) as database:
-            cur = database.cursor()
-            result: str = cur.execute(command).fetchall()
-        return result
-
-    def get_text(self) -> dict:
-        self.selected_db_path = self.text_db_path
-        if None in getdefaultlocale():
-            lang = 'en'
-        else:
-            lang = getdefaultlocale()[0].split('_')[0].lower().strip()
-        if lang not in ['ru', 'tr', 'en', 'az']:
-            lang = 'en'
-        result = self.execute(f'SELECT *\nFROM {lang}')[0]
-        decryptor = {0: 'play', 1: 'shop', 2: 'faq', 3: 'settings',
-                     4: 'faq_text', 5: 'skin_blocked', 6: 'ordinary_level_tip',
-                     7: 'build_level_tip'}
-        return {decryptor[index]: title for index, title in enumerate(result)}
-
-    def get_skins(self) -> dict:
-        decryptor = {0: 'folder_path', 1: 'jump', 2: 'sit', 3: 'stand'}
-        self.selected_db_path: str = self.skins_db_path
-        result: list = self.execute(f'SELECT *\nFROM skins')
-        return {sprite[0]: {decryptor[index]: sprite_path
-                            for index, sprite_path in enumerate(sprite[1:])}
-                for sprite in result}
-
-    def get_sounds(self) -> list([tuple, tuple, tuple, ...]):
-        self.selected_db_path = self.sound_db_path
-        return self.execute('SELECT *\nFROM sounds')
-
-    def get_font(self, name) -> str:
-        self.selected_db_path = self.font_db_path
-        result = self.execute(
-            f'SELECT path\nFROM fonts\nWHERE name = "{name}"')
-        return result[0][0]
-
-
-class Settings:
-    '''Class wich can parse and save settings from setiings file (ext: .ini)
-
-    Initilization arguments:
-        *settings_file_name - Path to settings file: str
-
-    Methods:
-        *all_settings - Parse all settings and return em
-        *save - Write to settings given dictionary
-    '''
-    __slots__ = ['settings_path', 'settings_parser', 'settings']
-
-    def __init__(self, settings_file_name: str):
-        self.settings_path: str = f'./{settings_file_name}'
-        self.settings_parser: ConfigParser = ConfigParser()
-        self.settings = self.all_settings()
-
-    def all_settings(self) -> dict:
-        self.settings_parser.read(self.settings_path, encoding='utf-8')
-        dirty_settings: SectionProxy = self.settings_parser[
-            'ChristmasAdventures']
-        fps = int(dirty_settings['fps'])
-        skin: str = dirty_settings['skin']
-        window_size = list(
-            map(int, dirty_settings['window_size'].split('x')))
-        path: str = dirname(abspath(__file__))
-        gravity = float(dirty_settings['gravity'])
-        step = int(dirty_settings['step'])
-        jump_power = int(dirty_settings['jump_power'])
-        number_of_games = int(dirty_settings['number_of_games'])
-        return {'fps': fps, 'path': path,
-                'window_size': window_size,
-                'skin': skin, 'gravity': gravity,
-                'step': step, 'jump_power': jump_power,
-                'number_of_games': number_of_games, 'file': 'settings.ini',
-                'visited_github': int(dirty_settings['visited_github'])}
-
-    def save(self, new_settings: dict) -> None:
-        for key in new_settings:
-            self.settings_parser.set(
-                'ChristmasAdventures', key, new_settings[key])
-        with open(self.settings_path, 'w', encoding='utf-8') as settings_file:
-            self.settings_parser.write(settings_file)
-
-
-class Sounds:
-    '''Class for working with sqlite3 databases
-
-    Initilization arguments:
-        *database - Path sound database: str
-
-    Methods:
-        *get_sounds - Return dict with all sounds from database
-        *play - Play sound by name a certain times
-        *stop - Stop playing selected sound
-        *stop_all - Stop ALL sound
-
-    '''
-    __slots__ = ['database', 'sounds']
-
-    def __init__(self, database):
-        self.database = DataBase(database)
-        self.sounds = self.get_sounds()
-        self.sounds['step']['sound'].set_volume(0.5)
-
-    def get_sounds(self) -> dict:
-        sounds = self.database.get_sounds()
-        return {name: {'path': path,
-                       'sound': pygame.mixer.Sound(path)}
-                for (name, path) in sounds}
-
-    def play(self, name, loops=0) -> None:
-        self.stop(name)
-        self.sounds[name]['sound'].play(loops)
-
-    def stop(self, name) -> None:
-        self.sounds[name]['sound'].stop()
-
-    def stop_all(self) -> None:
-        for name in self.sounds:
-            self.sounds[name]['sound'].stop()
+import logging
+from atexit import register
+from configparser import ConfigParser, SectionProxy
+from contextlib import closing
+from io import StringIO
+from locale import getdefaultlocale
+from os import fsync, replace
+from os.path import abspath, dirname, exists, getmtime, normpath
+from sqlite3 import connect
+from threading import Event, Lock, Thread
+from time import perf_counter, sleep
+from types import MappingProxyType
+
+
+# Databases of assets folder, every one of them has own tables
+DATABASES = ('text', 'skins', 'sounds', 'fonts')
+# Tables of all databases merged by BuildDatabase.py
+CONSOLIDATED_DB = 'assets.db'
+LANGUAGES = ('ru', 'tr', 'en', 'az')
+TEXT_KEYS = ('play', 'shop', 'faq', 'settings', 'faq_text', 'skin_blocked',
+             'ordinary_level_tip', 'build_level_tip')
+SKIN_KEYS = ('folder_path', 'jump', 'sit', 'stand')
+
+
+class DataBase:
+    '''Read-only snapshot of sqlite3 databases of assets folder
+
+    All tables of text, skins, sounds and fonts databases (or of
+    consolidated database, if it is newer than them) are read once per
+    process into tuples, every later lookup is served from memory.
+
+    Initilization arguments:
+        *db_folder_path - Path to folder with databases regarding C://: str
+
+    Methods:
+        *execute - Execute parameterized sqlite3 query on selected database
+        *get_tables - Return rows of all tables, read them on first call
+        *get_text - Get dict with text on selected language (if it supported)
+        *get_sounds - Get sounds list with tuples (name and path)
+        *get_font - Return font with selected name
+        *get_skins - Return dict with all skins and they variations
+    '''
+    __slots__ = ['sound_db_path', 'selected_db_path', 'font_db_path',
+                 'text_db_path', 'skins_db_path', 'folder_path']
+    # Snapshots of read folders: {folder path: {table: tuple of rows}}
+    snapshots: dict = {}
+
+    def __init__(self, db_folder_path: str):
+        self.folder_path: str = normpath(db_folder_path)
+        self.sound_db_path: str = f'{db_folder_path}/sounds.db'
+        self.font_db_path: str = f'{db_folder_path}/fonts.db'
+        self.text_db_path: str = f'{db_folder_path}/text.db'
+        self.skins_db_path: str = f'{db_folder_path}/skins.db'
+        self.selected_db_path = self.sound_db_path
+
+    def execute(self, command: str, parameters: tuple = ()) -> list:
+        with closing(connect(self.selected_db_path)) as database:
+            result: list = database.execute(command, parameters).fetchall()
+        return result
+
+    def get_tables(self) -> dict:
+        tables = DataBase.snapshots.get(self.folder_path)
+        if tables is not None:
+            return tables
+        consolidated_path = f'{self.folder_path}/{CONSOLIDATED_DB}'
+        sources = [f'{self.folder_path}/{name}.db' for name in DATABASES]
+        if exists(consolidated_path) and all(
+                getmtime(consolidated_path) >= getmtime(path)
+                for path in sources if exists(path)):
+            sources = [consolidated_path]
+        tables = {}
+        for path in sources:
+            self.selected_db_path = path
+            for (table,) in self.execute(
+                    'SELECT name FROM sqlite_master WHERE type = ?',
+                    ('table',)):
+                # Table names come from database itself, not from caller
+                tables[table] = tuple(self.execute(
+                    f'SELECT * FROM "{table}"'))
+        tables = MappingProxyType(tables)
+        DataBase.snapshots[self.folder_path] = tables
+        return tables
+
+    def get_text(self) -> dict:
+        if None in getdefaultlocale():
+            lang = 'en'
+        else:
+            lang = getdefaultlocale()[0].split('_')[0].lower().strip()
+        if lang not in LANGUAGES:
+            lang = 'en'
+        return dict(zip(TEXT_KEYS, self.get_tables()[lang][0]))
+
+    def get_skins(self) -> dict:
+        return {sprite[0]: dict(zip(SKIN_KEYS, sprite[1:]))
+                for sprite in self.get_tables()['skins']}
+
+    def get_sounds(self) -> list([tuple, tuple, tuple, ...]):
+        return list(self.get_tables()['sounds'])
+
+    def get_font(self, name) -> str:
+        for font_name, path, *_ in self.get_tables()['fonts']:
+            if font_name == name:
+                return path
+        raise KeyError(f'Unknown font: {name}')
+
+
+def parse_size(text: str) -> list:
+    return list(map(int, text.split('x')))
+
+
+def format_setting(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return 'x'.join(map(str, value))
+    return str(value)
+
+
+# Setting: (type of value, default for settings missing in file)
+SETTINGS = {'fps': (int, None), 'skin': (str, None),
+            'window_size': (parse_size, None), 'gravity': (float, None),
+            'step': (int, None), 'jump_power': (int, None),
+            'number_of_games': (int, None), 'visited_github': (int, None),
+            'show_fps': (int, '0'), 'show_timer': (int, '0'),
+            'tick_rate': (int, '30'), 'interpolate': (int, '0'),
+            'dirty_rects': (int, '0'), 'record_replays': (int, '1'),
+            'check_sprites': (int, '0')}
+
+
+class Settings:
+    '''In-memory store of settings from setiings file (ext: .ini)
+
+    File is parsed once, values are typed by SETTINGS. Saved values change
+    store at once and are written to file by background thread: changes
+    made within delay are written together, file is replaced atomically
+    by renamed temporary file. Pending changes are written at exit.
+
+    Initilization arguments:
+        *settings_file_name - Path to settings file: str
+        *delay - Time of gathering changes before write in seconds: float
+
+    Methods:
+        *all_settings - Parse all settings and return em
+        *get - Return typed value of setting
+        *subscribe - Call function with name and value of changed setting
+        *save - Change settings by given dictionary, write them later
+        *flush - Write pending changes now
+    '''
+    __slots__ = ['settings_path', 'settings_parser', 'settings', 'delay',
+                 'listeners', 'lock', 'write_lock', 'changed', 'deadline',
+                 'dirty', 'thread']
+
+    def __init__(self, settings_file_name: str, delay: float = 0.5):
+        self.settings_path: str = f'./{settings_file_name}'
+        self.settings_parser: ConfigParser = ConfigParser()
+        self.settings = self.all_settings()
+        self.delay: float = delay
+        # Setting name: functions called on its change
+        self.listeners: dict = {}
+        # Guards parser and pending state, write_lock serializes writes
+        self.lock: Lock = Lock()
+        self.write_lock: Lock = Lock()
+        self.changed: Event = Event()
+        self.deadline: float = 0.0
+        self.dirty: bool = False
+        self.thread: Thread = None
+
+    def all_settings(self) -> dict:
+        self.settings_parser.read(self.settings_path, encoding='utf-8')
+        dirty_settings: SectionProxy = self.settings_parser[
+            'ChristmasAdventures']
+        settings = {name: setting_type(dirty_settings.get(name, default))
+                    for name, (setting_type, default) in SETTINGS.items()}
+        settings['path'] = dirname(abspath(__file__))
+        settings['file'] = 'settings.ini'
+        return settings
+
+    def get(self, name: str):
+        return self.settings[name]
+
+    def subscribe(self, name: str, function) -> None:
+        self.listeners.setdefault(name, []).append(function)
+
+    def save(self, new_settings: dict) -> None:
+        changes = {}
+        with self.lock:
+            for key in new_settings:
+                text = format_setting(new_settings[key])
+                value = SETTINGS.get(key, (str,))[0](text)
+                self.settings_parser.set('ChristmasAdventures', key, text)
+                if self.settings.get(key) != value:
+                    changes[key] = value
+                self.settings[key] = value
+            self.dirty = True
+            self.deadline = perf_counter() + self.delay
+            if self.thread is None:
+                self.thread = Thread(target=self.work, name='settings',
+                                     daemon=True)
+                self.thread.start()
+                register(self.flush)
+        self.changed.set()
+        for key, value in changes.items():
+            for function in self.listeners.get(key, []):
+                function(key, value)
+
+    def work(self) -> None:
+        while True:
+            self.changed.wait()
+            self.changed.clear()
+            # Every new change moves deadline, file is written after pause
+            while True:
+                with self.lock:
+                    remaining = self.deadline - perf_counter()
+                if remaining <= 0:
+                    break
+                sleep(remaining)
+            try:
+                self.flush()
+            except OSError as error:
+                # Changes stay pending, next save tries to write them again
+                logging.error(f'Settings are not saved: {error}')
+
+    def flush(self) -> None:
+        with self.write_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                text = StringIO()
+                self.settings_parser.write(text)
+                # Every save moves deadline, so it tells are there changes
+                # made while file was written
+                deadline = self.deadline
+            temporary_path = f'{self.settings_path}.tmp'
+            with open(temporary_path, 'w', encoding='utf-8') as settings_file:
+                settings_file.write(text.getvalue())
+                settings_file.flush()
+                fsync(settings_file.fileno())
+            replace(temporary_path, self.settings_path)
+            with self.lock:
+                if self.deadline == deadline:
+                    self.dirty = False
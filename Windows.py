@@ -1,663 +1,935 @@
-from os.path import exists
-from webbrowser import open as wb_open
-
-import pygame
-import pygame_gui
-import pyganim
-
-from Sprites import Ball, Player
-from UI import Button, Label, Message, Text
-from Utils import DataBase, Settings, Sounds
-
-
-class Window:
-    '''Base window class
-
-    Initilization arguments:
-        *settings - Settings from 'Settings.setting' class: dict
-        *mode - Mode of window //examples 'main_window', 'login_window'
-                and etc : str
-
-    Methods:
-        *get_screen - Return window with selected title and size: pygame.Surface
-    '''
-    __slots__ = ['settings', 'fps', 'mode', 'background_filler',
-                 'text_filler', 'clock', 'screen', 'manager',
-                 'database', 'sounds']
-
-    def __init__(self, settings: dict, mode: str):
-        pygame.event.set_allowed(
-            [pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.KEYUP,
-             pygame.USEREVENT, pygame.MOUSEBUTTONUP])
-        pygame.key.set_repeat(1, 50)
-        self.settings: dict = settings
-        db_path: str = self.settings['path'] + '/assets/database/'
-        self.sounds = Sounds(db_path)
-        self.manager = pygame_gui.UIManager(self.settings['window_size'])
-        db_path = f'{self.settings["path"]}/assets/database/'
-        self.database = DataBase(db_path)
-        self.fps = self.settings['fps']
-        self.mode = mode
-        background_path = self.settings['path'] + \
-            '/assets/sprites/background/background.png'
-        self.background_filler = pygame.image.load(background_path)
-        self.clock: pygame.time.Clock = pygame.time.Clock()
-        icon_path = '/assets/sprites/icons/window_icons/icon_standart.png'
-        icon = pygame.image.load(self.settings['path'] + icon_path)
-        pygame.display.set_icon(icon)
-        self.screen = self.get_screen(
-            'Christmas Adventures', self.settings['window_size'])
-
-    def get_screen(self, title: str, window_size: list) -> pygame.Surface:
-        flags = pygame.DOUBLEBUF
-        screen: pygame.Surface = pygame.display.set_mode(window_size, flags)
-        screen.set_alpha(None)
-        pygame.display.set_caption(title)
-        return screen
-
-    def is_button_event(self, event) -> bool:
-        if event.user_type == pygame_gui.UI_BUTTON_PRESSED:
-            if event.ui_element.text == '':
-                for button_name in self.buttons:
-                    if event.ui_element == self.buttons[button_name]:
-                        return True
-        return False
-
-
-class Level(Window):
-    '''Base Level class
-
-    Initilization arguments:
-        *settings - Dict with settings from class Settings: dict
-
-    Methods:
-        *game_cycle - Start the window(game)
-        *event_handler - Work with events
-        *draw - Display and draw all objects
-     '''
-    __slots__ = ['santa', 'all_sprites', 'exit_sprites',
-                 'gui_sprites', 'wall_sprites', 'sprite_groups', 'trap_sprites',
-                 'move_direction', 'is_jumping', 'is_sitting', 'start_hit_points',
-                 'animation_list', 'anims', 'brick_sprites', 'is_walking',
-                 'buttons', 'texts', 'ball_sprites']
-
-    def __init__(self, settings: dict):
-        super().__init__(settings, mode='level')
-        self.move_direction = False
-        self.is_jumping = False
-        self.is_sitting = False
-        self.all_sprites = pygame.sprite.Group()
-        self.exit_sprites = pygame.sprite.Group()
-        self.gui_sprites = pygame.sprite.Group()
-        self.wall_sprites = pygame.sprite.Group()
-        self.trap_sprites = pygame.sprite.Group()
-        self.brick_sprites = pygame.sprite.Group()
-        self.ball_sprites = pygame.sprite.Group()
-        self.anims = {}
-        self.sprite_groups = {'all': self.all_sprites,
-                              'exit': self.exit_sprites,
-                              'brick': self.brick_sprites,
-                              'gui': self.gui_sprites,
-                              'wall': self.wall_sprites,
-                              'trap': self.trap_sprites,
-                              'ball': self.ball_sprites}
-        self.texts = self.database.get_text()
-        self.buttons = self.get_buttons()
-        load = pygame.image.load
-        relative_background_path = '/assets/sprites/background/background_level.png'
-        background_path = f'{self.settings["path"]}{relative_background_path}'
-        self.background_filler = load(background_path)
-        self.santa: Player = Player(
-            [65, self.settings['window_size'][1] - 216],
-            2, Settings(self.settings['file']).settings['skin'],
-            self.all_sprites,
-            self.settings)
-        self.start_hit_points = self.santa.hit_points
-        self.get_animations()
-        self.animation_list = []
-        self.is_walking = False
-
-    def reset(self):
-        self.move_direction = False
-        self.is_jumping = False
-        self.is_sitting = False
-        self.is_walking = False
-
-    def get_animations(self):
-        self.anims['chainsaw'] = pyganim.PygAnimation(
-            [(self.settings['path']
-              + f'/assets/sprites/traps/chainsaw/chainsaw_{i}.png', 100)
-             for i in range(0, 6)])
-        self.anims['chainsaw'].play()
-        self.anims['vulkan'] = pyganim.PygAnimation(
-            [(self.settings['path']
-              + f'/assets/sprites/traps/vulkan/vulkan_{i}.png', 100)
-             for i in range(0, 26)])
-        self.anims['vulkan'].play()
-        self.anims['ball'] = pyganim.PygAnimation(
-            [(self.settings['path'] +
-              f'/assets/sprites/traps/ball/ball_{i}.png', 100)
-             for i in range(0, 6)])
-        self.anims['ball'].play()
-        self.anims['box_glover'] = pyganim.PygAnimation(
-            [(self.settings['path'] +
-              f'/assets/sprites/traps/box_glover/box_glover_{i}.png', 100)
-             for i in range(0, 36)])
-        self.anims['box_glover'].play()
-
-    def draw_animation(self, key, position):
-        self.anims[key].blit(self.screen, (*position,))
-
-    def get_sprite(self, image, position,
-                   sprite_groups=[]) -> pygame.sprite.Sprite:
-        sprite = pygame.sprite.Sprite()
-        sprite.image = pygame.image.load(image)
-        sprite.mask = pygame.mask.from_surface(sprite.image)
-        sprite.rect = pygame.Rect((*position,), (*sprite.mask.get_size(),))
-        self.all_sprites.add(sprite)
-        if sprite_groups != []:
-            for sprite_group in sprite_groups:
-                sprite_group.add(sprite)
-        return sprite
-
-    def floor(self, position) -> pygame.sprite.Sprite:
-        sprite_groups = [self.wall_sprites]
-        rel_path = '/assets/sprites/wall/wall_800x60.png'
-        floor_path = self.settings['path'] + rel_path
-        return self.get_sprite(floor_path, position, sprite_groups)
-
-    def wall(self, position) -> pygame.sprite.Sprite:
-        sprite_groups = [self.wall_sprites]
-        rel_path = '/assets/sprites/wall/wall_60x595.png'
-        wall_path = self.settings['path'] + rel_path
-        return self.get_sprite(wall_path, position, sprite_groups)
-
-    def exit(self, position) -> pygame.sprite.Sprite:
-        sprite_groups = [self.exit_sprites]
-        rel_path = '/assets/sprites/icons/reward/trophey.png'
-        trophey_path = self.settings['path'] + rel_path
-        return self.get_sprite(trophey_path, position, sprite_groups)
-
-    def thorn(self, position, turn='top') -> pygame.sprite.Sprite:
-        sprite_groups = [self.trap_sprites]
-        if turn == 'top':
-            rel_path = '/assets/sprites/traps/thorns/thorn.png'
-        elif turn == 'left':
-            rel_path = '/assets/sprites/traps/thorns/thorn_left.png'
-        elif turn == 'right':
-            rel_path = '/assets/sprites/traps/thorns/thorn_right.png'
-        elif turn == 'down':
-            rel_path = '/assets/sprites/traps/thorns/thorn_down.png'
-        thorn_path = self.settings['path'] + rel_path
-        return self.get_sprite(thorn_path, position, sprite_groups)
-
-    def thorns5x(self, position):
-        sprite_groups = [self.trap_sprites]
-        rel_path = '/assets/sprites/traps/thorns/thorns_x5.png'
-        thorn_path = self.settings['path'] + rel_path
-        return self.get_sprite(thorn_path, position, sprite_groups)
-
-    def brick(self, position):
-        sprite_groups = [self.wall_sprites, self.brick_sprites]
-        rel_path = '/assets/sprites/brick/brick.png'
-        brick_path = self.settings['path'] + rel_path
-        return self.get_sprite(brick_path, position, sprite_groups)
-
-    def borders(self):
-        self.floor([0, 0])
-        self.floor([0, 470])
-        self.wall([0, 0])
-        self.wall([750, 0])
-
-    def ball(self, position):
-        rel_path = '/assets/sprites/traps/ball/ball_0.png'
-        ball_path = self.settings['path'] + rel_path
-        ball = Ball(position, self.settings)
-        self.all_sprites.add(ball)
-        self.sprite_groups['trap'].add(ball)
-        self.sprite_groups['ball'].add(ball)
-        return ball
-
-    def box_glover(self, position):
-        self.animation_list.append(['box_glover', position])
-        sprite_groups = [self.trap_sprites]
-        rel_path = '/assets/sprites/traps/box_glover/box_glover_static.png'
-        box_glover_path = self.settings['path'] + rel_path
-        return self.get_sprite(box_glover_path, position, sprite_groups)
-
-    def chainsaw(self, position):
-        self.animation_list.append(['chainsaw', position])
-        sprite_groups = [self.trap_sprites]
-        rel_path = '/assets/sprites/traps/chainsaw/chainsaw_0.png'
-        chainsaw_path = self.settings['path'] + rel_path
-        return self.get_sprite(chainsaw_path, position, sprite_groups)
-
-    def vulkan(self, position):
-        self.animation_list.append(['vulkan', position])
-        sprite_groups = [self.trap_sprites]
-        rel_path = '/assets/sprites/traps/vulkan/vulkan_25.png'
-        vulkan_path = self.settings['path'] + rel_path
-        return self.get_sprite(vulkan_path, position, sprite_groups)
-
-    def game_cycle(self) -> None:
-        running = True
-        while running:
-            time_delta = self.clock.tick(60) / 1000.0
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                else:
-                    self.manager.process_events(event)
-                    running = self.event_handler(event)
-                    if not running:
-                        break
-            if self.santa.is_collide(self.sprite_groups['exit']):
-                self.mode = 'win'
-                running = False
-            if self.santa.is_collide(self.sprite_groups['trap']):
-                self.santa.die()
-            if self.santa.hit_points <= 0:
-                self.sounds.play('lose')
-                self.mode = 'lose'
-                running = False
-            self.clock.tick(self.fps)
-            self.screen.blit(self.background_filler, [0, 0])
-            self.draw()
-            self.manager.draw_ui(self.screen)
-            self.manager.update(time_delta)
-            pygame.display.update()
-
-    def event_handler(self, event: pygame.event) -> bool:
-        if event.type == pygame.KEYDOWN:
-            keys = pygame.key.get_pressed()
-            if keys[pygame.K_RIGHT]:
-                self.move_direction = 'rigth'
-            if keys[pygame.K_LEFT]:
-                self.move_direction = 'left'
-            if keys[pygame.K_DOWN]:
-                self.is_sitting = True
-            if keys[pygame.K_UP]:
-                self.is_jumping = True
-        elif event.type == pygame.USEREVENT and self.is_button_event(event):
-            button_name = event.ui_element.code_name
-            if button_name == 'faq':
-                Message(self.texts['ordinary_level_tip'], 'Help',
-                        self.manager, [170, 100], [400, 300], 'help_msg')
-            elif button_name == 'menu':
-                self.mode = 'main_window'
-                return False
-            elif button_name == 'replay':
-                self.mode = 'replay'
-                return False
-        return True
-
-    def draw(self) -> None:
-        self.all_sprites.draw(self.screen)
-        self.santa.update(
-            self.sprite_groups['wall'], self.all_sprites,
-            self.move_direction, self.is_jumping, self.is_sitting)
-        self.is_sitting = False
-        self.move_direction = False
-        self.is_jumping = False
-        self.santa.skin_group.draw(self.screen)
-        self.draw_hearts()
-        for animation_info in self.animation_list:
-            animation_key, position = animation_info
-            self.anims[animation_key].blit(self.screen, (*position,))
-        for ball in self.sprite_groups['ball']:
-            ball.update()
-
-    def draw_hearts(self):
-        hearts = pygame.sprite.Group()
-        for i in range(self.start_hit_points - self.santa.hit_points):
-            heart = pygame.sprite.Sprite()
-            image_path = self.settings['path'] +\
-                '/assets/sprites/icons/heart/red_heart.png'
-            heart.rect = pygame.Rect((*[20 + i * 13, 20],), (*[0, 0],))
-            heart.image = pygame.image.load(image_path)
-            hearts.add(heart)
-        hearts.draw(self.screen)
-        for i in range(self.santa.hit_points):
-            heart = pygame.sprite.Sprite()
-            image_path = self.settings['path'] +\
-                '/assets/sprites/icons/heart/red_heart.png'
-            heart.image = pygame.image.load(image_path)
-            heart.rect = pygame.Rect((*[20 + i * 15, 20],), (*[0, 0],))
-            hearts.add(heart)
-        hearts.draw(self.screen)
-
-    def get_buttons(self) -> dict:
-        images_name_list = ['menu', 'replay', 'faq']
-        buttons = {}
-        space = self.settings['window_size'][0] // (
-            len(images_name_list) + 10)
-        for index, name in enumerate(images_name_list):
-            button = Button(
-                '', name, self.manager,
-                [5, index * space + 50])
-            gui_path = self.settings['path'] + '/assets/sprites/icons/gui/'
-            button.set_icon(gui_path + name + '.png')
-            buttons[name] = button
-        return buttons
-
-
-class MainWindow(Window):
-    __slots__ = ['background_filler', 'texts', 'main_text', 'buttons']
-
-    def __init__(self, settings: dict):
-        super().__init__(settings, mode='main_window')
-        db_path = f'{self.settings["path"]}/assets/database/'
-        database = DataBase(db_path)
-        self.texts = database.get_text()
-        sprites = f'{self.settings["path"]}/assets/sprites/'
-        background_path = f'{sprites}/background/main_window_background.png'
-        self.background_filler = pygame.image.load(background_path)
-        self.main_text = Text('Christmas Adventures', 'main_text', settings)
-        self.buttons = self.get_buttons()
-        self.get_labels()
-        self.sounds.play('theme')
-
-    def draw(self) -> None:
-        self.main_text.draw(self.screen)
-
-    def get_labels(self) -> None:
-        space = self.settings['window_size'][0] // len(
-            list(self.buttons.keys()))
-        for button in self.buttons:
-            button = self.buttons[button]
-            label = Label(self.texts[button.code_name],
-                          button.code_name + '_label',
-                          self.manager, [1, 1], [1, 1])
-            label.connect_to_button(
-                button, self.settings['window_size'], space)
-
-    def get_buttons(self) -> dict:
-        images_name_list = ['faq', 'shop', 'play']
-        buttons = {}
-        space = self.settings['window_size'][0] // len(images_name_list)
-        for index, name in enumerate(images_name_list):
-            button = Button(
-                '', name, self.manager,
-                [5 + index * space, self.settings['window_size'][1] - 55])
-            gui_path = self.settings['path'] + '/assets/sprites/icons/gui/'
-            button.set_icon(gui_path + name + '.png')
-            buttons[name] = button
-        return buttons
-
-    def show_faq(self) -> Message:
-        window = Message(self.texts['faq_text'], 'faq_text', self.manager,
-                         [170, 100], [400, 300], 'FAQ')
-        return window
-
-    def game_cycle(self) -> None:
-        running = True
-        faq = None
-        while running:
-            time_delta = self.clock.tick(60) / 1000.0
-            for event in pygame.event.get():
-                running, faq = self.event_handler(event, running, faq)
-                self.manager.process_events(event)
-            if faq != None and not faq.is_alive():
-                faq.kill()
-            self.clock.tick(self.fps)
-            self.screen.blit(self.background_filler, [0, 0])
-            self.draw()
-            self.manager.draw_ui(self.screen)
-            self.manager.update(time_delta)
-            pygame.display.update()
-
-    def is_button_event(self, event) -> bool:
-        if event.user_type == pygame_gui.UI_BUTTON_PRESSED:
-            if event.ui_element.text == '':
-                for button_name in self.buttons:
-                    if event.ui_element == self.buttons[button_name]:
-                        return True
-        return False
-
-    def event_handler(self, event, running, faq=None) -> (bool, None):
-        if event.type == pygame.QUIT:
-            running = False
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_p:
-                self.mode = 'level'
-                running = False
-        elif event.type == pygame.USEREVENT and self.is_button_event(event):
-            button_name = event.ui_element.code_name
-            if button_name == 'faq':
-                faq = self.show_faq()
-            elif button_name == 'play':
-                self.mode = 'level'
-                running = False
-            elif button_name == 'shop':
-                self.mode = 'shop_window'
-                running = False
-        if not running:
-            self.sounds.stop_all()
-        return (running, faq)
-
-
-class LoseWindow(Window):
-    def __init__(self, settings: dict):
-        super().__init__(settings, mode='lose_window')
-        self.buttons: list = self.get_buttons()
-        self.main_text = Text('Game over', 'main_text', settings)
-        background_path = self.settings['path'] + \
-            '/assets/sprites/background/main_window_background.png'
-        self.background_filler = pygame.image.load(background_path)
-
-        self.sounds.stop_all()
-        self.sounds.play('lose')
-
-    def get_buttons(self) -> list:
-        images_name_list = ['replay'] * 10
-        buttons = []
-        space = self.settings['window_size'][0] // len(images_name_list)
-        for index, name in enumerate(images_name_list):
-            button = Button(
-                '', name, self.manager,
-                [5 + index * space, self.settings['window_size'][1] - 55])
-            gui_path = self.settings['path'] + '/assets/sprites/icons/gui/'
-            button.set_icon(gui_path + name + '.png')
-            buttons.append(button)
-        return buttons
-
-    def game_cycle(self) -> None:
-        running = True
-        while running:
-            time_delta = self.clock.tick(60) / 1000.0
-            for event in pygame.event.get():
-                running = self.event_handler(event, running)
-                self.manager.process_events(event)
-            self.clock.tick(self.fps)
-            self.screen.blit(self.background_filler, [0, 0])
-            self.draw()
-            self.manager.draw_ui(self.screen)
-            self.manager.update(time_delta)
-            pygame.display.update()
-
-    def draw(self):
-        self.main_text.draw(self.screen)
-
-    def is_button_event(self, event) -> bool:
-        if event.user_type == pygame_gui.UI_BUTTON_PRESSED:
-            if event.ui_element.text == '':
-                for button_name in self.buttons:
-                    if event.ui_element == button_name:
-                        return True
-        return False
-
-    def event_handler(self, event, running) -> (bool, None):
-        if event.type == pygame.QUIT:
-            running = False
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_p:
-                self.mode = 'level'
-                running = False
-        elif event.type == pygame.USEREVENT and self.is_button_event(event):
-            button_name = event.ui_element.code_name
-            if button_name == 'replay':
-                self.mode = 'level'
-                running = False
-        if not running:
-            self.sounds.stop_all()
-        return running
-
-
-class EndWindow(Window):
-    def __init__(self, settings: dict):
-        super().__init__(settings, mode='win_window')
-        background_path = self.settings['path'] + \
-            '/assets/sprites/background/win_background.png'
-        self.background_filler = pygame.image.load(background_path)
-        self.sounds.play('win')
-
-    def game_cycle(self) -> None:
-        running = True
-        while running:
-            time_delta = self.clock.tick(60) / 1000.0
-            for event in pygame.event.get():
-                running = self.event_handler(event, running)
-            self.clock.tick(self.fps)
-            self.screen.blit(self.background_filler, [0, 0])
-            pygame.display.update()
-
-    def event_handler(self, event, running) -> bool:
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            self.mode = 'main_window'
-            running = False
-        if not running:
-            self.sounds.stop_all()
-        return running
-
-
-class ShopWindow(Window):
-    def __init__(self, settings):
-        self.settings_manager = settings
-        settings = settings.settings
-        super().__init__(settings, mode='shop_window')
-        self.all_sprites = pygame.sprite.Group()
-        self.main_text = Text('Shop', 'main_text', settings)
-        background_path = self.settings['path'] + \
-            '/assets/sprites/background/main_window_background.png'
-        self.background_filler = pygame.image.load(background_path)
-        db_path = f'{self.settings["path"]}/assets/database/'
-        database = DataBase(db_path)
-        self.texts = database.get_text()
-        self.skins = database.get_skins()
-        self.buttons = self.get_buttons()
-        self.show_skin()
-
-    def show_skin(self, skin=''):
-        if skin == '':
-            skin = self.settings['skin']
-        sprite = pygame.sprite.Sprite()
-        sprite.image = pygame.transform.scale(pygame.image.load(
-            self.settings['path'] + self.skins[skin]['stand']), [200, 200])
-        sprite.mask = pygame.mask.from_surface(sprite.image)
-        sprite.rect = pygame.Rect(([50, 100]), (*sprite.mask.get_size(),))
-        self.all_sprites = pygame.sprite.Group()
-        self.all_sprites.add(sprite)
-        self.current_showing_skin = skin
-
-    def get_buttons(self):
-        images_name_list = ['red', 'mask', 'thief', 'blue_spirit',
-                            'gold', 'invisible']
-        buttons = {}
-        space = self.settings['window_size'][0] // len(images_name_list)
-        for index, name in enumerate(images_name_list):
-            button = Button(
-                '', name, self.manager,
-                [5 + index * space, self.settings['window_size'][1] - 55])
-            button.set_icon(
-                self.settings['path'] + self.skins[name]['stand'], False)
-            buttons[name] = button
-        button = Button(
-            '', 'yes', self.manager,
-            [46, 347])
-        gui_path = self.settings['path'] + '/assets/sprites/icons/gui/'
-        button.set_icon(gui_path + 'yes.png')
-        buttons['yes'] = button
-        button = Button(
-            '', 'no', self.manager,
-            [126, 347])
-        gui_path = self.settings['path'] + '/assets/sprites/icons/gui/'
-        button.set_icon(gui_path + 'no.png')
-        buttons['no'] = button
-        return buttons
-
-    def draw(self):
-        self.all_sprites.draw(self.screen)
-        self.main_text.draw(self.screen)
-
-    def game_cycle(self) -> None:
-        running = True
-        faq = None
-        while running:
-            time_delta = self.clock.tick(60) / 1000.0
-            for event in pygame.event.get():
-                running, faq = self.event_handler(event, running, faq)
-                self.manager.process_events(event)
-            if faq != None and not faq.is_alive():
-                faq.kill()
-            self.clock.tick(self.fps)
-            self.screen.blit(self.background_filler, [0, 0])
-            self.draw()
-            self.manager.draw_ui(self.screen)
-            self.manager.update(time_delta)
-            pygame.display.update()
-
-    def is_button_event(self, event) -> bool:
-        if event.user_type == pygame_gui.UI_BUTTON_PRESSED:
-            if event.ui_element.text == '':
-                for button_name in self.buttons:
-                    if event.ui_element == self.buttons[button_name]:
-                        return True
-        return False
-
-    def event_handler(self, event, running, faq=None) -> (bool, None):
-        if event.type == pygame.QUIT:
-            running = False
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_p:
-                self.mode = 'level'
-                running = False
-        elif event.type == pygame.USEREVENT and self.is_button_event(event):
-            button_name = event.ui_element.code_name
-            if button_name in self.skins:
-                self.show_skin(button_name)
-            elif button_name == 'no':
-                running = False
-                self.mode = 'main_window'
-            elif button_name == 'yes':
-                self.skin_applyer(self.current_showing_skin)
-        if not running:
-            self.sounds.stop_all()
-        return (running, faq)
-
-    def skin_applyer(self, skin):
-        change = False
-        if skin in ['red', 'mask']:
-            change = True
-        elif skin == 'golden':
-            if self.settings['number_of_games'] >= 100:
-                change = True
-        elif skin == 'blue_spirit':
-            if exists(self.settings['path'] + '/error_log.txt'):
-                change = True
-        elif skin == 'invisible':
-            if self.settings['visited_github']:
-                change = True
-            else:
-                self.settings['visited_github'] = 1
-                self.settings_manager.save({'visited_github': '1'})
-                wb_open('https://github.com/Ulbandus/ChristmasAdventures')
-        elif skin == 'thief':
-            if self.settings['step'] != 5 or self.settings['gravity'] != 0.5:
-                change = True
-        if change:
-            self.settings_manager.save({'skin': skin})
-        else:
-            Message(self.texts['skin_blocked'], 'Skin Blocked', self.manager,
-                    [170, 100], [400, 300], 'skin_error')
+from os import environ, makedirs
+from os.path import exists
+from random import Random, randrange
+from webbrowser import open as wb_open
+
+import pygame
+import pygame_gui
+
+from Assets import asset_store
+from Audio import SoundBank
+from ImageCache import image_cache
+from Loop import GameLoop
+from Preload import preloader
+from Profiler import COLLISIONS, DRAW, FLIP, UI, UPDATE, profiler
+from Render import DirtyRenderer
+from Runtime import runtime
+from UI import HUD, Button, Hearts, HUDText, Label, Message, Text
+from Utils import DataBase
+
+
+# Input bits of Level.step
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_JUMP = 4
+INPUT_SIT = 8
+WINDOW_BACKGROUND = '/assets/sprites/background/background.png'
+WINDOW_ICON = '/assets/sprites/icons/window_icons/icon_standart.png'
+LEVEL_BUTTONS = ('menu', 'replay', 'faq')
+LEVEL_BACKGROUND = '/assets/sprites/background/background_level.png'
+
+
+def init_headless() -> None:
+    '''Init pygame with dummy video and audio drivers (if it is not inited
+    yet), so images can be converted and sounds loaded without real window
+    and sound card'''
+    if not pygame.display.get_init():
+        environ['SDL_VIDEODRIVER'] = 'dummy'
+        environ['SDL_AUDIODRIVER'] = 'dummy'
+        pygame.init()
+    if pygame.display.get_surface() is None:
+        # Surface.convert needs any video mode
+        pygame.display.set_mode([1, 1])
+
+
+class Window:
+    '''Base window class
+
+    Initilization arguments:
+        *settings - Settings from 'Settings.setting' class: dict
+        *mode - Mode of window //examples 'main_window', 'login_window'
+                and etc : str
+        *headless - Draw to off-screen surface and don't create UI: bool
+
+    Display, UI manager, sounds and databases are borrowed from
+    Runtime.runtime, they live as long as game process.
+
+    With 'dirty_rects' setting on, self.screen only records blits and
+    DirtyRenderer redraws and pushes changed parts of display on flip.
+
+    Methods:
+        *get_screen - Return window with selected title and size: pygame.Surface
+        *game_cycle - Run window in game loop until it closes
+        *process_events - Handle events of one frame
+        *tick - Advance window simulation by one tick
+        *render - Draw one frame
+        *draw_frame - Draw background and window objects
+        *draw_ui - Draw and update pygame_gui elements
+        *flip - Show drawn frame on display
+        *release - Drop objects of closed window kept by engine objects
+    '''
+    __slots__ = ['settings', 'fps', 'mode', 'background_filler',
+                 'text_filler', 'clock', 'screen', 'manager',
+                 'database', 'sounds', 'loop', 'headless', 'renderer']
+
+    def __init__(self, settings: dict, mode: str, headless: bool = False):
+        self.headless: bool = headless
+        if headless:
+            init_headless()
+        pygame.event.set_allowed(
+            [pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.KEYUP,
+             pygame.USEREVENT, pygame.MOUSEBUTTONUP])
+        pygame.key.set_repeat(1, 50)
+        self.settings: dict = settings
+        db_path: str = self.settings['path'] + '/assets/database/'
+        self.sounds: SoundBank = runtime.get_sounds(db_path)
+        self.manager: pygame_gui.UIManager = None
+        if not headless:
+            self.manager = runtime.get_manager(self.settings['window_size'])
+        self.database: DataBase = runtime.get_database(db_path)
+        self.fps = self.settings['fps']
+        self.mode = mode
+        self.background_filler = asset_store.get(
+            self.settings['path'] + WINDOW_BACKGROUND, 'raw')
+        self.clock: pygame.time.Clock = pygame.time.Clock()
+        self.loop: GameLoop = GameLoop(
+            self.clock, self.settings['tick_rate'], self.fps)
+        self.renderer: DirtyRenderer = None
+        if headless:
+            self.screen = pygame.Surface(self.settings['window_size'])
+            return
+        self.screen = self.get_screen(
+            'Christmas Adventures', self.settings['window_size'])
+        if self.settings['dirty_rects']:
+            self.renderer = DirtyRenderer(self.screen)
+            self.screen = self.renderer.canvas
+
+    def get_screen(self, title: str, window_size: list) -> pygame.Surface:
+        return runtime.get_screen(title, window_size,
+                                  self.settings['path'] + WINDOW_ICON)
+
+    def game_cycle(self) -> None:
+        self.loop.run(self)
+
+    def process_events(self, events: list) -> bool:
+        running = True
+        for event in events:
+            if event.type == pygame.QUIT:
+                running = False
+        return running
+
+    def tick(self) -> bool:
+        return True
+
+    def draw(self) -> None:
+        pass
+
+    def render(self, alpha: float, time_delta: float) -> None:
+        self.draw_frame()
+        profiler.mark(DRAW)
+        self.draw_ui(time_delta)
+        profiler.draw(self.screen)
+        profiler.mark(UI)
+        self.flip()
+        profiler.mark(FLIP)
+
+    def draw_frame(self) -> None:
+        self.screen.blit(self.background_filler, [0, 0])
+        self.draw()
+
+    def draw_ui(self, time_delta: float) -> None:
+        if self.manager is not None:
+            self.manager.draw_ui(self.screen)
+            self.manager.update(time_delta)
+
+    def flip(self) -> None:
+        if self.renderer is not None:
+            pygame.display.update(self.renderer.present())
+        elif not self.headless:
+            pygame.display.update()
+
+    def release(self) -> None:
+        if self.manager is not None:
+            self.manager.clear_and_reset()
+
+    def is_button_event(self, event) -> bool:
+        if event.user_type == pygame_gui.UI_BUTTON_PRESSED:
+            if event.ui_element.text == '':
+                for button_name in self.buttons:
+                    if event.ui_element == self.buttons[button_name]:
+                        return True
+        return False
+
+
+class Level(Window):
+    '''Base Level class
+
+    Initilization arguments:
+        *settings - Dict with settings from class Settings: dict
+        *hit_points - Count of player lifes : int
+        *headless - Create level without window and UI, so it can be
+                    stepped by hand as fast as possible: bool
+        *seed - Seed of level random generator, None - random seed: int
+        *skin - Player skin, None - skin from settings file: str
+
+    Modules of sprites, collisions, level files, animations and replays
+    are imported by methods which use them, so main menu starts without
+    them.
+
+    Methods:
+        *game_cycle - Start the window(game)
+        *event_handler - Work with events
+        *step - Apply input bitmask, advance one tick, return level state
+        *get_state - Return dict with level and player state
+        *get_inputs - Return input bitmask of current tick
+        *get_time - Return level time in ms, it drives animations
+        *create_sprite_groups - Create empty sprite groups and static layer
+        *add_static - Create static sprites of one kind in bulk
+        *preload - Start decoding of level assets in background
+                   (class method)
+        *get_sprites - Load level objects from level file
+        *load_layout - Build level from file or its compiled cache
+        *save_replay - Save recorded run to replay file
+        *tick - Play or record input and advance level by one tick
+        *update - Move player and traps
+        *check_state - Check win, lose and player death
+        *get_static_layer - Return layer of background and static sprites
+        *get_background - Return level background cropped to window size
+        *draw_frame - Draw static layer and dynamic objects
+        *draw - Draw dynamic objects (player, traps, particles and HUD)
+        *release - Break cycles of sprites, groups and HUD of closed level
+     '''
+    __slots__ = ['santa', 'all_sprites', 'exit_sprites',
+                 'gui_sprites', 'wall_sprites', 'sprite_groups', 'trap_sprites',
+                 'move_direction', 'is_jumping', 'is_sitting', 'start_hit_points',
+                 'animated_sprites', 'brick_sprites', 'is_walking',
+                 'buttons', 'texts', 'ball_sprites', 'hud', 'ticks',
+                 'alpha', 'running', 'seed', 'random', 'recording',
+                 'playback', 'static_layer', 'rules']
+
+    # Name of level file in assets/levels, None - level builds itself
+    layout_name = None
+
+    def __init__(self, settings: dict, hit_points: int = 2,
+                 headless: bool = False, seed: int = None, skin: str = None):
+        from Replay import Recording
+        from Sprites import Player
+
+        super().__init__(settings, mode='level', headless=headless)
+        self.seed: int = randrange(2 ** 32) if seed is None else seed
+        self.random: Random = Random(self.seed)
+        if skin is None:
+            skin = runtime.get_settings(self.settings['file']).get('skin')
+        self.move_direction = False
+        self.is_jumping = False
+        self.is_sitting = False
+        self.texts = self.database.get_text()
+        self.buttons = {} if headless else self.get_buttons()
+        self.rules: dict = {}
+        self.create_sprite_groups()
+        self.santa: Player = Player(
+            [65, self.settings['window_size'][1] - 216],
+            2, skin, self.all_sprites, self.settings)
+        # Santa is drawn by level itself, at interpolated position
+        self.all_sprites.remove(self.santa)
+        self.alpha: float = 1.0
+        self.start_hit_points = self.santa.hit_points
+        self.santa.hit_points = hit_points
+        self.recording: Recording = Recording(
+            type(self).__name__, self.seed, hit_points, skin, self.settings)
+        # Iterator over recorded ticks while replay is playing
+        self.playback = None
+        self.ticks: int = 0
+        self.running: bool = True
+        self.hud: HUD = self.get_hud()
+        self.is_walking = False
+
+    def create_sprite_groups(self) -> None:
+        from Collisions import CollisionGroup
+
+        # Baked masks grow past window for sprites reaching out of it
+        level_rect = pygame.Rect((0, 0), self.settings['window_size'])
+        self.all_sprites = pygame.sprite.Group()
+        self.exit_sprites = CollisionGroup(bounds=level_rect)
+        self.gui_sprites = pygame.sprite.Group()
+        self.wall_sprites = CollisionGroup(bounds=level_rect)
+        self.trap_sprites = CollisionGroup(bounds=level_rect)
+        self.brick_sprites = pygame.sprite.Group()
+        self.ball_sprites = pygame.sprite.Group()
+        self.animated_sprites = pygame.sprite.Group()
+        self.sprite_groups = {'all': self.all_sprites,
+                              'exit': self.exit_sprites,
+                              'brick': self.brick_sprites,
+                              'gui': self.gui_sprites,
+                              'wall': self.wall_sprites,
+                              'trap': self.trap_sprites,
+                              'ball': self.ball_sprites,
+                              'animated': self.animated_sprites}
+        # Static sprites are baked into it by add_static as they are added,
+        # it is created on first use, so cached layer skips background
+        self.static_layer: pygame.Surface = None
+
+    def reset(self):
+        self.move_direction = False
+        self.is_jumping = False
+        self.is_sitting = False
+        self.is_walking = False
+
+    @classmethod
+    def preload(cls, settings: dict) -> None:
+        '''Start decoding of level assets on preloader thread'''
+        from LevelFiles import (STATIC_OBJECTS, LevelLayout,
+                                get_animation_paths)
+
+        root_path = settings['path']
+        gui_path = f'{root_path}/assets/sprites/icons/gui/'
+        preloader.load_images(
+            [root_path + WINDOW_BACKGROUND, root_path + WINDOW_ICON] +
+            [f'{gui_path}{name}{suffix}.png' for name in LEVEL_BUTTONS
+             for suffix in ('', '_pressed')], ('raw',))
+        if cls.layout_name is None:
+            return
+        layout = LevelLayout.load(root_path, cls.layout_name)
+        if not layout.is_compiled():
+            preloader.load_images([root_path + LEVEL_BACKGROUND], ('raw',))
+        preloader.load_images(
+            [f'{root_path}/assets/sprites/{STATIC_OBJECTS[kind][0]}'
+             for kind, _ in layout.static], ('alpha', 'mask'))
+        for kind in dict.fromkeys(kind for kind, _ in layout.animated):
+            preloader.load_animation(kind,
+                                     get_animation_paths(root_path, kind))
+
+    def get_animation(self, name: str) -> 'Animation':
+        from Animations import atlas
+        from LevelFiles import get_animation_paths
+
+        return atlas.get(name,
+                         get_animation_paths(self.settings['path'], name))
+
+    def get_time(self) -> int:
+        # Animations run on simulation time, so replays see the same frames
+        return self.ticks * 1000 // self.settings['tick_rate']
+
+    def add_static(self, kind: str, positions: list,
+                   bake: bool = True) -> list:
+        from LevelFiles import STATIC_OBJECTS
+
+        image_path, group_names = STATIC_OBJECTS[kind]
+        path = f'{self.settings["path"]}/assets/sprites/{image_path}'
+        image = asset_store.image(path)
+        mask = asset_store.mask(path)
+        size = mask.get_size()
+        sprites = []
+        for position in positions:
+            sprite = pygame.sprite.Sprite()
+            sprite.image = image
+            sprite.mask = mask
+            sprite.rect = pygame.Rect((*position,), size)
+            sprites.append(sprite)
+        self.all_sprites.add(sprites)
+        for group_name in group_names:
+            self.sprite_groups[group_name].add(sprites)
+        if bake:
+            self.get_static_layer().blits(
+                [(image, sprite.rect) for sprite in sprites], False)
+            # Layer is changed in place, renderer sees the same surface
+            if self.renderer is not None:
+                for sprite in sprites:
+                    self.renderer.invalidate(sprite.rect)
+        return sprites
+
+    def floor(self, position) -> pygame.sprite.Sprite:
+        return self.add_static('floor', [position])[0]
+
+    def wall(self, position) -> pygame.sprite.Sprite:
+        return self.add_static('wall', [position])[0]
+
+    def exit(self, position) -> pygame.sprite.Sprite:
+        return self.add_static('exit', [position])[0]
+
+    def thorn(self, position, turn='top') -> pygame.sprite.Sprite:
+        kind = 'thorn' if turn == 'top' else f'thorn_{turn}'
+        return self.add_static(kind, [position])[0]
+
+    def thorns5x(self, position):
+        return self.add_static('thorns5x', [position])[0]
+
+    def brick(self, position):
+        return self.add_static('brick', [position])[0]
+
+    def borders(self):
+        from LevelFiles import BORDERS
+
+        for kind, positions in BORDERS:
+            self.add_static(kind, positions)
+
+    def ball(self, position):
+        from Sprites import Ball
+
+        ball = Ball(position, self.settings, self.random)
+        self.sprite_groups['trap'].add(ball)
+        self.sprite_groups['ball'].add(ball)
+        return ball
+
+    def animated_trap(self, kind: str, position: list) -> 'AnimatedTrap':
+        from Sprites import AnimatedTrap
+
+        animation = self.get_animation(kind)
+        trap = AnimatedTrap(animation, position, self.get_time)
+        self.trap_sprites.add(trap)
+        self.animated_sprites.add(trap)
+        return trap
+
+    def box_glover(self, position):
+        return self.animated_trap('box_glover', position)
+
+    def chainsaw(self, position):
+        return self.animated_trap('chainsaw', position)
+
+    def vulkan(self, position):
+        return self.animated_trap('vulkan', position)
+
+    def get_sprites(self) -> None:
+        if self.layout_name is not None:
+            self.load_layout(self.layout_name)
+
+    def load_layout(self, name: str, use_cache: bool = True) -> None:
+        from LevelFiles import STATIC_OBJECTS, LevelLayout
+
+        root_path = self.settings['path']
+        layout = LevelLayout.load(root_path, name, use_cache)
+        self.rules = layout.rules
+        compiled = layout.is_compiled() and \
+            layout.size == (*self.settings['window_size'],)
+        for kind, positions in layout.static:
+            self.add_static(kind, positions, bake=not compiled)
+        for kind, position in layout.animated:
+            self.animated_trap(kind, position)
+        for x, y_range in layout.balls:
+            self.ball([x, self.random.randrange(*y_range)])
+        if compiled:
+            self.static_layer = layout.get_layer()
+            return
+        if not use_cache:
+            return
+        dependencies = [LEVEL_BACKGROUND] + list(dict.fromkeys(
+            f'/assets/sprites/{STATIC_OBJECTS[kind][0]}'
+            for kind, _ in layout.static))
+        try:
+            layout.compile(root_path, self.get_static_layer(), dependencies)
+        except OSError:
+            # Cache is optional, read-only game folder just loads slower
+            pass
+
+    def process_events(self, events: list) -> bool:
+        for event in events:
+            if event.type == pygame.QUIT:
+                return False
+            if self.manager is not None:
+                self.manager.process_events(event)
+            if not self.event_handler(event):
+                return False
+        return True
+
+    def step(self, inputs: int = 0, render: bool = False) -> dict:
+        self.set_inputs(inputs)
+        self.tick()
+        if render:
+            self.render(1.0, 1 / self.settings['tick_rate'])
+        return self.get_state()
+
+    def set_inputs(self, inputs: int) -> None:
+        # Left wins over right, like in event_handler
+        if inputs & INPUT_LEFT:
+            self.move_direction = 'left'
+        elif inputs & INPUT_RIGHT:
+            self.move_direction = 'rigth'
+        else:
+            self.move_direction = False
+        self.is_jumping = bool(inputs & INPUT_JUMP)
+        self.is_sitting = bool(inputs & INPUT_SIT)
+
+    def get_inputs(self) -> int:
+        inputs = 0
+        if self.move_direction == 'left':
+            inputs |= INPUT_LEFT
+        elif self.move_direction == 'rigth':
+            inputs |= INPUT_RIGHT
+        if self.is_jumping:
+            inputs |= INPUT_JUMP
+        if self.is_sitting:
+            inputs |= INPUT_SIT
+        return inputs
+
+    def apply_playback(self) -> bool:
+        try:
+            inputs, bricks = next(self.playback)
+        except StopIteration:
+            return False
+        for position in bricks:
+            self.place_brick(position)
+        self.set_inputs(inputs)
+        return True
+
+    def game_cycle(self) -> None:
+        super().game_cycle()
+        if self.settings['record_replays'] and self.playback is None:
+            self.save_replay()
+
+    def save_replay(self, path: str = None) -> str:
+        if path is None:
+            replays_path = self.settings['path'] + '/replays'
+            makedirs(replays_path, exist_ok=True)
+            path = f'{replays_path}/{type(self).__name__}.replay'
+        self.recording.save(path)
+        return path
+
+    def get_state(self) -> dict:
+        return {'tick': self.ticks, 'mode': self.mode,
+                'running': self.running,
+                'position': self.santa.rect.topleft,
+                'jump_speed': self.santa.jump_speed,
+                'standing': self.santa.state['stand'],
+                'hit_points': self.santa.hit_points}
+
+    def tick(self) -> bool:
+        if self.playback is not None and not self.apply_playback():
+            self.running = False
+            return False
+        self.recording.record(self.get_inputs())
+        self.update()
+        self.ticks += 1
+        profiler.mark(UPDATE)
+        self.running = self.check_state()
+        profiler.mark(COLLISIONS)
+        return self.running
+
+    def update(self) -> None:
+        self.santa.update(
+            self.sprite_groups['wall'], self.all_sprites,
+            self.move_direction, self.is_jumping, self.is_sitting)
+        self.reset()
+        for ball in self.sprite_groups['ball']:
+            ball.update()
+
+    def check_state(self) -> bool:
+        running = True
+        if self.santa.is_collide(self.sprite_groups['exit']):
+            self.mode = 'win'
+            running = False
+        if self.santa.is_collide(self.sprite_groups['trap']):
+            self.santa.die()
+        if self.santa.hit_points <= 0:
+            self.sounds.play('lose')
+            self.mode = 'lose'
+            running = False
+        return running
+
+    def render(self, alpha: float, time_delta: float) -> None:
+        self.alpha = alpha if self.settings['interpolate'] else 1.0
+        super().render(alpha, time_delta)
+
+    def get_static_layer(self) -> pygame.Surface:
+        if self.static_layer is None:
+            self.static_layer = self.get_background(
+                self.settings['path'] + LEVEL_BACKGROUND)
+        return self.static_layer
+
+    def get_background(self, background_path: str) -> pygame.Surface:
+        # Background image is much bigger than window, so it is cropped
+        # and only the crop is converted
+        layer = pygame.Surface(self.settings['window_size']).convert()
+        background = asset_store.get(background_path, 'raw')
+        crop = background.get_rect().clip(layer.get_rect())
+        layer.blit(background.subsurface(crop).convert(), [0, 0])
+        return layer
+
+    def draw_frame(self) -> None:
+        self.screen.blit(self.get_static_layer(), [0, 0])
+        self.draw()
+
+    def event_handler(self, event: pygame.event) -> bool:
+        if event.type == pygame.KEYDOWN:
+            keys = pygame.key.get_pressed()
+            if keys[pygame.K_RIGHT]:
+                self.move_direction = 'rigth'
+            if keys[pygame.K_LEFT]:
+                self.move_direction = 'left'
+            if keys[pygame.K_DOWN]:
+                self.is_sitting = True
+            if keys[pygame.K_UP]:
+                self.is_jumping = True
+        elif event.type == pygame.USEREVENT and self.is_button_event(event):
+            button_name = event.ui_element.code_name
+            if button_name == 'faq':
+                Message(self.texts['ordinary_level_tip'], 'Help',
+                        self.manager, [170, 100], [400, 300], 'help_msg')
+            elif button_name == 'menu':
+                self.mode = 'main_window'
+                return False
+            elif button_name == 'replay':
+                self.mode = 'replay'
+                return False
+        return True
+
+    def draw(self) -> None:
+        for trap in self.animated_sprites:
+            trap.draw(self.screen)
+        for ball in self.sprite_groups['ball']:
+            ball.draw(self.screen, self.alpha)
+        self.santa.particles.draw(self.screen)
+        self.santa.draw(self.screen, self.alpha)
+        self.draw_hud()
+
+    def release(self) -> None:
+        super().release()
+        # Sprites and groups, HUD and bound methods of level refer to each
+        # other, broken cycles free level without waiting for gc
+        for group in self.sprite_groups.values():
+            group.empty()
+        self.santa.kill()
+        self.hud = None
+
+    def get_hud(self) -> HUD:
+        hud = HUD()
+        heart_path = self.settings['path'] +\
+            '/assets/sprites/icons/heart/red_heart.png'
+        hud.add(Hearts('hearts', asset_store.image(heart_path),
+                       self.get_hit_points))
+        # Christmas font has no digits, so numbers use default pygame font
+        font = pygame.font.Font(None, 24)
+        hud_x = self.settings['window_size'][0] - 90
+        hud.add(HUDText('timer', font, self.get_timer_text, [hud_x, 15],
+                        bool(self.settings['show_timer'])))
+        hud.add(HUDText('fps', font, self.get_fps_text, [hud_x, 40],
+                        bool(self.settings['show_fps'])))
+        return hud
+
+    def get_hit_points(self) -> tuple:
+        return (self.start_hit_points, self.santa.hit_points)
+
+    def get_timer_text(self) -> str:
+        seconds = self.ticks // self.settings['tick_rate']
+        return f'{seconds // 60:02}:{seconds % 60:02}'
+
+    def get_fps_text(self) -> str:
+        return f'{round(self.clock.get_fps())} FPS'
+
+    def draw_hud(self) -> None:
+        self.hud.draw(self.screen)
+
+    def get_buttons(self) -> dict:
+        buttons = {}
+        space = self.settings['window_size'][0] // (len(LEVEL_BUTTONS) + 10)
+        for index, name in enumerate(LEVEL_BUTTONS):
+            button = Button(
+                '', name, self.manager,
+                [5, index * space + 50])
+            gui_path = self.settings['path'] + '/assets/sprites/icons/gui/'
+            button.set_icon(gui_path + name + '.png')
+            buttons[name] = button
+        return buttons
+
+
+class MainWindow(Window):
+    __slots__ = ['background_filler', 'texts', 'main_text', 'buttons', 'faq']
+
+    def __init__(self, settings: dict):
+        super().__init__(settings, mode='main_window')
+        self.faq: Message = None
+        self.texts = self.database.get_text()
+        sprites = f'{self.settings["path"]}/assets/sprites/'
+        background_path = f'{sprites}/background/main_window_background.png'
+        self.background_filler = asset_store.get(background_path, 'converted')
+        self.main_text = Text('Christmas Adventures', 'main_text', settings)
+        self.buttons = self.get_buttons()
+        self.get_labels()
+        self.sounds.play('theme')
+
+    def draw(self) -> None:
+        self.main_text.draw(self.screen)
+
+    def get_labels(self) -> None:
+        space = self.settings['window_size'][0] // len(
+            list(self.buttons.keys()))
+        for button in self.buttons:
+            button = self.buttons[button]
+            label = Label(self.texts[button.code_name],
+                          button.code_name + '_label',
+                          self.manager, [1, 1], [1, 1])
+            label.connect_to_button(
+                button, self.settings['window_size'], space)
+
+    def get_buttons(self) -> dict:
+        images_name_list = ['faq', 'shop', 'play']
+        buttons = {}
+        space = self.settings['window_size'][0] // len(images_name_list)
+        for index, name in enumerate(images_name_list):
+            button = Button(
+                '', name, self.manager,
+                [5 + index * space, self.settings['window_size'][1] - 55])
+            gui_path = self.settings['path'] + '/assets/sprites/icons/gui/'
+            button.set_icon(gui_path + name + '.png')
+            buttons[name] = button
+        return buttons
+
+    def show_faq(self) -> Message:
+        window = Message(self.texts['faq_text'], 'faq_text', self.manager,
+                         [170, 100], [400, 300], 'FAQ')
+        return window
+
+    def process_events(self, events: list) -> bool:
+        running = True
+        for event in events:
+            running, self.faq = self.event_handler(event, running, self.faq)
+            self.manager.process_events(event)
+        if self.faq != None and not self.faq.is_alive():
+            self.faq.kill()
+        return running
+
+    def is_button_event(self, event) -> bool:
+        if event.user_type == pygame_gui.UI_BUTTON_PRESSED:
+            if event.ui_element.text == '':
+                for button_name in self.buttons:
+                    if event.ui_element == self.buttons[button_name]:
+                        return True
+        return False
+
+    def event_handler(self, event, running, faq=None) -> (bool, None):
+        if event.type == pygame.QUIT:
+            running = False
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_p:
+                self.mode = 'level'
+                running = False
+        elif event.type == pygame.USEREVENT and self.is_button_event(event):
+            button_name = event.ui_element.code_name
+            if button_name == 'faq':
+                faq = self.show_faq()
+            elif button_name == 'play':
+                self.mode = 'level'
+                running = False
+            elif button_name == 'shop':
+                self.mode = 'shop_window'
+                running = False
+        if not running:
+            self.sounds.stop_all()
+        return (running, faq)
+
+
+class LoseWindow(Window):
+    def __init__(self, settings: dict):
+        super().__init__(settings, mode='lose_window')
+        self.buttons: list = self.get_buttons()
+        self.main_text = Text('Game over', 'main_text', settings)
+        background_path = self.settings['path'] + \
+            '/assets/sprites/background/main_window_background.png'
+        self.background_filler = asset_store.get(background_path, 'converted')
+
+        self.sounds.stop_all()
+        self.sounds.play('lose')
+
+    def get_buttons(self) -> list:
+        images_name_list = ['replay'] * 10
+        buttons = []
+        space = self.settings['window_size'][0] // len(images_name_list)
+        for index, name in enumerate(images_name_list):
+            button = Button(
+                '', name, self.manager,
+                [5 + index * space, self.settings['window_size'][1] - 55])
+            gui_path = self.settings['path'] + '/assets/sprites/icons/gui/'
+            button.set_icon(gui_path + name + '.png')
+            buttons.append(button)
+        return buttons
+
+    def process_events(self, events: list) -> bool:
+        running = True
+        for event in events:
+            running = self.event_handler(event, running)
+            self.manager.process_events(event)
+        return running
+
+    def draw(self):
+        self.main_text.draw(self.screen)
+
+    def is_button_event(self, event) -> bool:
+        if event.user_type == pygame_gui.UI_BUTTON_PRESSED:
+            if event.ui_element.text == '':
+                for button_name in self.buttons:
+                    if event.ui_element == button_name:
+                        return True
+        return False
+
+    def event_handler(self, event, running) -> (bool, None):
+        if event.type == pygame.QUIT:
+            running = False
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_p:
+                self.mode = 'level'
+                running = False
+        elif event.type == pygame.USEREVENT and self.is_button_event(event):
+            button_name = event.ui_element.code_name
+            if button_name == 'replay':
+                self.mode = 'level'
+                running = False
+        if not running:
+            self.sounds.stop_all()
+        return running
+
+
+class EndWindow(Window):
+    def __init__(self, settings: dict):
+        super().__init__(settings, mode='win_window')
+        background_path = self.settings['path'] + \
+            '/assets/sprites/background/win_background.png'
+        self.background_filler = asset_store.get(background_path, 'converted')
+        self.sounds.play('win')
+
+    def process_events(self, events: list) -> bool:
+        running = True
+        for event in events:
+            running = self.event_handler(event, running)
+        return running
+
+    def render(self, alpha: float, time_delta: float) -> None:
+        self.screen.blit(self.background_filler, [0, 0])
+        profiler.mark(DRAW)
+        profiler.draw(self.screen)
+        profiler.mark(UI)
+        self.flip()
+        profiler.mark(FLIP)
+
+    def event_handler(self, event, running) -> bool:
+        if event.type == pygame.QUIT:
+            running = False
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            self.mode = 'main_window'
+            running = False
+        if not running:
+            self.sounds.stop_all()
+        return running
+
+
+class ShopWindow(Window):
+    def __init__(self, settings):
+        self.settings_manager = settings
+        settings = settings.settings
+        super().__init__(settings, mode='shop_window')
+        self.faq: Message = None
+        self.all_sprites = pygame.sprite.Group()
+        self.main_text = Text('Shop', 'main_text', settings)
+        background_path = self.settings['path'] + \
+            '/assets/sprites/background/main_window_background.png'
+        self.background_filler = asset_store.get(background_path, 'converted')
+        self.texts = self.database.get_text()
+        self.skins = self.database.get_skins()
+        self.buttons = self.get_buttons()
+        self.show_skin()
+
+    def release(self) -> None:
+        super().release()
+        self.all_sprites.empty()
+
+    def show_skin(self, skin=''):
+        if skin == '':
+            skin = self.settings['skin']
+        sprite = pygame.sprite.Sprite()
+        sprite.image = pygame.transform.scale(image_cache.load_image(
+            self.settings['path'] + self.skins[skin]['stand']), [200, 200])
+        sprite.mask = pygame.mask.from_surface(sprite.image)
+        sprite.rect = pygame.Rect(([50, 100]), (*sprite.mask.get_size(),))
+        self.all_sprites = pygame.sprite.Group()
+        self.all_sprites.add(sprite)
+        self.current_showing_skin = skin
+
+    def get_buttons(self):
+        images_name_list = ['red', 'mask', 'thief', 'blue_spirit',
+                            'gold', 'invisible']
+        buttons = {}
+        space = self.settings['window_size'][0] // len(images_name_list)
+        for index, name in enumerate(images_name_list):
+            button = Button(
+                '', name, self.manager,
+                [5 + index * space, self.settings['window_size'][1] - 55])
+            button.set_icon(
+                self.settings['path'] + self.skins[name]['stand'], False)
+            buttons[name] = button
+        button = Button(
+            '', 'yes', self.manager,
+            [46, 347])
+        gui_path = self.settings['path'] + '/assets/sprites/icons/gui/'
+        button.set_icon(gui_path + 'yes.png')
+        buttons['yes'] = button
+        button = Button(
+            '', 'no', self.manager,
+            [126, 347])
+        gui_path = self.settings['path'] + '/assets/sprites/icons/gui/'
+        button.set_icon(gui_path + 'no.png')
+        buttons['no'] = button
+        return buttons
+
+    def draw(self):
+        self.all_sprites.draw(self.screen)
+        self.main_text.draw(self.screen)
+
+    def process_events(self, events: list) -> bool:
+        running = True
+        for event in events:
+            running, self.faq = self.event_handler(event, running, self.faq)
+            self.manager.process_events(event)
+        if self.faq != None and not self.faq.is_alive():
+            self.faq.kill()
+        return running
+
+    def is_button_event(self, event) -> bool:
+        if event.user_type == pygame_gui.UI_BUTTON_PRESSED:
+            if event.ui_element.text == '':
+                for button_name in self.buttons:
+                    if event.ui_element == self.buttons[button_name]:
+                        return True
+        return False
+
+    def event_handler(self, event, running, faq=None) -> (bool, None):
+        if event.type == pygame.QUIT:
+            running = False
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_p:
+                self.mode = 'level'
+                running = False
+        elif event.type == pygame.USEREVENT and self.is_button_event(event):
+            button_name = event.ui_element.code_name
+            if button_name in self.skins:
+                self.show_skin(button_name)
+            elif button_name == 'no':
+                running = False
+                self.mode = 'main_window'
+            elif button_name == 'yes':
+                self.skin_applyer(self.current_showing_skin)
+        if not running:
+            self.sounds.stop_all()
+        return (running, faq)
+
+    def skin_applyer(self, skin):
+        change = False
+        if skin in ['red', 'mask']:
+            change = True
+        elif skin == 'golden':
+            if self.settings['number_of_games'] >= 100:
+                change = True
+        elif skin == 'blue_spirit':
+            if exists(self.settings['path'] + '/error_log.txt'):
+                change = True
+        elif skin == 'invisible':
+            if self.settings['visited_github']:
+                change = True
+            else:
+                self.settings_manager.save({'visited_github': 1})
+                wb_open('https://github.com/Ulbandus/ChristmasAdventures')
+        elif skin == 'thief':
+            if self.settings['step'] != 5 or self.settings['gravity'] != 0.5:
+                change = True
+        if change:
+            self.settings_manager.save({'skin': skin})
+        else:
+            Message(self.texts['skin_blocked'], 'Skin Blocked', self.manager,
+                    [170, 100], [400, 300], 'skin_error')